@@ -7,7 +7,7 @@ from langchain_core.runnables import RunnableSequence
 from langchain_core.output_parsers import PydanticOutputParser
 
 from app.core.llm import get_llm
-from app.agents.coder.prompt import generate_prompt, repair_prompt
+from app.agents.coder.prompt import generate_prompt, repair_prompt, route_repair_prompt
 from app.agents.coder.schema import CoderOutput
 
 
@@ -32,5 +32,14 @@ def build_repair_node() -> RunnableSequence:
     """
     llm = get_llm(role="repair")
 
-    # No Pydantic parser — repair_node handles parsing manually
-    return repair_prompt | llm
\ No newline at end of file
+    # No Pydantic parser — repair_node handles parsing manually.
+    # Always ask for a fresh answer: a cached repair already failed once.
+    return repair_prompt | llm.bind(bypass_cache=True)
+
+def build_route_repair_node() -> RunnableSequence:
+    """
+    Builds the route-level repair chain: fixes only the failing handlers of
+    backend/app.py (see utils/route_slicer.py). Returns raw LLM output.
+    """
+    llm = get_llm(role="repair")
+    return route_repair_prompt | llm.bind(bypass_cache=True)
@@ -130,3 +130,40 @@ Generate the COMPLETE fixed file:"""
         ),
     ]
 )
+
+
+route_repair_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """You are a senior Python engineer fixing failing routes of a Flask backend.
+
+You are given ONLY the failing route handlers of backend/app.py, the code
+around them (imports, app setup, shared state, helpers) and the FAILURE REPORT.
+
+REQUIREMENTS:
+- Return ONLY the fixed route handler functions, each with its @app.route decorator
+- Keep each handler's function name so it can be swapped into the file
+- For a route that has no handler yet, write a new handler
+- Add a new helper function only if a handler needs it
+- Add an import line only if a handler needs a module that is not imported yet
+- Do NOT repeat the context code, the app setup or app.run()
+- Use request.get_json() or {{}}, data.get('key', default) and jsonify(...)
+- NO markdown code fences
+- NO explanations — just code"""
+        ),
+        (
+            "human",
+            """FAILURE REPORT:
+{failure_report}
+
+CONTEXT (read-only):
+{context}
+
+FAILING HANDLERS:
+{handlers}
+
+Generate the fixed handlers:"""
+        ),
+    ]
+)
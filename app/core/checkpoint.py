@@ -0,0 +1,304 @@
+"""
+checkpoint.py
+-------------
+LangGraph checkpointer persisted in workspace/projects.db.
+- Every superstep of a pipeline run is saved under the run's thread id,
+  so a run that fails half-way can resume from its last completed node
+- Channel values are stored once per channel version: a checkpoint only
+  adds rows for the channels that node actually changed (the state delta),
+  not a copy of the whole project state
+- Writes of tasks that finished in an interrupted superstep are kept too,
+  so their parallel siblings are the only ones re-run on resume
+"""
+
+import os
+import random
+import sqlite3
+import threading
+from typing import Any, Iterator, Sequence
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from .config import CHECKPOINTS_ENABLED
+from .database import DB_PATH
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver):
+    """Checkpoint saver on SQLite (sync API; the async methods delegate). Thread-safe."""
+
+    def __init__(self, path: str = DB_PATH, serde=None):
+        super().__init__(serde=serde)
+        self.path = path
+        self._local = threading.local()
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections aren't shareable)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id       TEXT NOT NULL,
+                checkpoint_ns   TEXT NOT NULL DEFAULT '',
+                checkpoint_id   TEXT NOT NULL,
+                parent_id       TEXT,
+                type            TEXT NOT NULL,
+                checkpoint      BLOB NOT NULL,
+                metadata_type   TEXT NOT NULL,
+                metadata        BLOB NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+                thread_id       TEXT NOT NULL,
+                checkpoint_ns   TEXT NOT NULL DEFAULT '',
+                channel         TEXT NOT NULL,
+                version         TEXT NOT NULL,
+                type            TEXT NOT NULL,
+                value           BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+            );
+
+            CREATE TABLE IF NOT EXISTS checkpoint_writes (
+                thread_id       TEXT NOT NULL,
+                checkpoint_ns   TEXT NOT NULL DEFAULT '',
+                checkpoint_id   TEXT NOT NULL,
+                task_id         TEXT NOT NULL,
+                idx             INTEGER NOT NULL,
+                channel         TEXT NOT NULL,
+                type            TEXT NOT NULL,
+                value           BLOB,
+                task_path       TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+        """)
+        conn.commit()
+
+    # ── Read ────────────────────────────────────
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> dict:
+        conn = self._conn()
+        values = {}
+        for channel, version in versions.items():
+            row = conn.execute(
+                "SELECT type, value FROM checkpoint_blobs "
+                "WHERE thread_id=? AND checkpoint_ns=? AND channel=? AND version=?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is None or row[0] == "empty":
+                continue
+            values[channel] = self.serde.loads_typed((row[0], row[1]))
+        return values
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list:
+        rows = self._conn().execute(
+            "SELECT task_id, channel, type, value FROM checkpoint_writes "
+            "WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=? "
+            "ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return [(task_id, channel, self.serde.loads_typed((type_, value)))
+                for task_id, channel, type_, value in rows]
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, checkpoint_b, metadata_type, metadata_b = row
+        checkpoint = self.serde.loads_typed((type_, checkpoint_b))
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id,
+            }},
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(thread_id, checkpoint_ns, checkpoint["channel_versions"]),
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata_b)),
+            parent_config=(
+                {"configurable": {
+                    "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id,
+                }}
+                if parent_id else None
+            ),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    _COLUMNS = "checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata"
+
+    def get_tuple(self, config) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            row = self._conn().execute(
+                f"SELECT {self._COLUMNS} FROM checkpoints "
+                "WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchone()
+        else:
+            # Checkpoint ids are time-ordered (uuid6), so the max is the latest
+            row = self._conn().execute(
+                f"SELECT {self._COLUMNS} FROM checkpoints "
+                "WHERE thread_id=? AND checkpoint_ns=? ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+        return self._to_tuple(thread_id, checkpoint_ns, row) if row else None
+
+    def list(self, config, *, filter: dict[str, Any] | None = None, before=None,
+             limit: int | None = None) -> Iterator[CheckpointTuple]:
+        query = "SELECT thread_id, checkpoint_ns, " + self._COLUMNS + " FROM checkpoints"
+        where, params = [], []
+        if config:
+            where.append("thread_id=?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                where.append("checkpoint_ns=?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                where.append("checkpoint_id=?")
+                params.append(get_checkpoint_id(config))
+        if before and get_checkpoint_id(before):
+            where.append("checkpoint_id<?")
+            params.append(get_checkpoint_id(before))
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY checkpoint_id DESC"
+
+        for row in self._conn().execute(query, params).fetchall():
+            item = self._to_tuple(row[0], row[1], row[2:])
+            if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            yield item
+
+    # ── Write ───────────────────────────────────
+
+    def put(self, config, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        saved = checkpoint.copy()
+        values = saved.pop("channel_values")
+
+        # Only channels updated in this step get new blob rows
+        blobs = []
+        for channel, version in new_versions.items():
+            type_, value = self.serde.dumps_typed(values[channel]) if channel in values else ("empty", None)
+            blobs.append((thread_id, checkpoint_ns, channel, str(version), type_, value))
+
+        type_, checkpoint_b = self.serde.dumps_typed(saved)
+        metadata_type, metadata_b = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO checkpoint_blobs "
+                "(thread_id, checkpoint_ns, channel, version, type, value) VALUES (?, ?, ?, ?, ?, ?)",
+                blobs,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints "
+                "(thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 type_, checkpoint_b, metadata_type, metadata_b),
+            )
+        return {"configurable": {
+            "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"],
+        }}
+
+    def put_writes(self, config, writes: Sequence[tuple[str, Any]], task_id: str, task_path: str = ""):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        replace, keep = [], []
+        for idx, (channel, value) in enumerate(writes):
+            type_, value_b = self.serde.dumps_typed(value)
+            row = (thread_id, checkpoint_ns, checkpoint_id, task_id,
+                   WRITES_IDX_MAP.get(channel, idx), channel, type_, value_b, task_path)
+            # Special writes (errors, interrupts) replace earlier ones; regular writes keep the first save
+            (replace if channel in WRITES_IDX_MAP else keep).append(row)
+        conn = self._conn()
+        with conn:
+            for verb, rows in (("INSERT OR REPLACE", replace), ("INSERT OR IGNORE", keep)):
+                conn.executemany(
+                    f"{verb} INTO checkpoint_writes "
+                    "(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+    def delete_thread(self, thread_id: str):
+        conn = self._conn()
+        with conn:
+            for table in ("checkpoints", "checkpoint_blobs", "checkpoint_writes"):
+                conn.execute(f"DELETE FROM {table} WHERE thread_id=?", (thread_id,))
+
+    def recent_threads(self, limit: int = 20) -> list:
+        """Thread ids with checkpoints, most recently updated first."""
+        rows = self._conn().execute(
+            "SELECT thread_id FROM checkpoints WHERE checkpoint_ns='' "
+            "GROUP BY thread_id ORDER BY MAX(checkpoint_id) DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_next_version(self, current, channel) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # ── Async (LangGraph calls these from async graphs) ──
+
+    async def aget_tuple(self, config):
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str):
+        return self.delete_thread(thread_id)
+
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> SQLiteCheckpointSaver | None:
+    """Shared checkpointer, or None when CHECKPOINTS_ENABLED is off."""
+    global _checkpointer
+    if not CHECKPOINTS_ENABLED:
+        return None
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            _checkpointer = SQLiteCheckpointSaver()
+        return _checkpointer
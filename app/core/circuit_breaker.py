@@ -0,0 +1,157 @@
+"""
+circuit_breaker.py
+------------------
+Per-provider health tracking for FallbackLLM.
+- Rolling window of call outcomes (error rate + latency)
+- CLOSED → OPEN once the error rate crosses a threshold
+- While OPEN, calls skip the provider entirely (no wasted round-trip)
+- After a cool-down the breaker goes HALF_OPEN and lets one probe through;
+  success closes it again, failure re-opens it with a longer cool-down
+"""
+
+import threading
+import time
+from collections import deque
+
+from .config import CIRCUIT_BREAKER
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Circuit breaker for one provider/model. Thread-safe."""
+
+    def __init__(self, name: str, window: int = None, min_calls: int = None,
+                 error_rate: float = None, open_seconds: float = None,
+                 max_open_seconds: float = None, slow_call_seconds: float = None):
+        self.name = name
+        self.window = window or CIRCUIT_BREAKER["window"]
+        self.min_calls = min_calls or CIRCUIT_BREAKER["min_calls"]
+        self.error_rate_threshold = error_rate or CIRCUIT_BREAKER["error_rate"]
+        self.base_open_seconds = open_seconds or CIRCUIT_BREAKER["open_seconds"]
+        self.max_open_seconds = max_open_seconds or CIRCUIT_BREAKER["max_open_seconds"]
+        self.slow_call_seconds = slow_call_seconds if slow_call_seconds is not None else CIRCUIT_BREAKER["slow_call_seconds"]
+
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=self.window)   # (ok, latency)
+        self.state = CLOSED
+        self.open_seconds = self.base_open_seconds
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    def allow(self) -> bool:
+        """True if a call may be sent to this provider now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def cancel_probe(self):
+        """Give back a half-open probe slot that was granted but never used."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def time_until_probe(self) -> float:
+        """Seconds until the breaker will let a probe through (0 if it would now)."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+
+    def record_success(self, latency: float):
+        with self._lock:
+            slow = self.slow_call_seconds and latency > self.slow_call_seconds
+            self._outcomes.append((not slow, latency))
+            if self.state == HALF_OPEN:
+                # Probe succeeded — start over with a clean window
+                self.state = CLOSED
+                self.open_seconds = self.base_open_seconds
+                self._probe_in_flight = False
+                self._outcomes.clear()
+                self._outcomes.append((True, latency))
+                return
+            self._maybe_open()
+
+    def record_failure(self, latency: float):
+        with self._lock:
+            self._outcomes.append((False, latency))
+            if self.state == HALF_OPEN:
+                # Probe failed — back off harder before the next probe
+                self._open(min(self.open_seconds * 2, self.max_open_seconds))
+                return
+            self._maybe_open()
+
+    def _maybe_open(self):
+        if self.state != CLOSED or len(self._outcomes) < self.min_calls:
+            return
+        if self._error_rate() >= self.error_rate_threshold:
+            self._open(self.base_open_seconds)
+
+    def _open(self, seconds: float):
+        self.state = OPEN
+        self.open_seconds = seconds
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self.times_opened += 1
+
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for ok, _ in self._outcomes if not ok) / len(self._outcomes)
+
+    def latency_percentile(self, pct: float) -> float | None:
+        """Latency percentile (seconds) of successful calls in the window, None if no data."""
+        with self._lock:
+            latencies = sorted(lat for ok, lat in self._outcomes if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(pct / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            state = self.state
+            calls = len(self._outcomes)
+            error_rate = self._error_rate()
+        return {
+            "name": self.name,
+            "state": state,
+            "calls_in_window": calls,
+            "error_rate": round(error_rate, 3),
+            "latency_p50": self.latency_percentile(50),
+            "latency_p95": self.latency_percentile(95),
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+_BREAKERS = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_breaker(provider: str, model: str) -> CircuitBreaker:
+    """Return the shared breaker for a provider/model pair."""
+    key = (provider, model)
+    with _BREAKERS_LOCK:
+        if key not in _BREAKERS:
+            _BREAKERS[key] = CircuitBreaker(f"{provider}:{model}" if model else provider)
+        return _BREAKERS[key]
+
+
+def get_breaker_stats() -> list:
+    """State, error rate and latency of every breaker seen so far."""
+    with _BREAKERS_LOCK:
+        breakers = list(_BREAKERS.values())
+    return [b.snapshot() for b in breakers]
@@ -52,6 +52,92 @@ TOKEN_LIMITS = {
     "default": 4000,
 }
 
+# Provider rate budgets (requests/min, tokens/min) per model — calls are
+# admitted client-side against these before being sent (see rate_limiter.py)
+RATE_LIMITS = {
+    "groq": {
+        "llama-3.3-70b-versatile": {"rpm": 30, "tpm": 12000},
+        "llama-3.1-8b-instant": {"rpm": 30, "tpm": 6000},
+        "default": {"rpm": 30, "tpm": 6000},
+    },
+    "gemini": {
+        "gemini-2.5-flash": {"rpm": 10, "tpm": 250000},
+        "default": {"rpm": 10, "tpm": 250000},
+    },
+}
+RATE_LIMITS_ENABLED = os.getenv("RATE_LIMITS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Output tokens reserved per call at admission until a role has reported
+# completions (then their running mean is used); capped by the role's max_tokens.
+# Reserving the full max_tokens would let one 16k coder call fill a 12k TPM bucket.
+ADMISSION_OUTPUT_RESERVE = int(os.getenv("ADMISSION_OUTPUT_RESERVE", "1500"))
+# Longest a call may queue for budget before giving up
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "120"))
+
+# Circuit breaker per provider/model: skip a provider after repeated failures
+CIRCUIT_BREAKER = {
+    "enabled": os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes"),
+    "window": int(os.getenv("CIRCUIT_WINDOW", "20")),              # calls in rolling window
+    "min_calls": int(os.getenv("CIRCUIT_MIN_CALLS", "4")),         # before the breaker may open
+    "error_rate": float(os.getenv("CIRCUIT_ERROR_RATE", "0.5")),   # open at >= 50% failures
+    "open_seconds": float(os.getenv("CIRCUIT_OPEN_SECONDS", "30")),
+    "max_open_seconds": float(os.getenv("CIRCUIT_MAX_OPEN_SECONDS", "300")),
+    "slow_call_seconds": float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "120")),  # 0 disables
+}
+
+# Hedged requests: opt-in roles (e.g. "chat,coder") fire the same request at the
+# fallback if the primary is slower than its recent p95 latency
+HEDGING = {
+    "roles": {r.strip() for r in os.getenv("LLM_HEDGE_ROLES", "").split(",") if r.strip()},
+    "percentile": float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+    "min_samples": 5,                                                  # before p95 is trusted
+    "default_delay": float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "20")),
+    "min_delay": 2.0,
+    "max_delay": 90.0,
+    "max_threads": 8,
+}
+
+# Max concurrent LLM calls per provider (used for parallel file generation)
+LLM_CONCURRENCY = {
+    "groq": int(os.getenv("GROQ_MAX_CONCURRENCY", "4")),
+    "gemini": int(os.getenv("GEMINI_MAX_CONCURRENCY", "2")),
+    "default": int(os.getenv("LLM_MAX_CONCURRENCY", "2")),
+}
+
+# A generated file cut off at the output token cap is finished with up to this
+# many continuation requests (seeded with the partial file) instead of a full retry
+MAX_CONTINUATIONS = int(os.getenv("MAX_CONTINUATIONS", "2"))
+# Without a finish_reason, a streamed reply this close to the cap counts as cut off
+CONTINUATION_NEAR_CAP = float(os.getenv("CONTINUATION_NEAR_CAP", "0.97"))
+
+# LLM response cache (identical prompts are served from disk)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "200"))
+
+# Checkpoint every pipeline step to workspace/projects.db so failed runs can resume
+CHECKPOINTS_ENABLED = os.getenv("CHECKPOINTS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# SQLite connections kept open for app/core/database.py (callers beyond this
+# briefly wait, then get a one-off connection)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+
+# Chat refinement asks for search/replace edits instead of complete files;
+# a file whose edits do not apply cleanly is re-requested in full
+CHAT_PATCH_MODE = os.getenv("CHAT_PATCH_MODE", "true").lower() in ("1", "true", "yes")
+# Token budget for the files shown to chat refinement: the most relevant files
+# go in full, the rest as one-line summaries
+CHAT_CONTEXT_TOKENS = int(os.getenv("CHAT_CONTEXT_TOKENS", "6000"))
+
+# Repair of failing backend routes sends only the failing handlers (plus the
+# imports, state and helpers they use) instead of the whole backend/app.py
+REPAIR_ROUTE_SLICES = os.getenv("REPAIR_ROUTE_SLICES", "true").lower() in ("1", "true", "yes")
+
+# Web UI sessions: each browser session has its own state; pipelines run on a
+# bounded worker pool shared fairly between sessions
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "2"))
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "50"))
+SESSION_IDLE_SECONDS = int(os.getenv("SESSION_IDLE_SECONDS", "3600"))
+
 # Supported tech stacks
 SUPPORTED_STACKS = ["react-flask", "nextjs", "vue-flask", "html-css-js", "react-express"]
 DEFAULT_STACK = "react-flask"
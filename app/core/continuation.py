@@ -0,0 +1,118 @@
+"""
+continuation.py
+---------------
+Finishes LLM replies that were cut off at the output token cap.
+- A reply is cut off when the provider reports finish_reason "length"
+  (Groq/OpenAI) or "MAX_TOKENS" (Gemini); when no reason is reported, a
+  streamed reply whose token count reaches CONTINUATION_NEAR_CAP of the cap
+  counts as cut off too
+- Instead of regenerating from scratch, a continuation request carries the
+  partial reply as the assistant turn and asks the model to go on
+- The pieces are stitched, dropping text the model repeats at the seam
+"""
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage, HumanMessage
+
+from .config import CONTINUATION_NEAR_CAP, MAX_CONTINUATIONS
+from .llm import get_output_token_limit
+
+_LENGTH_REASONS = {"length", "max_tokens", "max_output_tokens"}
+
+# Shortest repeated text treated as an overlap when stitching
+_MIN_OVERLAP = 20
+_MAX_OVERLAP = 2000
+
+CONTINUE_PROMPT = (
+    "Your previous reply was cut off by the output limit. Continue EXACTLY where it stopped: "
+    "do not repeat any text, do not restart the file, do not add explanations or markdown fences. "
+    "If the file is already complete, reply with nothing."
+)
+
+
+class TokenWatch(BaseCallbackHandler):
+    """Counts output tokens as they stream in."""
+
+    def __init__(self):
+        self.tokens = 0
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if token:
+            self.tokens += 1
+
+
+def finish_reason(message) -> str:
+    """Normalized finish reason of an LLM reply ('' when the provider reports none)."""
+    metadata = getattr(message, "response_metadata", None) or {}
+    reason = metadata.get("finish_reason") or metadata.get("stop_reason") or ""
+    return str(getattr(reason, "name", reason)).lower()
+
+
+def was_cut_off(message, streamed_tokens: int = 0, token_cap: int = 0) -> bool:
+    """True when the reply stopped at the output token cap."""
+    reason = finish_reason(message)
+    if reason:
+        return reason in _LENGTH_REASONS
+    return bool(token_cap) and streamed_tokens >= token_cap * CONTINUATION_NEAR_CAP
+
+
+def _strip_leading_fence(text: str) -> str:
+    stripped = text.lstrip()
+    if stripped.startswith("```"):
+        newline = stripped.find("\n")
+        return "" if newline < 0 else stripped[newline + 1:]
+    return text
+
+
+def stitch(partial: str, continuation: str) -> str:
+    """Join a cut-off reply and its continuation, dropping what the model repeated."""
+    continuation = _strip_leading_fence(continuation)
+    if not continuation.strip():
+        return partial
+
+    # 1. The continuation starts by repeating the tail of the partial reply
+    longest = min(len(partial), len(continuation), _MAX_OVERLAP)
+    for size in range(longest, _MIN_OVERLAP - 1, -1):
+        if partial.endswith(continuation[:size]):
+            return partial + continuation[size:]
+
+    # 2. It restarts the line that was cut in half
+    head, _, last_line = partial.rpartition("\n")
+    cut = last_line.strip()
+    first_line = continuation.lstrip("\n").split("\n", 1)[0]
+    if cut and first_line.strip().startswith(cut) and first_line.strip() != cut:
+        return (head + "\n" if head else "") + continuation.lstrip("\n")
+
+    # 3. It picks up mid-token
+    return partial + continuation
+
+
+def invoke_with_continuation(llm, prompt, config: dict = None, max_continuations: int = None) -> str:
+    """
+    llm.invoke(prompt) that finishes replies cut off at the output cap with
+    up to `max_continuations` continuation requests. Returns the full text.
+    """
+    limit = MAX_CONTINUATIONS if max_continuations is None else max_continuations
+    token_cap = get_output_token_limit(llm)
+    messages = [HumanMessage(content=prompt)] if isinstance(prompt, str) else list(prompt)
+
+    watch = TokenWatch()
+    call_config = {**(config or {}), "callbacks": [*((config or {}).get("callbacks") or []), watch]}
+    response = llm.invoke(messages, config=call_config)
+    text = response.content
+
+    continuations = 0
+    while was_cut_off(response, watch.tokens, token_cap) and continuations < limit:
+        continuations += 1
+        print(f"      ✂️ Reply cut off at the output limit (~{len(text) // 4} tokens) "
+              f"— continuation {continuations}/{limit}")
+        watch.tokens = 0
+        response = llm.invoke(
+            messages + [AIMessage(content=text), HumanMessage(content=CONTINUE_PROMPT)],
+            config=call_config,
+        )
+        text = stitch(text, response.content)
+
+    if continuations and was_cut_off(response, watch.tokens, token_cap):
+        print(f"      ⚠️ Still cut off after {continuations} continuation(s)")
+    return text
@@ -3,28 +3,144 @@ database.py
 -----------
 SQLite database for project persistence.
 Stores projects, chat messages, and generated files.
+Version snapshots are manifests (path -> content hash) over a shared,
+compressed blob table, so a snapshot only stores the files that changed.
+
+Connections come from a bounded pool: each one is opened once with the
+pragmas below, and conn.close() hands it back to the pool instead of
+closing it, so a query no longer pays for connect + pragma setup, and
+sqlite3's per-connection statement cache keeps prepared statements across
+calls. bench_database.py measures the difference.
 """
 
 import sqlite3
 import uuid
+import hashlib
+import html
 import json
 import os
+import queue
+import re
+import threading
+import zlib
+from collections.abc import MutableMapping
 from datetime import datetime
 from pathlib import Path
 
+from .config import DB_POOL_SIZE
+
 # DB file lives alongside generated projects
 _DB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'workspace')
 DB_PATH = os.path.join(_DB_DIR, 'projects.db')
 
+# Applied once per pooled connection (tuned for WAL)
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "foreign_keys": "ON",
+    "synchronous": "NORMAL",      # durable at checkpoints; safe with WAL
+    "cache_size": "-16000",       # 16 MB page cache
+    "mmap_size": "134217728",     # 128 MB memory-mapped reads
+    "busy_timeout": "5000",       # wait up to 5s for a writer instead of failing
+    "temp_store": "MEMORY",
+}
+
+# How long a caller waits for a free connection before opening an extra one
+_POOL_WAIT_SECONDS = 2.0
+
+
+# ============================================
+# CONNECTION POOL
+# ============================================
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() returns it to its pool."""
+
+    _pool = None
+
+    def close(self):
+        pool = self._pool
+        if pool is None:
+            super().close()
+        else:
+            pool.release(self)
+
+    def really_close(self):
+        super().close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections shared between threads.
+    A connection is only ever used by the thread that checked it out.
+    When all `size` connections are busy, a caller waits briefly and then
+    gets an overflow connection that is closed on release (so a function
+    that nests another database call can never deadlock the pool).
+    """
+
+    def __init__(self, path: str, size: int = None):
+        self.path = path
+        self.size = max(1, size or DB_POOL_SIZE)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _open(self, pooled: bool) -> PooledConnection:
+        conn = sqlite3.connect(self.path, factory=PooledConnection, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        conn._pool = self if pooled else None
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return self._open(pooled=True)
+        try:
+            return self._idle.get(timeout=_POOL_WAIT_SECONDS)
+        except queue.Empty:
+            return self._open(pooled=False)
+
+    def release(self, conn: PooledConnection):
+        if conn.in_transaction:
+            # Never hand uncommitted work to the next caller
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().really_close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._opened = 0
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ConnectionPool:
+    global _pool
+    with _pool_lock:
+        # DB_PATH may be repointed (e.g. by a benchmark); follow it
+        if _pool is None or _pool.path != DB_PATH:
+            if _pool is not None:
+                _pool.close_all()
+            _pool = ConnectionPool(DB_PATH)
+        return _pool
+
 
 def _get_conn() -> sqlite3.Connection:
-    """Get a connection with row_factory for dict-like access."""
-    os.makedirs(_DB_DIR, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
-    return conn
+    """Get a pooled connection with row_factory for dict-like access (close() returns it)."""
+    return _get_pool().acquire()
 
 
 def init_db():
@@ -60,6 +176,9 @@ def init_db():
                 file_path   TEXT NOT NULL,
                 content     TEXT NOT NULL DEFAULT '',
                 size        INTEGER NOT NULL DEFAULT 0,
+                content_hash TEXT NOT NULL DEFAULT '',
+                lines       INTEGER NOT NULL DEFAULT 0,
+                fingerprint TEXT,
                 created_at  TEXT NOT NULL,
                 FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
             );
@@ -86,6 +205,25 @@ def init_db():
                 FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
             );
 
+            -- Content-addressed file contents (zlib-compressed UTF-8), shared
+            -- by every version that contains the same file content
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash        TEXT PRIMARY KEY,
+                content     BLOB NOT NULL,
+                size        INTEGER NOT NULL DEFAULT 0,
+                created_at  TEXT NOT NULL
+            );
+
+            -- Version manifests: which blob each path of a version points to
+            CREATE TABLE IF NOT EXISTS version_files (
+                version_id  INTEGER NOT NULL,
+                file_path   TEXT NOT NULL,
+                blob_hash   TEXT NOT NULL,
+                PRIMARY KEY (version_id, file_path),
+                FOREIGN KEY (version_id) REFERENCES project_versions(id) ON DELETE CASCADE,
+                FOREIGN KEY (blob_hash) REFERENCES blobs(hash)
+            );
+
             CREATE INDEX IF NOT EXISTS idx_messages_project
                 ON chat_messages(project_id);
             CREATE INDEX IF NOT EXISTS idx_files_project
@@ -94,23 +232,232 @@ def init_db():
                 ON sdlc_stages(project_id);
             CREATE INDEX IF NOT EXISTS idx_versions_project
                 ON project_versions(project_id);
+            CREATE INDEX IF NOT EXISTS idx_version_files_blob
+                ON version_files(blob_hash);
         """)
+        _migrate(conn)
+        _ensure_search_index(conn)
         conn.commit()
         print("✅ Database initialized:", DB_PATH)
     finally:
         conn.close()
 
 
+def _migrate(conn: sqlite3.Connection):
+    """Bring databases created by older versions up to the current schema."""
+    columns = {r['name'] for r in conn.execute("PRAGMA table_info(generated_files)")}
+    if 'content_hash' not in columns:
+        conn.execute("ALTER TABLE generated_files ADD COLUMN content_hash TEXT NOT NULL DEFAULT ''")
+    if 'lines' not in columns:
+        conn.execute("ALTER TABLE generated_files ADD COLUMN lines INTEGER NOT NULL DEFAULT 0")
+    if 'fingerprint' not in columns:
+        conn.execute("ALTER TABLE generated_files ADD COLUMN fingerprint TEXT")
+        # Fingerprints used to be kept as a pseudo SDLC stage
+        conn.execute("DELETE FROM sdlc_stages WHERE stage_name = 'file_fingerprints'")
+
+    # One row per (project, path); keep the newest if older code left duplicates
+    conn.execute(
+        """DELETE FROM generated_files WHERE id NOT IN
+           (SELECT MAX(id) FROM generated_files GROUP BY project_id, file_path)"""
+    )
+    conn.execute(
+        """CREATE UNIQUE INDEX IF NOT EXISTS idx_files_project_path
+           ON generated_files(project_id, file_path)"""
+    )
+
+    rows = conn.execute(
+        "SELECT id, content FROM generated_files WHERE content_hash = '' OR lines = 0"
+    ).fetchall()
+    if rows:
+        conn.executemany(
+            "UPDATE generated_files SET content_hash = ?, lines = ? WHERE id = ?",
+            [(content_hash(r['content']), r['content'].count('\n') + 1, r['id']) for r in rows]
+        )
+
+    # Versions saved as one files_json blob become blob manifests
+    legacy = conn.execute(
+        "SELECT id, files_json, created_at FROM project_versions WHERE files_json != '{}'"
+    ).fetchall()
+    for r in legacy:
+        try:
+            files = json.loads(r['files_json'])
+        except json.JSONDecodeError:
+            continue
+        _write_manifest(conn, r['id'], files, r['created_at'])
+        conn.execute("UPDATE project_versions SET files_json = '{}' WHERE id = ?", (r['id'],))
+
+
+# ============================================
+# BULK WRITES
+# ============================================
+
+def content_hash(content: str) -> str:
+    """Hash stored with each file row; unchanged files are not rewritten."""
+    return hashlib.sha1(content.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def _insert_messages(conn: sqlite3.Connection, project_id: str, messages: list, now: str):
+    """Insert chat messages in one executemany call."""
+    conn.executemany(
+        """INSERT INTO chat_messages
+           (project_id, role, content, msg_type, created_at)
+           VALUES (?, ?, ?, ?, ?)""",
+        [
+            (project_id,
+             msg.get('role', 'system'),
+             msg.get('text', msg.get('content', '')),
+             msg.get('type', msg.get('msg_type', 'message')),
+             msg.get('ts', now) if isinstance(msg.get('ts'), str) else now)
+            for msg in messages
+        ]
+    )
+
+
+def _sync_files(conn: sqlite3.Connection, project_id: str, files: dict, now: str,
+                fingerprints: dict = None) -> tuple:
+    """
+    Make the project's stored files equal `files`, touching only the delta:
+    paths whose content hash differs are upserted, paths no longer present
+    are deleted. Runs inside the caller's transaction.
+
+    `fingerprints` ({path: input fingerprint}, see coder_file_node) is stored
+    with each file. Without it, unchanged files keep theirs and changed files
+    lose it — a fingerprint only describes the content it was recorded with.
+
+    Returns:
+        (upserted_paths, deleted_paths)
+    """
+    stored = {
+        r['file_path']: (r['content_hash'], r['fingerprint'])
+        for r in conn.execute(
+            "SELECT file_path, content_hash, fingerprint FROM generated_files WHERE project_id = ?",
+            (project_id,)
+        )
+    }
+
+    rows, reprinted = [], []
+    for file_path, content in files.items():
+        content_str = content if isinstance(content, str) else str(content)
+        digest = content_hash(content_str)
+        old_digest, old_print = stored.get(file_path, (None, None))
+        fingerprint = fingerprints.get(file_path) if fingerprints is not None else None
+        if old_digest != digest:
+            rows.append((project_id, file_path, content_str, len(content_str), digest,
+                         content_str.count('\n') + 1, fingerprint, now))
+        elif fingerprints is not None and old_print != fingerprint:
+            reprinted.append((fingerprint, project_id, file_path))
+    conn.executemany(
+        """INSERT INTO generated_files
+           (project_id, file_path, content, size, content_hash, lines, fingerprint, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+           ON CONFLICT(project_id, file_path) DO UPDATE SET
+             content = excluded.content,
+             size = excluded.size,
+             content_hash = excluded.content_hash,
+             lines = excluded.lines,
+             fingerprint = excluded.fingerprint,
+             created_at = excluded.created_at""",
+        rows
+    )
+    conn.executemany(
+        "UPDATE generated_files SET fingerprint = ? WHERE project_id = ? AND file_path = ?",
+        reprinted
+    )
+
+    removed = [path for path in stored if path not in files]
+    conn.executemany(
+        "DELETE FROM generated_files WHERE project_id = ? AND file_path = ?",
+        [(project_id, path) for path in removed]
+    )
+    return [row[1] for row in rows], removed
+
+
+# ============================================
+# BLOB STORE
+# ============================================
+
+# Max host parameters per statement on older SQLite builds
+_SQL_VARS = 900
+
+
+def _existing_blobs(conn: sqlite3.Connection, hashes) -> set:
+    hashes = list(hashes)
+    found = set()
+    for i in range(0, len(hashes), _SQL_VARS):
+        chunk = hashes[i:i + _SQL_VARS]
+        found.update(
+            r['hash'] for r in conn.execute(
+                f"SELECT hash FROM blobs WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            )
+        )
+    return found
+
+
+def _put_blobs(conn: sqlite3.Connection, files: dict, now: str) -> dict:
+    """
+    Store the contents of `files` in the blob table; only contents not
+    stored yet are compressed and written.
+
+    Returns:
+        {file_path: blob_hash}
+    """
+    texts, manifest = {}, {}
+    for file_path, content in files.items():
+        content_str = content if isinstance(content, str) else str(content)
+        digest = content_hash(content_str)
+        manifest[file_path] = digest
+        texts[digest] = content_str
+
+    missing = set(texts) - _existing_blobs(conn, texts)
+    conn.executemany(
+        "INSERT OR IGNORE INTO blobs (hash, content, size, created_at) VALUES (?, ?, ?, ?)",
+        [
+            (digest, zlib.compress(texts[digest].encode('utf-8', 'surrogatepass')), len(texts[digest]), now)
+            for digest in missing
+        ]
+    )
+    return manifest
+
+
+def _get_blobs(conn: sqlite3.Connection, hashes) -> dict:
+    """{hash: content} for the given blob hashes."""
+    hashes = list(hashes)
+    contents = {}
+    for i in range(0, len(hashes), _SQL_VARS):
+        chunk = hashes[i:i + _SQL_VARS]
+        for r in conn.execute(
+            f"SELECT hash, content FROM blobs WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+        ):
+            contents[r['hash']] = zlib.decompress(r['content']).decode('utf-8', 'surrogatepass')
+    return contents
+
+
+def _write_manifest(conn: sqlite3.Connection, version_id: int, files: dict, now: str):
+    manifest = _put_blobs(conn, files, now)
+    conn.executemany(
+        "INSERT OR REPLACE INTO version_files (version_id, file_path, blob_hash) VALUES (?, ?, ?)",
+        [(version_id, path, digest) for path, digest in manifest.items()]
+    )
+
+
+def _gc_blobs(conn: sqlite3.Connection):
+    """Drop blobs no version refers to any more."""
+    conn.execute(
+        "DELETE FROM blobs WHERE hash NOT IN (SELECT blob_hash FROM version_files)"
+    )
+
+
 # ============================================
 # PROJECT CRUD
 # ============================================
 
 def save_project(name: str, prompt: str, tech_stack: str,
                  files: dict, messages: list,
-                 project_dir: str = '', status: str = 'complete') -> str:
+                 project_dir: str = '', status: str = 'complete',
+                 fingerprints: dict = None) -> str:
     """
-    Save a new project with its files and chat messages.
-    Returns the project_id (UUID).
+    Save a new project with its files (and their input fingerprints) and
+    chat messages. Returns the project_id (UUID).
     """
     project_id = str(uuid.uuid4())
     now = datetime.utcnow().isoformat()
@@ -124,28 +471,9 @@ def save_project(name: str, prompt: str, tech_stack: str,
              len(files), project_dir, now, now)
         )
 
-        # Save files
-        for file_path, content in files.items():
-            content_str = content if isinstance(content, str) else str(content)
-            conn.execute(
-                """INSERT INTO generated_files
-                   (project_id, file_path, content, size, created_at)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (project_id, file_path, content_str, len(content_str), now)
-            )
-
-        # Save messages
-        for msg in messages:
-            conn.execute(
-                """INSERT INTO chat_messages
-                   (project_id, role, content, msg_type, created_at)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (project_id,
-                 msg.get('role', 'system'),
-                 msg.get('text', msg.get('content', '')),
-                 msg.get('type', msg.get('msg_type', 'message')),
-                 msg.get('ts', now) if isinstance(msg.get('ts'), str) else now)
-            )
+        # Files and messages go in with executemany, all in one transaction
+        _sync_files(conn, project_id, files, now, fingerprints)
+        _insert_messages(conn, project_id, messages, now)
 
         conn.commit()
         return project_id
@@ -154,8 +482,11 @@ def save_project(name: str, prompt: str, tech_stack: str,
 
 
 def update_project(project_id: str, files: dict = None,
-                   status: str = None, name: str = None):
-    """Update an existing project's fields and/or files."""
+                   status: str = None, name: str = None, fingerprints: dict = None):
+    """
+    Update an existing project's fields and/or files (files are synced as a
+    delta, with their input fingerprints when given).
+    """
     now = datetime.utcnow().isoformat()
     conn = _get_conn()
     try:
@@ -179,30 +510,23 @@ def update_project(project_id: str, files: dict = None,
             params
         )
 
-        # Replace files if provided
+        # Sync files if provided: only changed paths are rewritten
         if files is not None:
-            conn.execute(
-                "DELETE FROM generated_files WHERE project_id = ?",
-                (project_id,)
-            )
-            for file_path, content in files.items():
-                content_str = content if isinstance(content, str) else str(content)
-                conn.execute(
-                    """INSERT INTO generated_files
-                       (project_id, file_path, content, size, created_at)
-                       VALUES (?, ?, ?, ?, ?)""",
-                    (project_id, file_path, content_str, len(content_str), now)
-                )
+            _sync_files(conn, project_id, files, now, fingerprints)
 
         conn.commit()
     finally:
         conn.close()
 
 
-def load_project(project_id: str) -> dict | None:
+def load_project(project_id: str, lazy: bool = False) -> dict | None:
     """
     Load a project with all its files, messages, and SDLC stages.
     Returns: { project: {...}, files: {path: content}, messages: [...], sdlc_stages: {...} }
+
+    With lazy=True no file content is read: files is a ProjectFiles mapping
+    that fetches contents on access, and messages holds only the newest
+    page (older pages via get_messages_page(project_id, before=messages_cursor)).
     """
     conn = _get_conn()
     try:
@@ -215,28 +539,6 @@ def load_project(project_id: str) -> dict | None:
 
         project = dict(row)
 
-        # Load files
-        file_rows = conn.execute(
-            "SELECT file_path, content FROM generated_files WHERE project_id = ? ORDER BY file_path",
-            (project_id,)
-        ).fetchall()
-        files = {r['file_path']: r['content'] for r in file_rows}
-
-        # Load messages
-        msg_rows = conn.execute(
-            "SELECT role, content, msg_type, created_at FROM chat_messages WHERE project_id = ? ORDER BY id",
-            (project_id,)
-        ).fetchall()
-        messages = [
-            {
-                'role': r['role'],
-                'text': r['content'],
-                'type': r['msg_type'],
-                'ts': r['created_at'],
-            }
-            for r in msg_rows
-        ]
-
         # Load SDLC stages
         sdlc_rows = conn.execute(
             "SELECT stage_name, stage_data FROM sdlc_stages WHERE project_id = ?",
@@ -248,15 +550,25 @@ def load_project(project_id: str) -> dict | None:
                 sdlc_stages[r['stage_name']] = json.loads(r['stage_data'])
             except json.JSONDecodeError:
                 sdlc_stages[r['stage_name']] = {}
+    finally:
+        conn.close()
 
+    if lazy:
+        page = get_messages_page(project_id)
         return {
             'project': project,
-            'files': files,
-            'messages': messages,
+            'files': ProjectFiles(project_id, get_file_manifest(project_id)),
+            'messages': page['messages'],
+            'messages_cursor': page['next_cursor'],
             'sdlc_stages': sdlc_stages,
         }
-    finally:
-        conn.close()
+
+    return {
+        'project': project,
+        'files': load_files(project_id),
+        'messages': get_messages(project_id),
+        'sdlc_stages': sdlc_stages,
+    }
 
 
 def list_projects() -> list:
@@ -274,12 +586,14 @@ def list_projects() -> list:
 
 
 def delete_project(project_id: str) -> bool:
-    """Delete a project and all its files/messages (CASCADE)."""
+    """Delete a project and all its files/messages/versions (CASCADE) and unused blobs."""
     conn = _get_conn()
     try:
         cursor = conn.execute(
             "DELETE FROM projects WHERE id = ?", (project_id,)
         )
+        if cursor.rowcount:
+            _gc_blobs(conn)
         conn.commit()
         return cursor.rowcount > 0
     finally:
@@ -325,6 +639,319 @@ def get_messages(project_id: str) -> list:
         conn.close()
 
 
+# ============================================
+# LAZY ACCESS (manifests, single files, message pages)
+# ============================================
+
+def get_file_manifest(project_id: str) -> list:
+    """Path, size, line count, content hash and input fingerprint of every file (no contents)."""
+    conn = _get_conn()
+    try:
+        rows = conn.execute(
+            """SELECT file_path, size, lines, content_hash, fingerprint FROM generated_files
+               WHERE project_id = ? ORDER BY file_path""",
+            (project_id,)
+        ).fetchall()
+        return [
+            {'path': r['file_path'], 'size': r['size'], 'lines': r['lines'],
+             'hash': r['content_hash'], 'fingerprint': r['fingerprint']}
+            for r in rows
+        ]
+    finally:
+        conn.close()
+
+
+def load_files(project_id: str, paths=None) -> dict:
+    """{path: content} for `paths` (all files when None), in path order."""
+    conn = _get_conn()
+    try:
+        if paths is None:
+            rows = conn.execute(
+                "SELECT file_path, content FROM generated_files WHERE project_id = ? ORDER BY file_path",
+                (project_id,)
+            ).fetchall()
+        else:
+            paths = list(paths)
+            rows = []
+            for i in range(0, len(paths), _SQL_VARS):
+                chunk = paths[i:i + _SQL_VARS]
+                rows += conn.execute(
+                    f"""SELECT file_path, content FROM generated_files
+                        WHERE project_id = ? AND file_path IN ({','.join('?' * len(chunk))})""",
+                    [project_id, *chunk]
+                ).fetchall()
+            rows.sort(key=lambda r: r['file_path'])
+        return {r['file_path']: r['content'] for r in rows}
+    finally:
+        conn.close()
+
+
+def load_file(project_id: str, file_path: str) -> str | None:
+    """Content of one stored file, or None."""
+    return load_files(project_id, [file_path]).get(file_path)
+
+
+def get_messages_page(project_id: str, before: int = None, limit: int = 50) -> dict:
+    """
+    One page of chat history, newest page first; messages inside a page are
+    in chronological order. Pass next_cursor back as `before` for the
+    previous page (next_cursor is None on the oldest page).
+    """
+    limit = max(1, min(limit, 500))
+    conn = _get_conn()
+    try:
+        rows = conn.execute(
+            """SELECT id, role, content, msg_type, created_at FROM chat_messages
+               WHERE project_id = ? AND id < ? ORDER BY id DESC LIMIT ?""",
+            (project_id, before if before is not None else 2 ** 63 - 1, limit + 1)
+        ).fetchall()
+    finally:
+        conn.close()
+
+    more = len(rows) > limit
+    rows = rows[:limit][::-1]
+    return {
+        'messages': [
+            {
+                'id': r['id'],
+                'role': r['role'],
+                'text': r['content'],
+                'type': r['msg_type'],
+                'ts': r['created_at'],
+            }
+            for r in rows
+        ],
+        'next_cursor': rows[0]['id'] if more and rows else None,
+    }
+
+
+class ProjectFiles(MutableMapping):
+    """
+    Files of a stored project whose contents are read from the database on
+    first access. Paths and metadata come from the manifest up front;
+    writes stay in memory like a plain dict. Thread-safe.
+    """
+
+    def __init__(self, project_id: str, manifest: list):
+        self.project_id = project_id
+        self.meta = {entry['path']: entry for entry in manifest}
+        self._contents = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, path):
+        with self._lock:
+            if path in self._contents:
+                return self._contents[path]
+            if path not in self.meta:
+                raise KeyError(path)
+        content = load_file(self.project_id, path)
+        if content is None:
+            raise KeyError(path)
+        with self._lock:
+            return self._contents.setdefault(path, content)
+
+    def __setitem__(self, path, content):
+        with self._lock:
+            self._contents[path] = content
+            self.meta[path] = {
+                'path': path, 'size': len(content),
+                'lines': content.count('\n') + 1, 'hash': content_hash(content),
+                'fingerprint': None,
+            }
+
+    def __delitem__(self, path):
+        with self._lock:
+            del self.meta[path]
+            self._contents.pop(path, None)
+
+    def __iter__(self):
+        return iter(list(self.meta))
+
+    def __len__(self):
+        return len(self.meta)
+
+    def __contains__(self, path):
+        return path in self.meta
+
+    def loaded(self) -> dict:
+        """Contents read or written so far."""
+        with self._lock:
+            return dict(self._contents)
+
+    def materialize(self) -> dict:
+        """Plain {path: content} dict; missing contents are read in one query."""
+        with self._lock:
+            missing = [p for p in self.meta if p not in self._contents]
+        fetched = load_files(self.project_id, missing) if missing else {}
+        with self._lock:
+            for path, content in fetched.items():
+                self._contents.setdefault(path, content)
+            return {p: self._contents[p] for p in self.meta if p in self._contents}
+
+    def items(self):
+        return self.materialize().items()
+
+    def values(self):
+        return self.materialize().values()
+
+
+# ============================================
+# FULL-TEXT SEARCH (FTS5)
+# ============================================
+
+# External-content FTS5 tables over the source tables (no copy of the text),
+# kept in sync by triggers. Cascading project deletes fire them too.
+_SEARCH_SCHEMA = {
+    "projects_fts": """
+        CREATE VIRTUAL TABLE projects_fts USING fts5(
+            name, prompt, content='projects', content_rowid='rowid', tokenize='porter unicode61');
+        CREATE TRIGGER projects_fts_ai AFTER INSERT ON projects BEGIN
+            INSERT INTO projects_fts(rowid, name, prompt) VALUES (new.rowid, new.name, new.prompt);
+        END;
+        CREATE TRIGGER projects_fts_ad AFTER DELETE ON projects BEGIN
+            INSERT INTO projects_fts(projects_fts, rowid, name, prompt)
+            VALUES ('delete', old.rowid, old.name, old.prompt);
+        END;
+        CREATE TRIGGER projects_fts_au AFTER UPDATE OF name, prompt ON projects BEGIN
+            INSERT INTO projects_fts(projects_fts, rowid, name, prompt)
+            VALUES ('delete', old.rowid, old.name, old.prompt);
+            INSERT INTO projects_fts(rowid, name, prompt) VALUES (new.rowid, new.name, new.prompt);
+        END;
+    """,
+    "files_fts": """
+        CREATE VIRTUAL TABLE files_fts USING fts5(
+            file_path, content, content='generated_files', content_rowid='id');
+        CREATE TRIGGER files_fts_ai AFTER INSERT ON generated_files BEGIN
+            INSERT INTO files_fts(rowid, file_path, content) VALUES (new.id, new.file_path, new.content);
+        END;
+        CREATE TRIGGER files_fts_ad AFTER DELETE ON generated_files BEGIN
+            INSERT INTO files_fts(files_fts, rowid, file_path, content)
+            VALUES ('delete', old.id, old.file_path, old.content);
+        END;
+        CREATE TRIGGER files_fts_au AFTER UPDATE OF file_path, content ON generated_files BEGIN
+            INSERT INTO files_fts(files_fts, rowid, file_path, content)
+            VALUES ('delete', old.id, old.file_path, old.content);
+            INSERT INTO files_fts(rowid, file_path, content) VALUES (new.id, new.file_path, new.content);
+        END;
+    """,
+    "messages_fts": """
+        CREATE VIRTUAL TABLE messages_fts USING fts5(
+            content, content='chat_messages', content_rowid='id', tokenize='porter unicode61');
+        CREATE TRIGGER messages_fts_ai AFTER INSERT ON chat_messages BEGIN
+            INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+        END;
+        CREATE TRIGGER messages_fts_ad AFTER DELETE ON chat_messages BEGIN
+            INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END;
+        CREATE TRIGGER messages_fts_au AFTER UPDATE OF content ON chat_messages BEGIN
+            INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+        END;
+    """,
+}
+
+SEARCH_KINDS = ("project", "file", "message")
+
+# One SELECT per kind; bm25 weights favour names/paths over bodies
+_SEARCH_SQL = {
+    "project": """
+        SELECT 'project' AS kind, p.id AS project_id, p.name AS project_name, p.id AS ref,
+               snippet(projects_fts, -1, char(2), char(3), '…', 16) AS snippet,
+               bm25(projects_fts, 4.0, 1.0) AS rank
+        FROM projects_fts JOIN projects p ON p.rowid = projects_fts.rowid
+        WHERE projects_fts MATCH ?{where}""",
+    "file": """
+        SELECT 'file' AS kind, g.project_id AS project_id, p.name AS project_name, g.file_path AS ref,
+               snippet(files_fts, 1, char(2), char(3), '…', 16) AS snippet,
+               bm25(files_fts, 3.0, 1.0) AS rank
+        FROM files_fts JOIN generated_files g ON g.id = files_fts.rowid
+             JOIN projects p ON p.id = g.project_id
+        WHERE files_fts MATCH ?{where}""",
+    "message": """
+        SELECT 'message' AS kind, m.project_id AS project_id, p.name AS project_name, CAST(m.id AS TEXT) AS ref,
+               snippet(messages_fts, 0, char(2), char(3), '…', 16) AS snippet,
+               bm25(messages_fts) AS rank
+        FROM messages_fts JOIN chat_messages m ON m.id = messages_fts.rowid
+             JOIN projects p ON p.id = m.project_id
+        WHERE messages_fts MATCH ?{where}""",
+}
+
+_search_available = None
+
+
+def _ensure_search_index(conn: sqlite3.Connection):
+    """Create missing FTS5 tables/triggers and index the rows that already exist."""
+    global _search_available
+    existing = {r['name'] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    try:
+        for table, ddl in _SEARCH_SCHEMA.items():
+            if table not in existing:
+                conn.executescript(ddl)
+                conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        _search_available = True
+    except sqlite3.OperationalError as e:
+        # SQLite built without FTS5: everything but search keeps working
+        print(f"⚠️ Full-text search unavailable: {e}")
+        _search_available = False
+
+
+def _fts_query(text: str) -> str:
+    """Free text → FTS5 query: every word must match, as a prefix; no operators."""
+    words = re.findall(r"\w+", text, flags=re.UNICODE)
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def search(query: str, kinds=None, project_id: str = None,
+           limit: int = 20, offset: int = 0) -> dict | None:
+    """
+    Ranked full-text search over project names/prompts, file paths/contents
+    and chat messages. Snippets mark matches with <mark>…</mark>.
+    Returns None when this SQLite has no FTS5, else:
+        {results: [{kind, project_id, project_name, ref, snippet, rank}],
+         total, limit, offset, next_offset}
+    where ref is the project id, file path or message id.
+    """
+    if not _search_available:
+        return None
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+    kinds = [k for k in (kinds or SEARCH_KINDS) if k in _SEARCH_SQL]
+    match = _fts_query(query)
+    if not match or not kinds:
+        return {'results': [], 'total': 0, 'limit': limit, 'offset': offset, 'next_offset': None}
+
+    where = " AND p.id = ?" if project_id else ""
+    params = [match, project_id] if project_id else [match]
+    union = " UNION ALL ".join(_SEARCH_SQL[k].format(where=where) for k in kinds)
+
+    conn = _get_conn()
+    try:
+        rows = conn.execute(
+            f"SELECT * FROM ({union}) ORDER BY rank LIMIT ? OFFSET ?",
+            params * len(kinds) + [limit, offset]
+        ).fetchall()
+        total = conn.execute(
+            f"SELECT COUNT(*) FROM ({union})", params * len(kinds)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+    results = []
+    for r in rows:
+        result = dict(r)
+        # Snippets are HTML: escape the stored text, then turn the match markers into <mark>
+        result['snippet'] = html.escape(result['snippet'] or '').replace('\x02', '<mark>').replace('\x03', '</mark>')
+        results.append(result)
+
+    return {
+        'results': results,
+        'total': total,
+        'limit': limit,
+        'offset': offset,
+        'next_offset': offset + limit if offset + limit < total else None,
+    }
+
+
 # ============================================
 # SDLC STAGE PERSISTENCE
 # ============================================
@@ -373,6 +1000,7 @@ def load_sdlc_stages(project_id: str) -> dict:
 def save_version(project_id: str, files: dict, label: str = '') -> int:
     """
     Save a snapshot of the current files as a version.
+    Only file contents not already in the blob store are written.
     Returns the version number.
     """
     now = datetime.utcnow().isoformat()
@@ -385,13 +1013,13 @@ def save_version(project_id: str, files: dict, label: str = '') -> int:
         ).fetchone()
         ver = row['next_ver']
 
-        files_json = json.dumps(files, default=str)
-        conn.execute(
+        cursor = conn.execute(
             """INSERT INTO project_versions
-               (project_id, version_num, label, files_json, file_count, created_at)
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (project_id, ver, label or f"Version {ver}", files_json, len(files), now)
+               (project_id, version_num, label, file_count, created_at)
+               VALUES (?, ?, ?, ?, ?)""",
+            (project_id, ver, label or f"Version {ver}", len(files), now)
         )
+        _write_manifest(conn, cursor.lastrowid, files, now)
         conn.commit()
         return ver
     finally:
@@ -416,23 +1044,53 @@ def list_versions(project_id: str) -> list:
 def restore_version(project_id: str, version_num: int) -> dict | None:
     """
     Restore files from a specific version.
-    Also saves current files as a new version before restoring.
+    Files whose content is unchanged are taken from the current rows; only
+    the blobs of files that differ are read and decompressed.
     Returns the restored files dict or None if not found.
     """
+    now = datetime.utcnow().isoformat()
     conn = _get_conn()
     try:
         row = conn.execute(
-            "SELECT files_json FROM project_versions WHERE project_id = ? AND version_num = ?",
+            "SELECT id FROM project_versions WHERE project_id = ? AND version_num = ?",
             (project_id, version_num)
         ).fetchone()
 
         if not row:
             return None
 
-        restored_files = json.loads(row['files_json'])
+        manifest = {
+            r['file_path']: r['blob_hash']
+            for r in conn.execute(
+                "SELECT file_path, blob_hash FROM version_files WHERE version_id = ? ORDER BY file_path",
+                (row['id'],)
+            )
+        }
+        current = {
+            r['file_path']: r
+            for r in conn.execute(
+                "SELECT file_path, content, content_hash FROM generated_files WHERE project_id = ?",
+                (project_id,)
+            )
+        }
+
+        unchanged = {
+            path for path, digest in manifest.items()
+            if path in current and current[path]['content_hash'] == digest
+        }
+        blobs = _get_blobs(conn, {manifest[p] for p in manifest if p not in unchanged})
+        restored_files = {
+            path: current[path]['content'] if path in unchanged else blobs[digest]
+            for path, digest in manifest.items()
+        }
 
         # Update the project's current files
-        update_project(project_id, files=restored_files)
+        conn.execute(
+            "UPDATE projects SET updated_at = ?, file_count = ? WHERE id = ?",
+            (now, len(restored_files), project_id)
+        )
+        _sync_files(conn, project_id, restored_files, now)
+        conn.commit()
 
         return restored_files
     finally:
@@ -0,0 +1,150 @@
+"""
+event_bus.py
+------------
+In-process publish/subscribe for UI state updates.
+- publish() stamps each event with an increasing id and keeps a short replay history
+- Every subscriber gets its own bounded queue and blocks on it (no polling)
+- Last-Event-ID resume replays the events a reconnecting client missed
+- Backpressure: a subscriber whose queue overflows is not allowed to slow
+  down publishers — its backlog is dropped and replaced by one RESYNC event,
+  after which the client re-reads the full state
+"""
+
+import queue
+import threading
+from collections import deque
+
+RESYNC = "resync"
+UPDATE = "update"
+
+DEFAULT_HISTORY = 500
+DEFAULT_QUEUE_SIZE = 256
+
+
+class Event:
+    __slots__ = ("id", "type", "data")
+
+    def __init__(self, event_id: int, event_type: str, data: dict = None):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+
+
+class Subscription:
+    """One consumer's bounded event queue."""
+
+    def __init__(self, bus, maxsize: int):
+        self.bus = bus
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._resync_pending = False
+        self.overflows = 0
+
+    def _offer(self, event: Event):
+        with self._lock:
+            if self._resync_pending:
+                return          # the pending RESYNC already covers this event
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                pass
+            # Slow client: drop its backlog, tell it to re-read the state instead
+            self.overflows += 1
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._queue.put_nowait(Event(event.id, RESYNC))
+            self._resync_pending = True
+
+    def get(self, timeout: float = None) -> Event | None:
+        """Next event, or None if nothing arrived within `timeout` seconds."""
+        try:
+            event = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if event.type == RESYNC:
+            with self._lock:
+                self._resync_pending = False
+        return event
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """Fan-out of state updates to SSE streams and other listeners. Thread-safe."""
+
+    def __init__(self, history: int = DEFAULT_HISTORY, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=history)
+        self._subscribers = []
+        self._listeners = []
+        self._last_id = 0
+        self.published = 0
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, data: dict, event_type: str = UPDATE) -> int:
+        """Publish an event to every subscriber and listener; returns its id."""
+        with self._lock:
+            self._last_id += 1
+            event = Event(self._last_id, event_type, data)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+            listeners = list(self._listeners)
+            self.published += 1
+
+        for sub in subscribers:
+            sub._offer(event)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"   ⚠️ Event listener error: {e}")
+        return event.id
+
+    def subscribe(self, last_event_id: int = None) -> Subscription:
+        """
+        Register a subscriber. With `last_event_id`, missed events are replayed
+        first — or a RESYNC event if they are no longer in the history.
+        """
+        sub = Subscription(self, self.queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                oldest = self._history[0].id if self._history else self._last_id + 1
+                if last_event_id > self._last_id or last_event_id < oldest - 1:
+                    # Unknown id (server restarted) or history already evicted
+                    sub._queue.put_nowait(Event(self._last_id, RESYNC))
+                    sub._resync_pending = True
+                else:
+                    for event in self._history:
+                        if event.id > last_event_id:
+                            sub._offer(event)
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def add_listener(self, listener):
+        """Call `listener(event)` synchronously on every publish (e.g. a SocketIO bridge)."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "last_event_id": self._last_id,
+                "published": self.published,
+                "subscribers": len(self._subscribers),
+                "history": len(self._history),
+                "overflows": sum(s.overflows for s in self._subscribers),
+            }
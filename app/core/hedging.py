@@ -0,0 +1,97 @@
+"""
+hedging.py
+----------
+Hedged LLM requests for latency-critical roles.
+- Tracks primary-provider latency per role
+- Derives the hedge deadline from a latency percentile (p95 by default)
+- Counts how often the hedge fired and which provider won
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import HEDGING
+
+_LATENCY_WINDOW = 50
+
+
+class HedgeTracker:
+    """Latency window + win counters for one role. Thread-safe."""
+
+    def __init__(self, role: str):
+        self.role = role
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=_LATENCY_WINDOW)
+        self.calls = 0
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+
+    def observe_primary_latency(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on the primary before firing the hedge."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < HEDGING["min_samples"]:
+            return HEDGING["default_delay"]
+        index = min(len(latencies) - 1, int(round(HEDGING["percentile"] / 100 * (len(latencies) - 1))))
+        return min(max(latencies[index], HEDGING["min_delay"]), HEDGING["max_delay"])
+
+    def record(self, hedged: bool, hedge_won: bool = False):
+        with self._lock:
+            self.calls += 1
+            if hedged:
+                self.hedges_fired += 1
+            if hedge_won:
+                self.hedge_wins += 1
+            else:
+                self.primary_wins += 1
+
+    def snapshot(self) -> dict:
+        delay = self.hedge_delay()
+        with self._lock:
+            return {
+                "role": self.role,
+                "calls": self.calls,
+                "hedges_fired": self.hedges_fired,
+                "hedge_wins": self.hedge_wins,
+                "primary_wins": self.primary_wins,
+                "hedge_win_rate": round(self.hedge_wins / self.hedges_fired, 3) if self.hedges_fired else 0.0,
+                "current_delay": round(delay, 2),
+                "samples": len(self._latencies),
+            }
+
+
+_TRACKERS = {}
+_TRACKERS_LOCK = threading.Lock()
+_executor = None
+
+
+def is_hedged_role(role: str) -> bool:
+    return role in HEDGING["roles"]
+
+
+def get_hedge_tracker(role: str) -> HedgeTracker:
+    with _TRACKERS_LOCK:
+        if role not in _TRACKERS:
+            _TRACKERS[role] = HedgeTracker(role)
+        return _TRACKERS[role]
+
+
+def get_hedge_executor() -> ThreadPoolExecutor:
+    """Shared pool for the sync hedging path (losers finish in the background)."""
+    global _executor
+    with _TRACKERS_LOCK:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=HEDGING["max_threads"], thread_name_prefix="llm-hedge")
+        return _executor
+
+
+def get_hedge_stats() -> list:
+    with _TRACKERS_LOCK:
+        trackers = list(_TRACKERS.values())
+    return [t.snapshot() for t in trackers]
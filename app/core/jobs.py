@@ -0,0 +1,252 @@
+"""
+jobs.py
+-------
+Bounded pool of pipeline workers for the web UI.
+- A fixed number of worker threads run pipelines (PIPELINE_WORKERS)
+- Every submission is a Job with an id, status and timestamps
+- Queued jobs are served by priority (chat refinements ahead of full
+  generations), and round-robin across owners (sessions) within a priority,
+  so one busy session cannot starve the others
+- Cancellation: a queued job is dropped; a running job is flagged and stops
+  at its next check_cancelled() (called between pipeline nodes)
+"""
+
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from .config import PIPELINE_WORKERS
+
+# Lower runs first
+JOB_PRIORITIES = {
+    "chat": 0,
+    "stage": 1,
+    "generation": 2,
+}
+DEFAULT_PRIORITY = 1
+JOB_HISTORY = 200
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_current_job = contextvars.ContextVar("current_job", default=None)
+
+
+class JobCancelled(BaseException):
+    """
+    Raised inside a running job once cancellation was requested.
+    A BaseException (like asyncio.CancelledError) so pipeline code that
+    catches Exception to report errors does not swallow it.
+    """
+
+
+class Job:
+    def __init__(self, owner: str, kind: str, fn, args: tuple, on_done=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.owner = owner
+        self.kind = kind
+        self.priority = JOB_PRIORITIES.get(kind, DEFAULT_PRIORITY)
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done            # on_done(job), called once the job ends for any reason
+        self.status = QUEUED
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "owner": self.owner,
+            "kind": self.kind,
+            "priority": self.priority,
+            "status": self.status,
+            "cancel_requested": self.cancel_requested,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def current_job() -> Job | None:
+    """The job running in this context (propagates into LangGraph node threads)."""
+    return _current_job.get()
+
+
+def check_cancelled():
+    """Raise JobCancelled if the job running in this context was asked to stop."""
+    job = _current_job.get()
+    if job is not None and job.cancel_requested:
+        raise JobCancelled(job.id)
+
+
+class FairWorkerPool:
+    """Fixed worker threads; per-priority, per-owner FIFO queues served round-robin. Thread-safe."""
+
+    def __init__(self, workers: int = None, history: int = JOB_HISTORY):
+        self.workers = max(1, workers or PIPELINE_WORKERS)
+        self.history = history
+        self._cond = threading.Condition()
+        self._queues = {}          # priority -> {owner -> deque of Job}
+        self._order = {}           # priority -> deque of owners with queued jobs, in service order
+        self._jobs = OrderedDict() # job id -> Job (queued, running and the last `history` finished)
+        self._running = 0
+        self._threads = []
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            th = threading.Thread(target=self._worker, name=f"pipeline-worker-{i}", daemon=True)
+            th.start()
+            self._threads.append(th)
+
+    def submit(self, owner: str, kind: str, fn, *args, on_done=None) -> Job:
+        """Queue `fn(*args)` for `owner`; `kind` picks the priority (see JOB_PRIORITIES)."""
+        job = Job(owner, kind, fn, args, on_done)
+        with self._cond:
+            self._ensure_started()
+            queues = self._queues.setdefault(job.priority, {})
+            queue = queues.setdefault(owner, deque())
+            if not queue:
+                self._order.setdefault(job.priority, deque()).append(owner)
+            queue.append(job)
+            self._jobs[job.id] = job
+            self._cond.notify()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner: str = None) -> list:
+        with self._cond:
+            return [j for j in self._jobs.values() if owner is None or j.owner == owner]
+
+    def position(self, job: Job) -> int:
+        """Jobs that will start before `job` (0 when running or next in line)."""
+        with self._cond:
+            if job.status != QUEUED:
+                return 0
+            ahead = 0
+            for priority in sorted(self._queues):
+                if priority < job.priority:
+                    ahead += sum(len(q) for q in self._queues[priority].values())
+                elif priority == job.priority:
+                    ahead += self._position_in_level(job)
+            return ahead
+
+    def _position_in_level(self, job: Job) -> int:
+        # Replay the round-robin rotation until `job` comes up
+        queues = {owner: deque(q) for owner, q in self._queues[job.priority].items()}
+        order = deque(self._order[job.priority])
+        ahead = 0
+        while order:
+            owner = order.popleft()
+            if queues[owner].popleft() is job:
+                break
+            ahead += 1
+            if queues[owner]:
+                order.append(owner)
+        return ahead
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a job: drop it if still queued, otherwise ask it to stop. Returns the job."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            job._cancel.set()
+            if job.status != QUEUED:
+                return job
+            queues = self._queues[job.priority]
+            queues[job.owner].remove(job)
+            if not queues[job.owner]:
+                del queues[job.owner]
+                self._order[job.priority].remove(job.owner)
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            self._trim_locked()
+        self._finish(job)
+        return job
+
+    def _next(self) -> Job:
+        priority = min(p for p, order in self._order.items() if order)
+        order = self._order[priority]
+        owner = order.popleft()
+        queue = self._queues[priority][owner]
+        job = queue.popleft()
+        if queue:
+            order.append(owner)       # back of the line — round-robin
+        else:
+            del self._queues[priority][owner]
+        return job
+
+    def _has_work(self) -> bool:
+        return any(self._order.values())
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._has_work():
+                    self._cond.wait()
+                job = self._next()
+                job.status = RUNNING
+                job.started_at = time.time()
+                self._running += 1
+
+            token = _current_job.set(job)
+            try:
+                job.fn(*job.args)
+                job.status = DONE
+            except JobCancelled:
+                job.status = CANCELLED
+            except Exception as e:
+                job.status = FAILED
+                job.error = str(e)
+                print(f"   ⚠️ Pipeline worker error: {e}")
+            finally:
+                _current_job.reset(token)
+                job.finished_at = time.time()
+                with self._cond:
+                    self._running -= 1
+                    self._trim_locked()
+                self._finish(job)
+
+    def _finish(self, job: Job):
+        if job.on_done is None:
+            return
+        try:
+            job.on_done(job)
+        except Exception as e:
+            print(f"   ⚠️ Job callback error: {e}")
+
+    def _trim_locked(self):
+        finished = [j.id for j in self._jobs.values() if j.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queued": sum(len(q) for level in self._queues.values() for q in level.values()),
+                "queued_owners": len({o for order in self._order.values() for o in order}),
+            }
@@ -2,8 +2,14 @@
 llm.py
 ------
 Multi-provider LLM with auto-fallback and retry.
-- Tries primary provider first (Groq)
+- Serves byte-identical prompts from the response cache (see llm_cache.py)
+- Admits calls against per-model RPM/TPM budgets (see rate_limiter.py)
+- Tracks provider health with a circuit breaker (see circuit_breaker.py)
+- Tries primary provider first (Groq); if it is over budget or its circuit
+  is open, goes straight to fallback
 - If rate-limited, tries fallback (Gemini)
+- Opt-in roles hedge: if the primary is slower than its recent p95, the same
+  request goes to the fallback and the first answer wins (see hedging.py)
 - If both fail, waits and retries (up to 2 retries)
 """
 
@@ -13,13 +19,25 @@ import random
 import re
 import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, wait as wait_futures
+from functools import partial
 from langchain_groq import ChatGroq
 from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from .llm_cache import get_response_cache, make_cache_key
+from .circuit_breaker import get_breaker, get_breaker_stats
+from .hedging import get_hedge_executor, get_hedge_stats, get_hedge_tracker, is_hedged_role
+from .rate_limiter import (
+    RateBudgetExceeded, admit, await_budget, estimate_tokens, expected_output_tokens, get_budget,
+    get_rate_limit_stats, output_tokens_from_result, record_output_tokens, usage_from_result,
+    wait_for_budget,
+)
 from .config import (
     get_groq_api_key, get_google_api_key,
     GROQ_MODEL, SDLC_LLM_PROVIDER, SDLC_GROQ_MODEL, SDLC_GEMINI_MODEL,
-    TOKEN_LIMITS,
+    TOKEN_LIMITS, LLM_CONCURRENCY, ADMISSION_MAX_WAIT_SECONDS, CIRCUIT_BREAKER,
 )
 
 logger = logging.getLogger(__name__)
@@ -108,6 +126,8 @@ def _extract_retry_delay(e):
 class FallbackLLM(BaseChatModel):
     """
     Wrapper that tries primary → fallback → retry with delay.
+    Responses are cached by content; pass bypass_cache=True to
+    invoke() to force a fresh call (the new response replaces the entry).
     """
     primary: BaseChatModel
     fallback: BaseChatModel = None
@@ -125,97 +145,413 @@ class FallbackLLM(BaseChatModel):
     def _provider_name(provider: BaseChatModel) -> str:
         return type(provider).__name__
 
+    @staticmethod
+    def _model_name(provider: BaseChatModel) -> str:
+        return getattr(provider, "model_name", None) or getattr(provider, "model", "") or ""
+
+    def _cache_key(self, messages, stop) -> str:
+        return make_cache_key(
+            self.role_name,
+            self._model_name(self.primary),
+            getattr(self.primary, "temperature", None),
+            messages,
+            stop,
+        )
+
+    @staticmethod
+    def _result_from_cache(entry: dict) -> ChatResult:
+        message = AIMessage(content=entry["content"], response_metadata=entry.get("metadata", {}))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _store_in_cache(self, cache, key: str, result: ChatResult):
+        try:
+            message = result.generations[0].message
+            if not isinstance(message.content, str) or not message.content:
+                return
+            cache.put(key, self.role_name, self._model_name(self.primary),
+                      message.content, message.response_metadata)
+        except Exception as e:
+            logger.warning("%s: cache write failed: %s", self.role_name, e)
+
+    def _cache_lookup(self, messages, stop, bypass: bool):
+        """Return (cache, key, cached_result) — cache/key are None when caching is off."""
+        cache = get_response_cache()
+        if cache is None:
+            return None, None, None
+        try:
+            key = self._cache_key(messages, stop)
+            entry = None if bypass else cache.get(key)
+        except Exception as e:
+            logger.warning("%s: cache read failed: %s", self.role_name, e)
+            return None, None, None
+        if entry:
+            logger.info("%s: served from response cache", self.role_name)
+            return cache, key, self._result_from_cache(entry)
+        return cache, key, None
+
     def _generate(self, messages, stop=None, run_manager=None, **kwargs):
-        """Try primary → fallback → wait & retry."""
-        last_error = None
-        total_attempts = self.max_retries + 1
+        """Serve from cache, else call providers and cache the response."""
+        bypass = kwargs.pop("bypass_cache", False)
+        cache, key, cached = self._cache_lookup(messages, stop, bypass)
+        if cached:
+            return cached
 
-        for attempt in range(1, total_attempts + 1):
-            # Try primary
-            try:
-                result = self.primary._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
-                if attempt > 1:
-                    logger.info("%s: succeeded on attempt %s/%s", self.role_name, attempt, total_attempts)
-                return result
-            except Exception as e:
-                primary_name = self._provider_name(self.primary)
-                if _is_rate_limit_error(e):
-                    logger.warning("%s: %s rate limited", self.role_name, primary_name)
+        result = self._call_providers(messages, stop=stop, run_manager=run_manager, **kwargs)
+        if cache is not None:
+            self._store_in_cache(cache, key, result)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        """Async path: serve from cache, else call providers and cache the response."""
+        bypass = kwargs.pop("bypass_cache", False)
+        cache, key, cached = self._cache_lookup(messages, stop, bypass)
+        if cached:
+            return cached
+
+        result = await self._acall_providers(messages, stop=stop, run_manager=run_manager, **kwargs)
+        if cache is not None:
+            self._store_in_cache(cache, key, result)
+        return result
+
+    def _budget_for(self, provider: BaseChatModel):
+        return get_budget(get_provider_key(provider), self._model_name(provider))
+
+    @staticmethod
+    def _max_output_tokens(provider: BaseChatModel) -> int:
+        return getattr(provider, "max_tokens", None) or getattr(provider, "max_output_tokens", None) or 0
+
+    def _breaker_for(self, provider: BaseChatModel):
+        if not CIRCUIT_BREAKER["enabled"]:
+            return None
+        return get_breaker(get_provider_key(provider), self._model_name(provider))
+
+    def _admission_plan(self, messages) -> list:
+        """[(provider, budget, breaker, estimated_tokens)] in the order they should be tried."""
+        plan = []
+        for provider in (self.primary, self.fallback):
+            if provider is not None:
+                expected = expected_output_tokens(self.role_name, self._max_output_tokens(provider))
+                est = estimate_tokens(messages, expected)
+                plan.append((provider, self._budget_for(provider), self._breaker_for(provider), est))
+        return plan
+
+    def _admit_provider(self, name: str, budget, breaker, est: int):
+        """Return (lease, wait). lease is None when the provider must be skipped for `wait` seconds."""
+        if breaker is not None and not breaker.allow():
+            logger.info("%s: %s circuit open, skipping", self.role_name, name)
+            return None, breaker.time_until_probe()
+        lease = admit(budget, est)
+        if lease is None:
+            if breaker is not None:
+                breaker.cancel_probe()
+            # Over our local budget — skip instead of spending a round-trip on a 429
+            logger.info("%s: %s over rate budget, skipping", self.role_name, name)
+            return None, budget.time_until(est)
+        return lease, 0.0
+
+    def _log_provider_error(self, e, name: str, is_fallback: bool, prefix: str = ""):
+        if _is_rate_limit_error(e):
+            also = "also " if is_fallback else ""
+            logger.warning("%s: %s %s%srate limited", self.role_name, name, prefix, also)
+        else:
+            logger.warning("%s: %s %serror: %s", self.role_name, name, prefix, str(e)[:140])
+
+    def _usage(self, messages, result) -> int:
+        """
+        Reported token usage, or an estimate (streamed replies often carry none).
+        Also feeds the completion size into the role's expected output.
+        """
+        output = output_tokens_from_result(result)
+        if output is None:
+            output = len(result.generations[0].text) // 4
+        record_output_tokens(self.role_name, output)
+
+        usage = usage_from_result(result)
+        if usage is None:
+            usage = estimate_tokens(messages) + output
+        return usage
+
+    def _invoke_tracked(self, provider, lease, breaker, messages, stop, run_manager, **kwargs):
+        """Call one provider, then settle its lease and record the outcome on its breaker."""
+        started = time.monotonic()
+        try:
+            result = provider._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        except Exception:
+            lease.settle()
+            if breaker is not None:
+                breaker.record_failure(time.monotonic() - started)
+            raise
+        lease.settle(self._usage(messages, result))
+        if breaker is not None:
+            breaker.record_success(time.monotonic() - started)
+        return result
+
+    async def _ainvoke_tracked(self, provider, lease, breaker, messages, stop, run_manager, **kwargs):
+        """Async variant of _invoke_tracked(). A cancelled call (lost hedge) is not a failure."""
+        started = time.monotonic()
+        try:
+            result = await provider._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        except asyncio.CancelledError:
+            lease.settle()
+            if breaker is not None:
+                breaker.cancel_probe()
+            raise
+        except Exception:
+            lease.settle()
+            if breaker is not None:
+                breaker.record_failure(time.monotonic() - started)
+            raise
+        lease.settle(self._usage(messages, result))
+        if breaker is not None:
+            breaker.record_success(time.monotonic() - started)
+        return result
+
+    def _hedging_enabled(self, plan) -> bool:
+        return len(plan) > 1 and is_hedged_role(self.role_name)
+
+    @staticmethod
+    def _observe_primary(tracker, started: float, future):
+        # A cancelled primary still tells us it took at least this long
+        if future.cancelled() or future.exception() is None:
+            tracker.observe_primary_latency(time.monotonic() - started)
+
+    def _call_hedged(self, plan, messages, stop=None, run_manager=None, **kwargs):
+        """
+        Race the primary against a delayed fallback.
+        Returns (result, error); (None, None) means the call was not hedged.
+        """
+        (primary, p_budget, p_breaker, p_est), (fallback, f_budget, f_breaker, f_est) = plan[:2]
+        p_name, f_name = self._provider_name(primary), self._provider_name(fallback)
+        lease, _ = self._admit_provider(p_name, p_budget, p_breaker, p_est)
+        if lease is None:
+            return None, None
+
+        tracker = get_hedge_tracker(self.role_name)
+        delay = tracker.hedge_delay()
+        pool = get_hedge_executor()
+        primary_future = pool.submit(self._invoke_tracked, primary, lease, p_breaker, messages, stop, run_manager, **kwargs)
+        primary_future.add_done_callback(partial(self._observe_primary, tracker, time.monotonic()))
+
+        done, _ = wait_futures([primary_future], timeout=delay)
+        hedged = not done
+        hedge_future = None
+        if hedged or primary_future.exception() is not None:
+            f_lease, _ = self._admit_provider(f_name, f_budget, f_breaker, f_est)
+            if f_lease is not None:
+                if hedged:
+                    logger.info("%s: %s slower than %.1fs, hedging to %s", self.role_name, p_name, delay, f_name)
                 else:
-                    logger.warning("%s: %s error: %s", self.role_name, primary_name, str(e)[:140])
-                last_error = e
+                    logger.info("%s: trying fallback %s", self.role_name, f_name)
+                # The hedge does not stream — tokens from two providers would interleave
+                hedge_future = pool.submit(self._invoke_tracked, fallback, f_lease, f_breaker, messages, stop, None, **kwargs)
+            else:
+                hedged = False
 
-            # Try fallback
-            if self.fallback:
+        last_error = None
+        pending = {primary_future} | ({hedge_future} if hedge_future is not None else set())
+        while pending:
+            done, pending = wait_futures(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                is_hedge = future is hedge_future
                 try:
-                    fallback_name = self._provider_name(self.fallback)
-                    logger.info("%s: trying fallback %s", self.role_name, fallback_name)
-                    return self.fallback._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
-                except Exception as e2:
-                    if _is_rate_limit_error(e2):
-                        logger.warning("%s: %s also rate limited", self.role_name, fallback_name)
+                    result = future.result()
+                except Exception as e:
+                    self._log_provider_error(e, f_name if is_hedge else p_name, is_hedge)
+                    last_error = e
+                    continue
+                # The loser (if any) finishes in the background and settles its own lease
+                tracker.record(hedged, hedge_won=is_hedge)
+                if hedged:
+                    logger.info("%s: hedge %s", self.role_name, f"won ({f_name})" if is_hedge else f"lost ({p_name} answered first)")
+                return result, None
+        return None, last_error
+
+    async def _acall_hedged(self, plan, messages, stop=None, run_manager=None, **kwargs):
+        """Async variant of _call_hedged(). The losing request is cancelled."""
+        (primary, p_budget, p_breaker, p_est), (fallback, f_budget, f_breaker, f_est) = plan[:2]
+        p_name, f_name = self._provider_name(primary), self._provider_name(fallback)
+        lease, _ = self._admit_provider(p_name, p_budget, p_breaker, p_est)
+        if lease is None:
+            return None, None
+
+        tracker = get_hedge_tracker(self.role_name)
+        delay = tracker.hedge_delay()
+        primary_task = asyncio.ensure_future(
+            self._ainvoke_tracked(primary, lease, p_breaker, messages, stop, run_manager, **kwargs)
+        )
+        primary_task.add_done_callback(partial(self._observe_primary, tracker, time.monotonic()))
+
+        hedge_task = None
+        pending = {primary_task}
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            hedged = not done
+            if hedged or primary_task.exception() is not None:
+                f_lease, _ = self._admit_provider(f_name, f_budget, f_breaker, f_est)
+                if f_lease is not None:
+                    if hedged:
+                        logger.info("%s: async %s slower than %.1fs, hedging to %s", self.role_name, p_name, delay, f_name)
                     else:
-                        logger.warning("%s: %s error: %s", self.role_name, fallback_name, str(e2)[:140])
-                    last_error = e2
+                        logger.info("%s: async trying fallback %s", self.role_name, f_name)
+                    hedge_task = asyncio.ensure_future(
+                        self._ainvoke_tracked(fallback, f_lease, f_breaker, messages, stop, None, **kwargs)
+                    )
+                    pending.add(hedge_task)
+                else:
+                    hedged = False
+
+            last_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    is_hedge = task is hedge_task
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        self._log_provider_error(e, f_name if is_hedge else p_name, is_hedge, prefix="async ")
+                        last_error = e
+                        continue
+                    tracker.record(hedged, hedge_won=is_hedge)
+                    if hedged:
+                        logger.info("%s: async hedge %s", self.role_name, f"won ({f_name})" if is_hedge else f"lost ({p_name} answered first)")
+                    return result, None
+            return None, last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _call_providers(self, messages, stop=None, run_manager=None, **kwargs):
+        """Admit → primary → fallback → wait & retry."""
+        last_error = None
+        total_attempts = self.max_retries + 1
+        attempt = 1
+        plan = self._admission_plan(messages)
+        deadline = time.monotonic() + ADMISSION_MAX_WAIT_SECONDS
 
-            # Both failed — wait and retry if we have attempts left
-            if attempt < total_attempts:
+        if self._hedging_enabled(plan):
+            result, last_error = self._call_hedged(plan, messages, stop=stop, run_manager=run_manager, **kwargs)
+            if result is not None:
+                return result
+            if last_error is not None:
+                if attempt >= total_attempts:
+                    raise last_error
                 delay = _extract_retry_delay(last_error)
-                logger.info(
-                    "%s: providers busy, waiting %.1fs before attempt %s/%s",
-                    self.role_name,
-                    delay,
-                    attempt + 1,
-                    total_attempts,
-                )
+                logger.info("%s: hedged call failed, waiting %.1fs before attempt 2/%s", self.role_name, delay, total_attempts)
                 time.sleep(delay)
+                attempt += 1
+
+        while True:
+            skip_waits = []
+            for index, (provider, budget, breaker, est) in enumerate(plan):
+                name = self._provider_name(provider)
+                lease, wait = self._admit_provider(name, budget, breaker, est)
+                if lease is None:
+                    skip_waits.append(wait)
+                    continue
+
+                if index > 0:
+                    logger.info("%s: trying fallback %s", self.role_name, name)
+                try:
+                    result = self._invoke_tracked(provider, lease, breaker, messages, stop, run_manager, **kwargs)
+                except Exception as e:
+                    self._log_provider_error(e, name, index > 0)
+                    last_error = e
+                    continue
 
-        # All retries exhausted
-        raise last_error
+                if attempt > 1:
+                    logger.info("%s: succeeded on attempt %s/%s", self.role_name, attempt, total_attempts)
+                return result
 
-    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
-        """Async path: try primary → fallback → wait & retry."""
+            # Nothing was sent: every provider is over budget or circuit-open,
+            # queue until the first one can take the call
+            if len(skip_waits) == len(plan):
+                wait = max(min(skip_waits), 0.1) + random.uniform(0.0, 0.25)
+                if time.monotonic() + wait > deadline:
+                    raise last_error or RateBudgetExceeded(self.role_name, wait)
+                logger.info("%s: no provider can take the call yet, queueing %.1fs", self.role_name, wait)
+                wait_for_budget([b for _, b, _, _ in plan], wait)
+                continue
+
+            # Providers failed — wait and retry if we have attempts left
+            if attempt >= total_attempts:
+                raise last_error
+            delay = _extract_retry_delay(last_error)
+            if skip_waits:
+                delay = min(delay, min(skip_waits) + random.uniform(0.0, 0.25))
+            logger.info(
+                "%s: providers busy, waiting %.1fs before attempt %s/%s",
+                self.role_name,
+                delay,
+                attempt + 1,
+                total_attempts,
+            )
+            time.sleep(delay)
+            attempt += 1
+
+    async def _acall_providers(self, messages, stop=None, run_manager=None, **kwargs):
+        """Async path: admit → primary → fallback → wait & retry."""
         last_error = None
         total_attempts = self.max_retries + 1
+        attempt = 1
+        plan = self._admission_plan(messages)
+        deadline = time.monotonic() + ADMISSION_MAX_WAIT_SECONDS
 
-        for attempt in range(1, total_attempts + 1):
-            try:
-                result = await self.primary._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
-                if attempt > 1:
-                    logger.info("%s: async succeeded on attempt %s/%s", self.role_name, attempt, total_attempts)
+        if self._hedging_enabled(plan):
+            result, last_error = await self._acall_hedged(plan, messages, stop=stop, run_manager=run_manager, **kwargs)
+            if result is not None:
                 return result
-            except Exception as e:
-                primary_name = self._provider_name(self.primary)
-                if _is_rate_limit_error(e):
-                    logger.warning("%s: %s async rate limited", self.role_name, primary_name)
-                else:
-                    logger.warning("%s: %s async error: %s", self.role_name, primary_name, str(e)[:140])
-                last_error = e
-
-            if self.fallback:
-                fallback_name = self._provider_name(self.fallback)
-                try:
-                    logger.info("%s: async trying fallback %s", self.role_name, fallback_name)
-                    return await self.fallback._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
-                except Exception as e2:
-                    if _is_rate_limit_error(e2):
-                        logger.warning("%s: %s async also rate limited", self.role_name, fallback_name)
-                    else:
-                        logger.warning("%s: %s async error: %s", self.role_name, fallback_name, str(e2)[:140])
-                    last_error = e2
-
-            if attempt < total_attempts:
+            if last_error is not None:
+                if attempt >= total_attempts:
+                    raise last_error
                 delay = _extract_retry_delay(last_error)
-                logger.info(
-                    "%s: async providers busy, waiting %.1fs before attempt %s/%s",
-                    self.role_name,
-                    delay,
-                    attempt + 1,
-                    total_attempts,
-                )
+                logger.info("%s: async hedged call failed, waiting %.1fs before attempt 2/%s", self.role_name, delay, total_attempts)
                 await asyncio.sleep(delay)
+                attempt += 1
+
+        while True:
+            skip_waits = []
+            for index, (provider, budget, breaker, est) in enumerate(plan):
+                name = self._provider_name(provider)
+                lease, wait = self._admit_provider(name, budget, breaker, est)
+                if lease is None:
+                    skip_waits.append(wait)
+                    continue
+
+                if index > 0:
+                    logger.info("%s: async trying fallback %s", self.role_name, name)
+                try:
+                    result = await self._ainvoke_tracked(provider, lease, breaker, messages, stop, run_manager, **kwargs)
+                except Exception as e:
+                    self._log_provider_error(e, name, index > 0, prefix="async ")
+                    last_error = e
+                    continue
+
+                if attempt > 1:
+                    logger.info("%s: async succeeded on attempt %s/%s", self.role_name, attempt, total_attempts)
+                return result
 
-        raise last_error
+            if len(skip_waits) == len(plan):
+                wait = max(min(skip_waits), 0.1) + random.uniform(0.0, 0.25)
+                if time.monotonic() + wait > deadline:
+                    raise last_error or RateBudgetExceeded(self.role_name, wait)
+                logger.info("%s: async no provider can take the call yet, queueing %.1fs", self.role_name, wait)
+                await await_budget([b for _, b, _, _ in plan], wait)
+                continue
+
+            if attempt >= total_attempts:
+                raise last_error
+            delay = _extract_retry_delay(last_error)
+            if skip_waits:
+                delay = min(delay, min(skip_waits) + random.uniform(0.0, 0.25))
+            logger.info(
+                "%s: async providers busy, waiting %.1fs before attempt %s/%s",
+                self.role_name,
+                delay,
+                attempt + 1,
+                total_attempts,
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
 
 
 def get_llm(role: str = "default", streaming: bool = False):
@@ -244,17 +580,68 @@ def get_llm(role: str = "default", streaming: bool = False):
                     role_name=role,
                 )
             elif groq_llm:
+                # Single provider: still wrapped for the response cache, no extra retries
                 logger.info("%s -> Groq (%s)", role, groq_model)
-                _LLM_POOL[cache_key] = groq_llm
+                _LLM_POOL[cache_key] = FallbackLLM(primary=groq_llm, role_name=role, max_retries=0)
             elif gemini_llm:
                 logger.info("%s -> Gemini (%s)", role, SDLC_GEMINI_MODEL)
-                _LLM_POOL[cache_key] = gemini_llm
+                _LLM_POOL[cache_key] = FallbackLLM(primary=gemini_llm, role_name=role, max_retries=0)
             else:
                 raise ValueError(f"No LLM provider available for role '{role}'.")
 
     return _LLM_POOL[cache_key]
 
 
+def get_provider_key(llm) -> str:
+    """Return the provider key ('groq', 'gemini', ...) that serves an LLM instance."""
+    if isinstance(llm, FallbackLLM):
+        llm = llm.primary
+    name = type(llm).__name__.lower()
+    if "groq" in name:
+        return "groq"
+    if "google" in name or "gemini" in name:
+        return "gemini"
+    return "default"
+
+
+def get_concurrency_limit(llm) -> int:
+    """Max number of concurrent calls allowed against the LLM's primary provider."""
+    limit = LLM_CONCURRENCY.get(get_provider_key(llm), LLM_CONCURRENCY.get("default", 2))
+    return max(1, limit)
+
+
+def get_output_token_limit(llm) -> int:
+    """Max output tokens of the LLM's primary provider (0 if unknown); works on bound/configured LLMs."""
+    while hasattr(llm, "bound"):
+        llm = llm.bound
+    if isinstance(llm, FallbackLLM):
+        llm = llm.primary
+    return FallbackLLM._max_output_tokens(llm)
+
+
+def get_cache_stats() -> dict:
+    """Hit/miss counters and size of the LLM response cache."""
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return cache.stats()
+
+
+def get_rate_stats() -> list:
+    """Budget utilisation and queue depth per provider/model."""
+    return get_rate_limit_stats()
+
+
+def get_health_stats() -> list:
+    """Circuit breaker state, error rate and latency per provider/model."""
+    return get_breaker_stats()
+
+
+def get_hedging_stats() -> list:
+    """Hedges fired and won per hedged role."""
+    return get_hedge_stats()
+
+
 def clear_llm_pool():
     """Clear cached LLM instances."""
     global _LLM_POOL
@@ -0,0 +1,212 @@
+"""
+llm_cache.py
+------------
+Content-addressed cache for LLM responses.
+- Keyed on role, model, temperature and a hash of the serialized messages
+- Persisted in SQLite next to workspace/projects.db
+- TTL expiry plus size-bounded LRU eviction
+- Hit/miss counters for observability
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .config import LLM_CACHE_ENABLED, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+# Cache file lives alongside the projects database
+_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'workspace')
+CACHE_PATH = os.path.join(_CACHE_DIR, 'llm_cache.db')
+
+# Run size-based eviction every N writes instead of on every put
+_EVICT_EVERY = 20
+
+
+def _serialize_messages(messages) -> str:
+    """Stable JSON serialization of a list of LangChain messages."""
+    payload = [
+        {"type": getattr(m, "type", type(m).__name__), "content": getattr(m, "content", str(m))}
+        for m in messages
+    ]
+    return json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+
+
+def make_cache_key(role: str, model: str, temperature, messages, stop=None) -> str:
+    """Build the content-addressed key for one LLM call."""
+    messages_hash = hashlib.sha256(_serialize_messages(messages).encode("utf-8")).hexdigest()
+    raw = json.dumps([role, model, temperature, stop, messages_hash], default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed response cache with TTL + LRU eviction. Thread-safe."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+                 max_bytes: int = LLM_CACHE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._writes_since_evict = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections aren't shareable)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key         TEXT PRIMARY KEY,
+                role        TEXT NOT NULL,
+                model       TEXT NOT NULL DEFAULT '',
+                content     TEXT NOT NULL,
+                metadata    TEXT NOT NULL DEFAULT '{}',
+                size        INTEGER NOT NULL DEFAULT 0,
+                created_at  REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_llm_cache_access
+                ON llm_cache(last_access);
+        """)
+        conn.commit()
+
+    def get(self, key: str) -> dict | None:
+        """Return {'content', 'metadata'} for a fresh entry, or None on miss."""
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            "SELECT content, metadata, created_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row and now - row[2] <= self.ttl_seconds:
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            with self._stats_lock:
+                self.hits += 1
+            try:
+                metadata = json.loads(row[1])
+            except json.JSONDecodeError:
+                metadata = {}
+            return {"content": row[0], "metadata": metadata}
+
+        if row:
+            # Expired — drop it now rather than waiting for eviction
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            conn.commit()
+        with self._stats_lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, role: str, model: str, content: str, metadata: dict = None):
+        """Store (or replace) a response."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            """INSERT OR REPLACE INTO llm_cache
+               (key, role, model, content, metadata, size, created_at, last_access)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (key, role, model or "", content, json.dumps(metadata or {}, default=str),
+             len(content.encode("utf-8")), now, now)
+        )
+        conn.commit()
+
+        with self._stats_lock:
+            self.writes += 1
+            self._writes_since_evict += 1
+            run_evict = self._writes_since_evict >= _EVICT_EVERY
+            if run_evict:
+                self._writes_since_evict = 0
+        if run_evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then least-recently-used ones until under max size."""
+        conn = self._conn()
+        removed = conn.execute(
+            "DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+        ).rowcount
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total > self.max_bytes:
+            rows = conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access").fetchall()
+            stale = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                stale.append((key,))
+                total -= size
+            conn.executemany("DELETE FROM llm_cache WHERE key = ?", stale)
+            removed += len(stale)
+        conn.commit()
+
+        if removed:
+            with self._stats_lock:
+                self.evictions += removed
+            logger.info("LLM cache: evicted %s entries", removed)
+        return removed
+
+    def clear(self):
+        """Remove every cached response."""
+        conn = self._conn()
+        conn.execute("DELETE FROM llm_cache")
+        conn.commit()
+
+    def stats(self) -> dict:
+        """Counters plus current entry count / size."""
+        count, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "entries": count,
+                "size_bytes": size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache | None:
+    """Return the process-wide response cache, or None if caching is disabled."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = LLMResponseCache()
+            except sqlite3.Error as e:
+                logger.warning("LLM cache unavailable: %s", e)
+                return None
+    return _cache
@@ -0,0 +1,273 @@
+"""
+rate_limiter.py
+---------------
+Client-side admission control for LLM providers.
+- One token bucket for requests/minute and one for tokens/minute per (provider, model)
+- Calls are admitted BEFORE they are sent, so FallbackLLM can route overflow
+  to the fallback provider instead of waiting for a 429
+- A call reserves its prompt estimate plus the output it is expected to
+  produce (running mean of reported completions per role), not its
+  max_tokens ceiling; reservations are reconciled with the real token usage
+  after each call
+- Exposes queue depth and budget utilisation for monitoring
+"""
+
+import asyncio
+import threading
+import time
+
+from .config import ADMISSION_OUTPUT_RESERVE, RATE_LIMITS, RATE_LIMITS_ENABLED
+
+
+class RateBudgetExceeded(Exception):
+    """Raised when no provider budget frees up within ADMISSION_MAX_WAIT_SECONDS."""
+
+    def __init__(self, role: str, wait: float):
+        super().__init__(f"{role}: local rate_limit budget exhausted (next slot in {wait:.1f}s)")
+        self.role = role
+        self.wait = wait
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled continuously at `rate` per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float("inf")
+
+    def consume(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class Lease:
+    """An admitted call. settle() returns unused token reservation to the bucket."""
+
+    def __init__(self, budget, reserved_tokens: int):
+        self.budget = budget
+        self.reserved_tokens = reserved_tokens
+
+    def settle(self, actual_tokens: int = None):
+        if self.budget is not None:
+            self.budget.release(self, actual_tokens)
+
+
+class ModelBudget:
+    """RPM + TPM budget for one provider/model pair. Thread-safe."""
+
+    def __init__(self, provider: str, model: str, rpm: int, tpm: int):
+        self.provider = provider
+        self.model = model
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = TokenBucket(rpm, rpm / 60.0)
+        self._tokens = TokenBucket(tpm, tpm / 60.0)
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def _clamp(self, est_tokens: int) -> int:
+        # A single call can never need more than a full bucket, or it would never be admitted
+        return max(1, min(int(est_tokens), int(self.tpm)))
+
+    def try_acquire(self, est_tokens: int) -> Lease | None:
+        """Admit a call if both budgets allow it right now; otherwise return None."""
+        est_tokens = self._clamp(est_tokens)
+        with self._lock:
+            now = time.monotonic()
+            if self._requests.time_until(1, now) > 0 or self._tokens.time_until(est_tokens, now) > 0:
+                self.rejected += 1
+                return None
+            self._requests.consume(1)
+            self._tokens.consume(est_tokens)
+            self.admitted += 1
+            self.in_flight += 1
+            return Lease(self, est_tokens)
+
+    def time_until(self, est_tokens: int) -> float:
+        """Seconds until a call of `est_tokens` would be admitted."""
+        est_tokens = self._clamp(est_tokens)
+        with self._lock:
+            now = time.monotonic()
+            return max(self._requests.time_until(1, now), self._tokens.time_until(est_tokens, now))
+
+    def release(self, lease: Lease, actual_tokens: int = None):
+        """Finish a call. Unknown usage (failed call) refunds the whole token reservation."""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            used = actual_tokens if actual_tokens is not None else 0
+            if used < lease.reserved_tokens:
+                self._tokens.refund(lease.reserved_tokens - used)
+            elif used > lease.reserved_tokens:
+                self._tokens.consume(used - lease.reserved_tokens)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            self._requests._refill(now)
+            self._tokens._refill(now)
+            return {
+                "provider": self.provider,
+                "model": self.model,
+                "rpm_limit": self.rpm,
+                "tpm_limit": self.tpm,
+                "rpm_utilisation": round(1 - max(self._requests.tokens, 0) / self.rpm, 3),
+                "tpm_utilisation": round(1 - max(self._tokens.tokens, 0) / self.tpm, 3),
+                "queue_depth": self.waiting,
+                "in_flight": self.in_flight,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+            }
+
+
+_BUDGETS = {}
+_BUDGETS_LOCK = threading.Lock()
+
+
+def _limits_for(provider: str, model: str) -> dict | None:
+    provider_limits = RATE_LIMITS.get(provider)
+    if not provider_limits:
+        return None
+    return provider_limits.get(model) or provider_limits.get("default")
+
+
+def get_budget(provider: str, model: str) -> ModelBudget | None:
+    """Return the shared budget for a provider/model, or None if unlimited."""
+    if not RATE_LIMITS_ENABLED:
+        return None
+    key = (provider, model)
+    with _BUDGETS_LOCK:
+        if key not in _BUDGETS:
+            limits = _limits_for(provider, model)
+            _BUDGETS[key] = ModelBudget(provider, model, limits["rpm"], limits["tpm"]) if limits else None
+        return _BUDGETS[key]
+
+
+def admit(budget: ModelBudget | None, est_tokens: int) -> Lease | None:
+    """Try to admit a call. Unlimited providers always get a no-op lease."""
+    if budget is None:
+        return Lease(None, 0)
+    return budget.try_acquire(est_tokens)
+
+
+def wait_for_budget(budgets: list, seconds: float):
+    """Block for `seconds`, counting the caller in each budget's queue depth."""
+    _mark_waiting(budgets, 1)
+    try:
+        time.sleep(seconds)
+    finally:
+        _mark_waiting(budgets, -1)
+
+
+async def await_budget(budgets: list, seconds: float):
+    """Async variant of wait_for_budget()."""
+    _mark_waiting(budgets, 1)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        _mark_waiting(budgets, -1)
+
+
+def _mark_waiting(budgets: list, delta: int):
+    for budget in budgets:
+        if budget is not None:
+            with budget._lock:
+                budget.waiting += delta
+
+
+def estimate_tokens(messages, max_output_tokens: int = 0) -> int:
+    """Rough token estimate for admission: ~4 chars per token for the prompt + expected output."""
+    chars = 0
+    for m in messages:
+        content = getattr(m, "content", m)
+        chars += len(content) if isinstance(content, str) else len(str(content))
+    return chars // 4 + 8 * len(messages) + int(max_output_tokens or 0)
+
+
+# ============================================
+# EXPECTED OUTPUT PER ROLE
+# ============================================
+
+# Weight of the newest completion in the running mean
+_OUTPUT_EWMA_ALPHA = 0.3
+
+_OUTPUT_MEANS = {}
+_OUTPUT_LOCK = threading.Lock()
+
+
+def expected_output_tokens(role: str, max_output_tokens: int) -> int:
+    """
+    Output tokens to reserve for a call of `role`: the running mean of its
+    reported completions, or ADMISSION_OUTPUT_RESERVE before any were seen;
+    never more than `max_output_tokens`.
+    """
+    with _OUTPUT_LOCK:
+        mean = _OUTPUT_MEANS.get(role)
+    expected = int(mean) if mean is not None else ADMISSION_OUTPUT_RESERVE
+    return min(expected, max_output_tokens) if max_output_tokens else expected
+
+
+def record_output_tokens(role: str, tokens: int):
+    """Feed the completion size of a finished call into its role's running mean."""
+    if not tokens or tokens <= 0:
+        return
+    with _OUTPUT_LOCK:
+        mean = _OUTPUT_MEANS.get(role)
+        _OUTPUT_MEANS[role] = tokens if mean is None else mean + _OUTPUT_EWMA_ALPHA * (tokens - mean)
+
+
+def output_tokens_from_result(result) -> int | None:
+    """Completion tokens reported by the provider, if any."""
+    try:
+        message = result.generations[0].message
+        usage = getattr(message, "usage_metadata", None)
+        if usage and usage.get("output_tokens"):
+            return int(usage["output_tokens"])
+        token_usage = (result.llm_output or {}).get("token_usage") or {}
+        if token_usage.get("completion_tokens"):
+            return int(token_usage["completion_tokens"])
+    except (AttributeError, IndexError, TypeError, ValueError):
+        pass
+    return None
+
+
+def usage_from_result(result) -> int | None:
+    """Extract total tokens used from a ChatResult, if the provider reported it."""
+    try:
+        message = result.generations[0].message
+        usage = getattr(message, "usage_metadata", None)
+        if usage and usage.get("total_tokens"):
+            return int(usage["total_tokens"])
+        token_usage = (result.llm_output or {}).get("token_usage") or {}
+        if token_usage.get("total_tokens"):
+            return int(token_usage["total_tokens"])
+    except (AttributeError, IndexError, TypeError, ValueError):
+        pass
+    return None
+
+
+def get_rate_limit_stats() -> list:
+    """Utilisation and queue depth of every budget seen so far."""
+    with _BUDGETS_LOCK:
+        budgets = [b for b in _BUDGETS.values() if b is not None]
+    return [b.snapshot() for b in budgets]
@@ -0,0 +1,102 @@
+"""
+sessions.py
+-----------
+Per-session working state for the web UI.
+- Each browser session gets its own project state, project id, busy flag,
+  event bus and log buffer instead of sharing module globals
+- Idle sessions are evicted once MAX_SESSIONS is exceeded or after
+  SESSION_IDLE_SECONDS without a request
+"""
+
+import re
+import threading
+import time
+
+from .config import MAX_SESSIONS, SESSION_IDLE_SECONDS
+from .event_bus import EventBus
+
+DEFAULT_SESSION = "default"
+MAX_LOG_LINES = 500
+
+_SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def is_valid_session_id(session_id: str) -> bool:
+    return bool(session_id and _SESSION_ID_RE.match(session_id))
+
+
+class Session:
+    """Working state of one browser session."""
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.state = {}
+        self.lock = threading.Lock()
+        self.active = False        # a pipeline is queued or running
+        self.project_id = None     # active DB project id
+        self.job_id = None         # last pipeline job submitted
+        self.bus = EventBus()
+        self.logs = []
+        self.last_seen = time.monotonic()
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def add_log(self, message: str):
+        """Add a message to the session's log buffer."""
+        self.logs.append(message)
+        if len(self.logs) > MAX_LOG_LINES:
+            self.logs.pop(0)
+
+
+class SessionManager:
+    """Creates, looks up and evicts sessions. Thread-safe."""
+
+    def __init__(self, max_sessions: int = None, idle_seconds: int = None):
+        self.max_sessions = max_sessions or MAX_SESSIONS
+        self.idle_seconds = idle_seconds or SESSION_IDLE_SECONDS
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._on_create = []
+
+    def on_create(self, callback):
+        """Call `callback(session)` for every new session (e.g. to attach bus listeners)."""
+        self._on_create.append(callback)
+
+    def get(self, session_id: str = None) -> Session:
+        session_id = session_id or DEFAULT_SESSION
+        with self._lock:
+            session = self._sessions.get(session_id)
+            created = session is None
+            if created:
+                self._evict_locked()
+                session = Session(session_id)
+                self._sessions[session_id] = session
+        session.touch()
+        if created:
+            for callback in self._on_create:
+                callback(session)
+        return session
+
+    def _evict_locked(self):
+        """Drop idle sessions; never evicts one with a pipeline queued or running."""
+        now = time.monotonic()
+        idle = [s for s in self._sessions.values()
+                if not s.active and s.bus.stats()["subscribers"] == 0]
+        for s in idle:
+            if now - s.last_seen > self.idle_seconds:
+                del self._sessions[s.id]
+        if len(self._sessions) >= self.max_sessions:
+            for s in sorted(idle, key=lambda s: s.last_seen):
+                if len(self._sessions) < self.max_sessions:
+                    break
+                self._sessions.pop(s.id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            "sessions": len(sessions),
+            "active": sum(1 for s in sessions if s.active),
+            "max_sessions": self.max_sessions,
+        }
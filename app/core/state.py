@@ -56,6 +56,7 @@ class ProjectState(TypedDict, total=False):
     generation_issues: Annotated[List[dict], LastValue]
     files_to_regenerate: Annotated[List[str], LastValue]
     failed_file_history: Annotated[List[str], LastValue]
+    file_fingerprints: Annotated[Dict[str, str], LastValue]   # path -> hash of the inputs it was generated from
 
     # ============================================
     # STREAMING & PROGRESS
@@ -0,0 +1,240 @@
+"""
+streaming.py
+------------
+Token streaming of generated files to the browser.
+- web_ui registers a sink with set_file_chunk_sink()
+- Nodes attach a handler per LLM call (file_stream_config / json_files_stream_config)
+  so every token reaches the sink tagged with the file it belongs to;
+  search/replace replies (patch_stream_config) send each file once its edit
+  block has been applied
+- Without a sink nothing is attached and LLM calls stay non-streaming
+- A final "done" event carries the post-processed file, which also covers
+  cache hits and providers that do not stream
+- Events carry the channel (web session) of the pipeline that produced them;
+  set_stream_channel() is called by the worker that runs the pipeline
+"""
+
+import contextvars
+import threading
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Called as sink(channel, event) with event {"path", "chunk", "attempt"} or {"path", "done", "content"}
+_file_chunk_sink = None
+_sink_lock = threading.Lock()
+
+# Channel of the pipeline running in this context (propagates into LangGraph node threads)
+_stream_channel = contextvars.ContextVar("stream_channel", default=None)
+
+
+def set_stream_channel(channel: str):
+    """Tag file chunks produced in the current context with `channel`."""
+    _stream_channel.set(channel)
+
+
+def set_file_chunk_sink(sink):
+    """Register the callable that pushes file chunks to clients (None to disable)."""
+    global _file_chunk_sink
+    with _sink_lock:
+        _file_chunk_sink = sink
+
+
+def is_streaming_enabled() -> bool:
+    return _file_chunk_sink is not None
+
+
+def _emit(event: dict, channel: str = None):
+    sink = _file_chunk_sink
+    if sink is None:
+        return
+    try:
+        sink(channel, event)
+    except Exception as e:
+        # A disconnected client must never break generation
+        print(f"   ⚠️ file_chunk sink error: {e}")
+
+
+def emit_file_done(file_path: str, content: str):
+    """Final (post-processed) content of a streamed file."""
+    _emit({"path": file_path, "done": True, "content": content}, _stream_channel.get())
+
+
+class FileChunkHandler(BaseCallbackHandler):
+    """Forwards every LLM token as a chunk of one known file."""
+
+    def __init__(self, file_path: str, attempt: int = 0):
+        self.file_path = file_path
+        self.attempt = attempt
+        # Tokens may arrive on another thread (hedged calls) — capture the channel now
+        self.channel = _stream_channel.get()
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if token:
+            _emit({"path": self.file_path, "chunk": token, "attempt": self.attempt}, self.channel)
+
+
+class JsonFileChunker:
+    """
+    Incrementally extracts file contents from a streamed reply shaped like
+    {"modified_files": {"path": "content", ...}, ...} and emits them per path.
+    """
+
+    _KEY = '"modified_files"'
+    _ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", '"': '"', "\\": "\\", "/": "/"}
+
+    def __init__(self, emit_chunk):
+        self.emit_chunk = emit_chunk      # emit_chunk(path, text)
+        self.paths = []
+        self._state = "seek"
+        self._pending = ""
+        self._key = ""
+        self._escape = None               # None | "" (after backslash) | "uXXXX" being read
+
+    def feed(self, text: str):
+        if self._state == "seek":
+            self._pending += text
+            index = self._pending.find(self._KEY)
+            if index < 0:
+                self._pending = self._pending[-len(self._KEY):]
+                return
+            text = self._pending[index + len(self._KEY):]
+            self._pending = ""
+            self._state = "object_open"
+
+        out = []
+        for ch in text:
+            state = self._state
+            if state == "value":
+                decoded = self._decode(ch)
+                if decoded is None:
+                    continue
+                if decoded is False:      # closing quote
+                    self._flush(out)
+                    self._state = "key_or_end"
+                    continue
+                out.append(decoded)
+            elif state == "object_open":
+                if ch == "{":
+                    self._state = "key_or_end"
+            elif state == "key_or_end":
+                if ch == '"':
+                    self._key = ""
+                    self._state = "key"
+                elif ch == "}":
+                    self._state = "done"
+            elif state == "key":
+                decoded = self._decode(ch)
+                if decoded is False:
+                    self._state = "colon"
+                elif decoded is not None:
+                    self._key += decoded
+            elif state == "colon":
+                if ch == ":":
+                    self._state = "value_open"
+            elif state == "value_open":
+                if ch == '"':
+                    self.paths.append(self._key)
+                    self._state = "value"
+                elif not ch.isspace():
+                    self._state = "done"  # not a string value — stop extracting
+        self._flush(out)
+
+    def _decode(self, ch: str):
+        """Decode one char of a JSON string: text, None (need more input) or False (string ended)."""
+        if self._escape is None:
+            if ch == "\\":
+                self._escape = ""
+                return None
+            if ch == '"':
+                return False
+            return ch
+        if self._escape == "":
+            if ch == "u":
+                self._escape = "u"
+                return None
+            self._escape = None
+            return self._ESCAPES.get(ch, ch)
+        self._escape += ch
+        if len(self._escape) < 5:
+            return None
+        code, self._escape = self._escape[1:], None
+        try:
+            return chr(int(code, 16))
+        except ValueError:
+            return ""
+
+    def _flush(self, out: list):
+        if out and self.paths:
+            self.emit_chunk(self.paths[-1], "".join(out))
+        out.clear()
+
+
+class JsonFilesChunkHandler(BaseCallbackHandler):
+    """Streams each file of a JSON multi-file reply (chat refinement) as it is written."""
+
+    def __init__(self):
+        channel = _stream_channel.get()
+        self.chunker = JsonFileChunker(
+            lambda path, text: _emit({"path": path, "chunk": text, "attempt": 0}, channel)
+        )
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if token:
+            self.chunker.feed(token)
+
+
+class PatchProgressHandler(BaseCallbackHandler):
+    """
+    Streams a search/replace reply (chat patch mode). Raw edit blocks are not
+    file content, so instead of chunks, each time an edit block completes
+    `apply(reply_so_far)` returns the files patched so far and every file
+    that changed is sent as a "done" event.
+    """
+
+    _BLOCK_END = ">>>>>>> REPLACE"
+
+    def __init__(self, apply):
+        self.apply = apply
+        self.channel = _stream_channel.get()
+        self.text = ""
+        self.sent = {}
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if not token:
+            return
+        self.text += token
+        if self._BLOCK_END not in self.text[-(len(token) + len(self._BLOCK_END)):]:
+            return
+        try:
+            files = self.apply(self.text)
+        except Exception:
+            return  # progress only — the final reply is applied by the node
+        for path, content in files.items():
+            if self.sent.get(path) != content:
+                self.sent[path] = content
+                _emit({"path": path, "done": True, "content": content}, self.channel)
+
+
+def file_stream_config(file_path: str, attempt: int = 0) -> dict:
+    """Runnable config for a call that generates one file ({} when nobody listens)."""
+    if not is_streaming_enabled():
+        return {}
+    return {"callbacks": [FileChunkHandler(file_path, attempt)]}
+
+
+def json_files_stream_config() -> dict:
+    """Runnable config for a call whose reply is a JSON object of modified files."""
+    if not is_streaming_enabled():
+        return {}
+    return {"callbacks": [JsonFilesChunkHandler()]}
+
+
+def patch_stream_config(apply) -> tuple:
+    """
+    Runnable config for a call whose reply is search/replace edits, plus its
+    PatchProgressHandler (None when nobody listens).
+    """
+    if not is_streaming_enabled():
+        return {}, None
+    handler = PatchProgressHandler(apply)
+    return {"callbacks": [handler]}, handler
@@ -3,9 +3,13 @@ graph.py - LangGraph workflow definition.
 Enhanced with SDLC planning stages and stage-gated execution.
 """
 
-from langgraph.graph import StateGraph
+import threading
+import time
+
+from langgraph.graph import END, START, StateGraph
 
 from app.core.state import ProjectState
+from app.core.checkpoint import get_checkpointer
 
 from app.graph.nodes.strategist_node import strategist_node
 from app.graph.nodes.architect_node import architect_node
@@ -38,6 +42,24 @@ def end_node(state: ProjectState) -> ProjectState:
 # SDLC STAGE GRAPHS (stage-gated, one at a time)
 # ============================================
 
+SDLC_STAGE_NODES = {
+    "overview": overview_node,
+    "requirements": requirements_node,
+    "user_research": user_research_node,
+    "task_flows": task_flows_node,
+    "user_stories": user_stories_node,
+}
+
+# Earlier stage outputs each stage's prompt actually reads (see the *_node.py files).
+# Stages whose dependencies are satisfied run in the same LangGraph superstep.
+SDLC_DEPENDENCIES = {
+    "overview": [],
+    "requirements": ["overview"],
+    "user_research": ["overview", "requirements"],
+    "task_flows": ["overview", "requirements", "user_research"],       # roles from user_research
+    "user_stories": ["overview", "requirements", "user_research", "task_flows"],
+}
+
 def build_stage_graph(stage_name: str):
     """
     Build a single-node LangGraph for one SDLC stage.
@@ -47,19 +69,11 @@ def build_stage_graph(stage_name: str):
         stage_name: One of 'overview', 'requirements', 'user_research',
                     'task_flows', 'user_stories'
     """
-    stage_nodes = {
-        "overview": overview_node,
-        "requirements": requirements_node,
-        "user_research": user_research_node,
-        "task_flows": task_flows_node,
-        "user_stories": user_stories_node,
-    }
-
-    if stage_name not in stage_nodes:
+    if stage_name not in SDLC_STAGE_NODES:
         raise ValueError(f"Unknown stage: {stage_name}")
 
     graph = StateGraph(ProjectState)
-    graph.add_node(stage_name, stage_nodes[stage_name])
+    graph.add_node(stage_name, SDLC_STAGE_NODES[stage_name])
     graph.set_entry_point(stage_name)
     graph.set_finish_point(stage_name)
 
@@ -68,6 +82,74 @@ def build_stage_graph(stage_name: str):
     return compiled
 
 
+def _direct_dependencies(dependencies: dict) -> dict:
+    """Drop dependencies already implied through another dependency (transitive reduction)."""
+    def ancestors(stage, seen=None):
+        seen = set() if seen is None else seen
+        for dep in dependencies[stage]:
+            if dep not in seen:
+                seen.add(dep)
+                ancestors(dep, seen)
+        return seen
+
+    direct = {}
+    for stage, deps in dependencies.items():
+        implied = set()
+        for dep in deps:
+            implied |= ancestors(dep)
+        direct[stage] = [d for d in deps if d not in implied]
+    return direct
+
+
+def _without_step(node):
+    """Wrap a node that runs beside another branch so only one of them writes current_step."""
+    def wrapped(state: ProjectState) -> ProjectState:
+        output = node(state)
+        return {k: v for k, v in output.items() if k != "current_step"}
+    wrapped.__name__ = getattr(node, "__name__", "node")
+    return wrapped
+
+
+def _add_sdlc_stages(graph: StateGraph, dependencies: dict = None) -> list:
+    """
+    Add the SDLC stage nodes with fan-out/fan-in edges from their dependencies.
+    Returns the terminal stages (nothing depends on them).
+    """
+    direct = _direct_dependencies(dependencies or SDLC_DEPENDENCIES)
+    dependents = {stage: [s for s, deps in direct.items() if stage in deps] for stage in direct}
+    roots = [stage for stage, deps in direct.items() if not deps]
+    parallel = len(roots) > 1 or any(len(d) > 1 for d in dependents.values())
+
+    for stage in direct:
+        node = SDLC_STAGE_NODES[stage]
+        # Two stages in the same superstep cannot both write the LastValue current_step
+        graph.add_node(stage, _without_step(node) if parallel else node)
+
+    for stage, deps in direct.items():
+        if not deps:
+            graph.add_edge(START, stage)
+        elif len(deps) == 1:
+            graph.add_edge(deps[0], stage)
+        else:
+            graph.add_edge(deps, stage)   # fan-in: waits for every dependency
+
+    return [stage for stage in direct if not dependents[stage]]
+
+
+def build_sdlc_graph():
+    """
+    Build one LangGraph that runs every SDLC stage, ordered by SDLC_DEPENDENCIES
+    instead of a fixed chain — independent stages run concurrently.
+    """
+    graph = StateGraph(ProjectState)
+    for stage in _add_sdlc_stages(graph):
+        graph.add_edge(stage, END)
+
+    compiled = graph.compile()
+    print("✅ SDLC planning graph compiled")
+    return compiled
+
+
 # Stage execution order
 SDLC_STAGES = ["overview", "requirements", "user_research", "task_flows", "user_stories"]
 
@@ -84,27 +166,29 @@ STAGE_LABELS = {
 # CODE GENERATION GRAPH (runs after all SDLC stages approved)
 # ============================================
 
-def build_graph():
+def build_graph(checkpointer=None):
     """
-    Builds the complete generation pipeline including prepended SDLC planning stages:
+    Builds the complete generation pipeline including prepended SDLC planning stages.
+    The strategist only reads the user prompt, so it runs alongside the SDLC stages:
     
-    overview → requirements → user_research → task_flows → user_stories → strategist → architect → coder_plan → coder_file → write_files → test
+    overview → requirements → user_research → task_flows → user_stories ─┐
+    strategist → architect ───────────────────────────────────────────────┴→ coder_plan → coder_file → write_files → test
                                                                                                                         ↓
                                                                                                                   [pass] → preview → end
                                                                                                                   [fail] → repair → ...
+
+    With a `checkpointer`, every step is saved under the run's thread_id and
+    a failed run can resume from its last completed node.
     """
     graph = StateGraph(ProjectState)
 
     # ═══════════ PHASE 0: SDLC PLANNING ═══════════
-    graph.add_node("overview", overview_node)
-    graph.add_node("requirements", requirements_node)
-    graph.add_node("user_research", user_research_node)
-    graph.add_node("task_flows", task_flows_node)
-    graph.add_node("user_stories", user_stories_node)
+    sdlc_tail = _add_sdlc_stages(graph)
 
     # ═══════════ PHASE 1: COGNITION ═══════════
-    graph.add_node("strategist", strategist_node)
-    graph.add_node("architect", architect_node)
+    # Runs beside the SDLC stages, which own current_step until coder_plan
+    graph.add_node("strategist", _without_step(strategist_node))
+    graph.add_node("architect", _without_step(architect_node))
 
     # ═══════════ PHASE 2: MANUFACTURING ═══════════
     graph.add_node("coder_plan", coder_plan_node)
@@ -124,15 +208,9 @@ def build_graph():
     graph.add_node("end", end_node)
 
     # ═══════════ EDGES ═══════════
-    graph.set_entry_point("overview")
-    graph.add_edge("overview", "requirements")
-    graph.add_edge("requirements", "user_research")
-    graph.add_edge("user_research", "task_flows")
-    graph.add_edge("task_flows", "user_stories")
-    graph.add_edge("user_stories", "strategist")
-    
+    graph.add_edge(START, "strategist")
     graph.add_edge("strategist", "architect")
-    graph.add_edge("architect", "coder_plan")
+    graph.add_edge(sdlc_tail + ["architect"], "coder_plan")   # fan-in: planning + architecture
     graph.add_edge("coder_plan", "coder_file")
     graph.add_edge("coder_file", "write_files")
     graph.add_edge("write_files", "test")
@@ -160,11 +238,54 @@ def build_graph():
         },
     )
 
-    compiled = graph.compile()
+    compiled = graph.compile(checkpointer=checkpointer)
     print("✅ Code generation pipeline compiled successfully")
     return compiled
 
 
+def build_code_graph():
+    """
+    Code generation without the SDLC stages, for projects whose stages were
+    already run (web UI). Preview is started by the caller.
+
+    strategist → architect → coder_plan → coder_file → write_files → test
+                                                                     ↓
+                                                          [pass] → end
+                                                          [fail] → repair → coder_file → ...
+    """
+    graph = StateGraph(ProjectState)
+
+    graph.add_node("strategist", strategist_node)
+    graph.add_node("architect", architect_node)
+    graph.add_node("coder_plan", coder_plan_node)
+    graph.add_node("coder_file", coder_file_node)
+    graph.add_node("write_files", write_files_node)
+    graph.add_node("test", test_node)
+    graph.add_node("repair", repair_node)
+    graph.add_node("end", end_node)
+
+    graph.add_edge(START, "strategist")
+    graph.add_edge("strategist", "architect")
+    graph.add_edge("architect", "coder_plan")
+    graph.add_edge("coder_plan", "coder_file")
+    graph.add_edge("coder_file", "write_files")
+    graph.add_edge("write_files", "test")
+    graph.add_conditional_edges(
+        "test",
+        should_repair,
+        {
+            "repair": "repair",
+            "preview": "end",
+            "end": "end",
+        },
+    )
+    graph.add_edge("repair", "coder_file")
+
+    compiled = graph.compile()
+    print("✅ Code-only generation graph compiled")
+    return compiled
+
+
 def build_chat_graph():
     """
     Builds a simpler graph for iterative chat refinement.
@@ -188,3 +309,69 @@ def build_chat_graph():
     compiled = graph.compile()
     print("✅ Chat refinement graph compiled")
     return compiled
+
+
+# ============================================
+# COMPILED GRAPH REGISTRY
+# ============================================
+# Compiled graphs hold no per-run state, so one instance per variant is shared
+# by every concurrent invoke()/stream() call instead of recompiling per request.
+
+_GRAPH_BUILDERS = {
+    "generation": lambda: build_graph(checkpointer=get_checkpointer()),
+    "code": build_code_graph,
+    "chat": build_chat_graph,
+    "sdlc": build_sdlc_graph,
+    **{f"stage:{name}": (lambda name=name: build_stage_graph(name)) for name in SDLC_STAGE_NODES},
+}
+
+_compiled_graphs = {}
+_compile_seconds = {}
+_registry_lock = threading.Lock()
+_build_locks = {name: threading.Lock() for name in _GRAPH_BUILDERS}
+
+
+def get_graph(name: str):
+    """
+    Compiled graph variant by name ('generation', 'code', 'chat', 'sdlc' or 'stage:<stage>'),
+    built on first use and reused afterwards. Thread-safe.
+    """
+    graph = _compiled_graphs.get(name)
+    if graph is not None:
+        return graph
+    if name not in _GRAPH_BUILDERS:
+        raise ValueError(f"Unknown graph: {name}")
+
+    # Per-variant lock: concurrent first calls compile once, other variants are not blocked
+    with _build_locks[name]:
+        graph = _compiled_graphs.get(name)
+        if graph is None:
+            started = time.perf_counter()
+            graph = _GRAPH_BUILDERS[name]()
+            with _registry_lock:
+                _compile_seconds[name] = round(time.perf_counter() - started, 4)
+                _compiled_graphs[name] = graph
+    return graph
+
+
+def get_stage_graph(stage_name: str):
+    """Compiled single-stage graph (see build_stage_graph)."""
+    if stage_name not in SDLC_STAGE_NODES:
+        raise ValueError(f"Unknown stage: {stage_name}")
+    return get_graph(f"stage:{stage_name}")
+
+
+def warm_graphs(names=None) -> dict:
+    """Compile graph variants ahead of the first request; returns compile seconds per graph."""
+    for name in names or _GRAPH_BUILDERS:
+        get_graph(name)
+    return get_graph_stats()["compile_seconds"]
+
+
+def get_graph_stats() -> dict:
+    with _registry_lock:
+        return {
+            "compiled": sorted(_compiled_graphs),
+            "pending": sorted(set(_GRAPH_BUILDERS) - set(_compiled_graphs)),
+            "compile_seconds": dict(_compile_seconds),
+        }
@@ -3,12 +3,25 @@ chat_node.py
 ------------
 Handles iterative refinement of existing projects.
 Takes user follow-up messages and modifies existing code.
+In patch mode (CHAT_PATCH_MODE) the LLM returns search/replace edits
+instead of complete files; files whose edits do not apply cleanly are
+re-requested in full.
+Prompts show the files most relevant to the request in full and the rest
+as summaries (see context_selector.py).
 """
 
 from app.core.state import ProjectState
+from app.core.config import CHAT_PATCH_MODE
 from app.core.llm import get_llm
+from app.core.streaming import (
+    emit_file_done, is_streaming_enabled, json_files_stream_config, patch_stream_config,
+)
+from app.utils.code_validator import validate_edit
 from app.utils.file_ops import normalize_code
+from app.utils.context_selector import pack_context
+from app.utils.patch_sanitizer import apply_patches, parse_edits
 import json
+import re
 
 
 def chat_node(state: ProjectState) -> ProjectState:
@@ -18,25 +31,177 @@ def chat_node(state: ProjectState) -> ProjectState:
     """
     print("\n💬 CHAT: Processing refinement request...")
 
-    llm = get_llm(role="chat")
+    llm = get_llm(role="chat", streaming=is_streaming_enabled())
 
     user_prompt = state.get("user_prompt", "")
     existing_files = state.get("files", {})
     project_scope = state.get("project_scope", {})
+    project_goal = project_scope.get("project_goal", "N/A")
 
-    # Build context from existing code
-    file_summaries = []
-    for file_path, content in existing_files.items():
-        lines = content.split("\n")
-        preview = "\n".join(lines[:40])  # First 40 lines for context
-        file_summaries.append(f"### {file_path}\n```\n{preview}\n```")
+    try:
+        if CHAT_PATCH_MODE:
+            modified_files, summary = refine_with_patches(llm, project_goal, existing_files, user_prompt)
+        else:
+            modified_files, summary = refine_with_full_files(llm, project_goal, existing_files, user_prompt)
+
+        # Merge modified files with existing files
+        updated_files = existing_files.copy()
+        for file_path, content in modified_files.items():
+            updated_files[file_path] = content
+            emit_file_done(file_path, content)
+            print(f"   ✏️ Modified: {file_path}")
+
+        print(f"   📝 Summary: {summary}")
+
+        # Update chat history
+        chat_history = state.get("chat_history", [])
+        chat_history.append({"role": "user", "content": user_prompt})
+        chat_history.append({"role": "assistant", "content": summary})
+
+        return {
+            "files": updated_files,
+            "chat_history": chat_history,
+            "current_step": "chat_complete",
+        }
+
+    except (json.JSONDecodeError, Exception) as e:
+        print(f"   ❌ Failed to parse chat response: {e}")
+
+        chat_history = state.get("chat_history", [])
+        chat_history.append({"role": "user", "content": user_prompt})
+        chat_history.append({"role": "assistant", "content": f"Error: {str(e)}"})
+
+        return {
+            "chat_history": chat_history,
+            "current_step": "chat_error",
+        }
+
+
+# ============================================
+# PATCH MODE
+# ============================================
+
+def refine_with_patches(llm, project_goal: str, existing_files: dict, user_prompt: str):
+    """
+    Ask for search/replace edits and apply them.
+    Returns (modified_files, summary); conflicting files fall back to full content.
+    """
+    # Most relevant files in full (SEARCH needs their exact text), the rest summarized
+    files_context, _ = pack_context(existing_files, user_prompt)
+
+    prompt = f"""You are modifying an existing web application based on a user's follow-up request.
+
+EXISTING PROJECT:
+Goal: {project_goal}
+
+EXISTING FILES:
+{files_context}
+
+USER REQUEST:
+{user_prompt}
+
+INSTRUCTIONS:
+1. Analyze what the user wants changed
+2. Identify which files need modification
+3. Describe every change as one or more SEARCH/REPLACE blocks
+4. To create a new file, use an empty SEARCH section
+5. Do NOT touch files that don't need changes
+
+Output format — a summary line, then the blocks:
+SUMMARY: Brief description of what was changed
+
+FILE: path/to/file
+<<<<<<< SEARCH
+exact existing lines to replace
+=======
+new lines
+>>>>>>> REPLACE
 
-    files_context = "\n\n".join(file_summaries)
+RULES:
+- SEARCH must copy the existing lines EXACTLY (including indentation) and
+  contain just enough lines to be unique in the file
+- Files under OTHER FILES are only summarized; to change one, still write
+  your best SEARCH/REPLACE block for it (its full content will be requested)
+- Use several small blocks rather than one large block
+- Use the same file paths as the existing project
+- Do NOT output complete files, JSON or explanations
+- Do NOT remove or break existing functionality
+"""
+
+    # The editor gets each file as soon as its edit blocks have been applied
+    stream_config, progress = patch_stream_config(
+        lambda reply: apply_patches(existing_files, parse_edits(reply))[0]
+    )
+    response = llm.invoke(prompt, config=stream_config)
+    raw = response.content.strip()
+
+    summary_match = re.search(r"^SUMMARY:\s*(.+)$", raw, re.MULTILINE)
+    summary = summary_match.group(1).strip() if summary_match else "Applied changes"
+
+    edits = parse_edits(raw)
+    if not edits:
+        if "modified_files" in raw:
+            # The model answered in the full-file format anyway
+            return parse_full_files(raw)
+        print("   ⚠️ No edits found in reply — requesting complete files")
+        return refine_with_full_files(llm, project_goal, existing_files, user_prompt)
+
+    modified_files, conflicts = apply_patches(existing_files, edits)
+
+    # An edit can apply cleanly and still break the file (e.g. a dropped
+    # closing brace): such files are re-requested in full like conflicts
+    for file_path in list(modified_files):
+        is_valid, issues = validate_edit(existing_files.get(file_path), modified_files[file_path], file_path)
+        if not is_valid:
+            del modified_files[file_path]
+            conflicts[file_path] = [{"search": "", "reason": f"invalid after patch: {issues[:2]}"}]
+
+    print(f"   🩹 {len(edits)} edit(s): {len(modified_files)} file(s) patched, {len(conflicts)} conflict(s)")
+
+    if conflicts:
+        for file_path, reasons in conflicts.items():
+            print(f"   ⚠️ Patch conflict in {file_path}: {reasons[0]['reason']}")
+        conflicted = {p: existing_files.get(p, "") for p in conflicts}
+        full_files, _ = refine_with_full_files(
+            llm, project_goal, conflicted, user_prompt, context_files=existing_files
+        )
+        modified_files.update({p: c for p, c in full_files.items() if p in conflicts})
+
+    # Streamed previews of files that ended up unchanged are taken back
+    if progress is not None:
+        for file_path in progress.sent:
+            if file_path not in modified_files and file_path in existing_files:
+                emit_file_done(file_path, existing_files[file_path])
+
+    return modified_files, summary
+
+
+# ============================================
+# FULL-FILE MODE
+# ============================================
+
+def refine_with_full_files(llm, project_goal: str, target_files: dict, user_prompt: str,
+                           context_files: dict = None):
+    """
+    Ask for the complete content of every modified file.
+    With `context_files`, only `target_files` (always shown in full) may be
+    rewritten and the rest of the project is packed around them.
+    Returns (modified_files, summary).
+    """
+    if context_files is None:
+        files_context, _ = pack_context(target_files, user_prompt)
+        scope_rule = ("- Use the same file paths as the existing project\n"
+                      "- Only rewrite files shown in full (or create new ones); "
+                      "files under OTHER FILES are summaries, not their content")
+    else:
+        project_files = {**context_files, **target_files}
+        files_context, _ = pack_context(project_files, user_prompt, required=list(target_files))
+        scope_rule = f"- Only output these files: {', '.join(target_files)}"
 
     prompt = f"""You are modifying an existing web application based on a user's follow-up request.
 
 EXISTING PROJECT:
-Goal: {project_scope.get('project_goal', 'N/A')}
+Goal: {project_goal}
 
 EXISTING FILES:
 {files_context}
@@ -62,54 +227,31 @@ Output your response as a JSON object with this structure:
 RULES:
 - Output ONLY valid JSON
 - File contents must be COMPLETE (not diffs or patches)
-- Use the same file paths as the existing project
+{scope_rule}
 - Do NOT remove or break existing functionality
 - Make minimal, targeted changes
 """
 
-    response = llm.invoke(prompt)
-    raw = response.content.strip()
+    # Each modified file streams to the editor as its JSON value is written
+    response = llm.invoke(prompt, config=json_files_stream_config())
+    return parse_full_files(response.content.strip())
+
 
-    # Try to parse the JSON response
+def parse_full_files(raw: str):
+    """Parse a {"modified_files": {...}, "summary": ...} reply into (modified_files, summary)."""
     try:
         # Extract JSON from potential markdown wrapper
         if "```json" in raw:
             raw = raw.split("```json")[1].split("```")[0]
         elif "```" in raw:
             raw = raw.split("```")[1].split("```")[0]
-
         result = json.loads(raw)
-        modified_files = result.get("modified_files", {})
-        summary = result.get("summary", "Applied changes")
-
-        # Merge modified files with existing files
-        updated_files = existing_files.copy()
-        for file_path, content in modified_files.items():
-            updated_files[file_path] = normalize_code(content)
-            print(f"   ✏️ Modified: {file_path}")
-
-        print(f"   📝 Summary: {summary}")
-
-        # Update chat history
-        chat_history = state.get("chat_history", [])
-        chat_history.append({"role": "user", "content": user_prompt})
-        chat_history.append({"role": "assistant", "content": summary})
-
-        return {
-            "files": updated_files,
-            "chat_history": chat_history,
-            "current_step": "chat_complete",
-        }
-
-    except (json.JSONDecodeError, Exception) as e:
-        print(f"   ❌ Failed to parse chat response: {e}")
+    except json.JSONDecodeError:
         print(f"   Raw response: {raw[:200]}...")
+        raise
 
-        chat_history = state.get("chat_history", [])
-        chat_history.append({"role": "user", "content": user_prompt})
-        chat_history.append({"role": "assistant", "content": f"Error: {str(e)}"})
-
-        return {
-            "chat_history": chat_history,
-            "current_step": "chat_error",
-        }
+    modified_files = {
+        file_path: normalize_code(content)
+        for file_path, content in result.get("modified_files", {}).items()
+    }
+    return modified_files, result.get("summary", "Applied changes")
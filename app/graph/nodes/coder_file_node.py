@@ -6,9 +6,15 @@ Enhanced with better prompts, streaming support, and multi-stack awareness.
 """
 
 from app.core.state import ProjectState
-from app.core.llm import get_llm
+from app.core.llm import get_llm, get_concurrency_limit
+from app.core.continuation import invoke_with_continuation
+from app.core.streaming import emit_file_done, file_stream_config, is_streaming_enabled
 from app.utils.file_ops import normalize_code
 from app.utils.code_validator import validate_file
+from app.utils.project_index import ProjectIndex, add_imports, missing_component_imports, route_paths
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import hashlib
 import json
 import re
 
@@ -21,11 +27,15 @@ def coder_file_node(state: ProjectState) -> ProjectState:
     Generates ALL code files based on project_scope and architecture.
     
     - Reads file_plan from state (set by architect)
-    - Generates each file using LLM with appropriate context
-    - Validates and retries if code is truncated
+    - Generates files using LLM with appropriate context; independent
+      files run concurrently (bounded by the provider's concurrency limit)
+    - Finishes replies cut off at the output token cap with continuation
+      requests; validates and retries if code is still truncated
     - Post-processes code for common fixes
+    - Reuses existing files whose input fingerprint (the context slice they
+      are generated from) is unchanged, so re-runs only rebuild what changed
     """
-    llm = get_llm(role="coder")
+    llm = get_llm(role="coder", streaming=is_streaming_enabled())
 
     project_scope = state.get("project_scope", {})
     architecture = state.get("architecture", {})
@@ -46,6 +56,7 @@ def coder_file_node(state: ProjectState) -> ProjectState:
     generated = state.get("files", {}).copy()
     generation_issues = []
     failed_history = state.get("failed_file_history", [])
+    fingerprints = dict(state.get("file_fingerprints") or {})
 
     # If specific files were flagged for regeneration, only generate those
     files_to_regenerate = state.get("files_to_regenerate") or []
@@ -66,77 +77,61 @@ def coder_file_node(state: ProjectState) -> ProjectState:
     }
 
     # ============================================
-    # Generate each target file WITH RETRY
+    # Generate target files in dependency waves
     # ============================================
-    for file_path in targets:
-        print(f"   📄 Generating: {file_path}")
-
-        content = None
-        last_issues = []
-
-        for attempt in range(MAX_FILE_RETRIES):
-            # Determine file type and generate accordingly
-            if file_path.endswith(".py") and "app.py" in file_path:
-                content = generate_backend_file(llm, context, attempt)
-            elif file_path.endswith(".py"):
-                content = generate_python_file(llm, file_path, context)
-            elif "App.jsx" in file_path:
-                backend_code = generated.get("backend/app.py", "")
-                routes = extract_routes(backend_code)
-                content = generate_app_jsx(llm, context, routes, attempt)
-            elif "App.css" in file_path:
-                content = generate_app_css(context)
-                break
-            elif "index.css" in file_path:
-                content = generate_index_css()
-                break
-            elif "main.jsx" in file_path:
-                content = generate_main_jsx()
-                break
-            elif "vite.config" in file_path:
-                content = generate_vite_config()
-                break
-            elif file_path.endswith(".html") and "index" in file_path:
-                content = generate_html_file(project_goal)
-                break
-            elif "package.json" in file_path and "frontend" in file_path:
-                content = generate_package_json(project_goal)
-                break
-            elif "requirements.txt" in file_path:
-                content = generate_requirements_txt()
-                break
-            elif "components/" in file_path and file_path.endswith(".jsx"):
-                comp_info = find_component_info(file_path, components)
-                backend_code = generated.get("backend/app.py", "")
-                routes = extract_routes(backend_code)
-                content = generate_component_file(llm, file_path, comp_info, context, routes)
-            else:
-                content = generate_generic_file(llm, file_path, context)
-                break
-
-            # Validate generated code
-            is_valid, issues = validate_file(content, file_path)
+    # backend/app.py goes first because App.jsx and components read its
+    # routes; everything in a later wave is independent and runs in parallel.
+    max_workers = get_concurrency_limit(llm)
+    waves = build_generation_waves(targets)
+    print(f"   ⚡ {len(waves)} wave(s), up to {max_workers} concurrent LLM calls")
+
+    reused = 0
+    for wave in waves:
+        snapshot = dict(generated)
+
+        # Fingerprints are taken per wave: JSX inputs include the routes of
+        # the backend generated (or reused) by the previous wave
+        wave_prints = {fp: input_fingerprint(fp, context, snapshot) for fp in wave}
+        pending = [
+            fp for fp in wave
+            if fp in files_to_regenerate          # flagged by repair: always rebuild
+            or not snapshot.get(fp)
+            or fingerprints.get(fp) != wave_prints[fp]
+        ]
+        reused += len(wave) - len(pending)
+        if not pending:
+            continue
 
-            if is_valid:
-                print(f"      ✅ Valid on attempt {attempt + 1}")
-                break
-            else:
-                last_issues = issues
-                print(f"      ⚠️ Issues on attempt {attempt + 1}: {issues[:2]}")
-                if attempt < MAX_FILE_RETRIES - 1:
-                    print(f"      🔄 Retrying...")
+        if len(pending) == 1 or max_workers == 1:
+            results = [generate_target_file(llm, fp, context, snapshot) for fp in pending]
         else:
-            print(f"      ❌ Failed after {MAX_FILE_RETRIES} attempts")
-            if file_path in failed_history and "App.jsx" in file_path:
-                print(f"      🛡️ Using template fallback")
-                content = get_fallback_app_jsx(context)
-                generated[file_path] = content
-                continue
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+                # Each task runs in a copy of this context so streamed chunks keep their session
+                futures = [
+                    pool.submit(contextvars.copy_context().run, generate_target_file, llm, fp, context, snapshot)
+                    for fp in pending
+                ]
+                results = [f.result() for f in futures]
+
+        # Merge in plan order so output is deterministic regardless of timing
+        for file_path, (content, failed_issues) in zip(pending, results):
+            if failed_issues is not None:
+                # Not a faithful product of its inputs — rebuild on the next run
+                fingerprints.pop(file_path, None)
+                if file_path in failed_history and "App.jsx" in file_path:
+                    print(f"      🛡️ Using template fallback for {file_path}")
+                    generated[file_path] = get_fallback_app_jsx(context)
+                    continue
+
+                generation_issues.append({"file": file_path, "issues": failed_issues})
+                failed_history.append(file_path)
+            else:
+                fingerprints[file_path] = wave_prints[file_path]
 
-            generation_issues.append({"file": file_path, "issues": last_issues})
-            failed_history.append(file_path)
+            generated[file_path] = content
 
-        generated[file_path] = content
+    if reused:
+        print(f"   ♻️ Reused {reused} file(s) with unchanged inputs")
 
     # ============================================
     # Extract routes for contract testing
@@ -155,10 +150,94 @@ def coder_file_node(state: ProjectState) -> ProjectState:
         "generation_issues": generation_issues,
         "files_to_regenerate": [],
         "failed_file_history": failed_history,
+        "file_fingerprints": fingerprints,
         "current_step": "coder_complete",
     }
 
 
+def build_generation_waves(targets: list) -> list:
+    """
+    Split targets into dependency waves.
+    The Flask backend must exist before any JSX file is generated (they
+    consume its routes); all remaining files are independent of each other.
+    """
+    backend = [fp for fp in targets if fp.endswith(".py") and "app.py" in fp]
+    rest = [fp for fp in targets if fp not in backend]
+    return [wave for wave in (backend, rest) if wave]
+
+
+def generate_target_file(llm, file_path: str, context: dict, generated: dict):
+    """
+    Generate a single file with validation + retry.
+    
+    Returns:
+        (content, failed_issues) — failed_issues is None when the file is valid
+        (or template-based), otherwise the issues from the last attempt.
+    """
+    print(f"   📄 Generating: {file_path}")
+
+    content = None
+    last_issues = []
+
+    for attempt in range(MAX_FILE_RETRIES):
+        # Retries must not be served the same (invalid) cached response
+        call_llm = llm if attempt == 0 else llm.bind(bypass_cache=True)
+        # Stream tokens to the editor tagged with this file (no-op without a listener)
+        stream_config = file_stream_config(file_path, attempt)
+        if stream_config:
+            call_llm = call_llm.with_config(stream_config)
+
+        # Determine file type and generate accordingly
+        if file_path.endswith(".py") and "app.py" in file_path:
+            content = generate_backend_file(call_llm, context, attempt)
+        elif file_path.endswith(".py"):
+            content = generate_python_file(call_llm, file_path, context)
+        elif "App.jsx" in file_path:
+            backend_code = generated.get("backend/app.py", "")
+            routes = extract_routes(backend_code)
+            content = generate_app_jsx(call_llm, context, routes, attempt)
+        elif "App.css" in file_path:
+            return generate_app_css(context), None
+        elif "index.css" in file_path:
+            return generate_index_css(), None
+        elif "main.jsx" in file_path:
+            return generate_main_jsx(), None
+        elif "vite.config" in file_path:
+            return generate_vite_config(), None
+        elif file_path.endswith(".html") and "index" in file_path:
+            return generate_html_file(context["project_goal"]), None
+        elif "package.json" in file_path and "frontend" in file_path:
+            return generate_package_json(context["project_goal"]), None
+        elif "requirements.txt" in file_path:
+            return generate_requirements_txt(), None
+        elif "components/" in file_path and file_path.endswith(".jsx"):
+            comp_info = find_component_info(file_path, context["components"])
+            backend_code = generated.get("backend/app.py", "")
+            routes = extract_routes(backend_code)
+            content = generate_component_file(call_llm, file_path, comp_info, context, routes)
+        else:
+            content = generate_generic_file(call_llm, file_path, context)
+            emit_file_done(file_path, content)
+            return content, None
+
+        # Validate generated code
+        is_valid, issues = validate_file(content, file_path)
+
+        if is_valid:
+            print(f"      ✅ {file_path} valid on attempt {attempt + 1}")
+            emit_file_done(file_path, content)
+            return content, None
+
+        last_issues = issues
+        print(f"      ⚠️ {file_path} issues on attempt {attempt + 1}: {issues[:2]}")
+        if attempt < MAX_FILE_RETRIES - 1:
+            print(f"      🔄 Retrying {file_path}...")
+
+    print(f"      ❌ {file_path} failed after {MAX_FILE_RETRIES} attempts")
+    emit_file_done(file_path, content)
+    return content, last_issues
+
+
 # ============================================
 # FILE GENERATORS
 # ============================================
@@ -233,8 +312,7 @@ OUTPUT RULES:
 
 Generate the complete Flask backend:"""
 
-    response = llm.invoke(prompt)
-    code = normalize_code(response.content)
+    code = normalize_code(invoke_with_continuation(llm, prompt))
     code = fix_backend_code(code)
     return code
 
@@ -315,8 +393,7 @@ OUTPUT RULES:
 
 Generate the complete App.jsx:"""
 
-    response = llm.invoke(prompt)
-    code = normalize_code(response.content)
+    code = normalize_code(invoke_with_continuation(llm, prompt))
     code = fix_app_jsx(code)
     return code
 
@@ -352,8 +429,7 @@ OUTPUT RULES:
 
 Generate the complete component:"""
 
-    response = llm.invoke(prompt)
-    code = normalize_code(response.content)
+    code = normalize_code(invoke_with_continuation(llm, prompt))
     
     # Ensure export default
     if "export default" not in code:
@@ -368,8 +444,7 @@ def generate_python_file(llm, file_path: str, ctx: dict) -> str:
 PROJECT: {ctx['project_goal']}
 FEATURES: {json.dumps(ctx['features'])}
 OUTPUT: Only Python code, no markdown."""
-    response = llm.invoke(prompt)
-    return normalize_code(response.content)
+    return normalize_code(invoke_with_continuation(llm, prompt))
 
 
 def generate_main_jsx() -> str:
@@ -817,14 +892,36 @@ def generate_generic_file(llm, file_path: str, ctx: dict) -> str:
 PROJECT: {ctx['project_goal']}
 FEATURES: {json.dumps(ctx['features'])}
 OUTPUT: Only the file content, no markdown fences."""
-    response = llm.invoke(prompt)
-    return normalize_code(response.content)
+    return normalize_code(invoke_with_continuation(llm, prompt))
 
 
 # ============================================
 # HELPERS
 # ============================================
 
+def input_fingerprint(file_path: str, ctx: dict, generated: dict) -> str:
+    """
+    Hash of the context slice `file_path` is generated from — mirrors what
+    generate_target_file feeds each generator, so unrelated edits (another
+    component, an SDLC stage the file never sees) leave it unchanged.
+    """
+    if file_path.endswith(".py") and "app.py" in file_path:
+        inputs = [ctx["project_goal"], ctx["data_models"], ctx["features"],
+                  ctx["api_routes"] or ctx["api_endpoints"]]
+    elif "App.jsx" in file_path:
+        routes = extract_routes(generated.get("backend/app.py", ""))
+        inputs = [ctx["project_goal"], ctx["features"], ctx["ui_style"],
+                  ctx["components"], ctx["pages"], routes]
+    elif "components/" in file_path and file_path.endswith(".jsx"):
+        routes = extract_routes(generated.get("backend/app.py", ""))
+        inputs = [find_component_info(file_path, ctx["components"]), ctx["project_goal"], routes]
+    else:
+        inputs = [ctx["project_goal"], ctx["features"]]
+
+    payload = json.dumps([file_path, inputs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
 def find_component_info(file_path: str, components: list) -> dict:
     """Find component info from architecture by file path."""
     for comp in components:
@@ -921,57 +1018,22 @@ def fix_backend_code(code: str) -> str:
     return code
 
 
-# PascalCase JSX elements that should NOT be auto-imported
-_JSX_BUILTINS = {
-    'React', 'Fragment', 'Suspense', 'StrictMode', 'Profiler',
-    'App',  # Don't import App from within App.jsx
-}
-
-
 def fix_missing_component_imports(code: str, filename: str = "App.jsx") -> str:
     """
     Scan JSX code for PascalCase component references (e.g. <SearchBar />)
     and inject missing import statements for them.
     """
-    # Find PascalCase tags: <SomeName or <SomeName>
-    used_components = set(re.findall(r'<([A-Z][A-Za-z0-9]+)', code))
-    used_components -= _JSX_BUILTINS
-    if not used_components:
-        return code
-
-    # Gather already-imported names
-    already_imported = set(re.findall(r'import\s+(\w+)\s+from', code))
-    for destructured in re.findall(r'import\s*\{([^}]+)\}\s*from', code):
-        for name in destructured.split(','):
-            already_imported.add(name.strip())
-
-    missing = used_components - already_imported
+    missing = missing_component_imports(code, filename)
     if not missing:
         return code
 
-    # Build import lines
-    new_imports = []
-    for comp in sorted(missing):
-        new_imports.append(f"import {comp} from './components/{comp}';")
-
-    # Insert after the last existing import line
-    lines = code.split('\n')
-    last_import_idx = -1
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        if stripped.startswith('import ') or stripped.startswith('from '):
-            last_import_idx = i
-
-    if last_import_idx >= 0:
-        for j, imp in enumerate(new_imports):
-            lines.insert(last_import_idx + 1 + j, imp)
-    else:
-        lines = new_imports + [''] + lines
+    new_imports = [f"import {comp} from './components/{comp}';" for comp in missing]
+    code = add_imports(code, filename, new_imports)
 
-    comp_names = ', '.join(sorted(missing))
+    comp_names = ', '.join(missing)
     print(f"      \U0001f527 Auto-injected imports in {filename}: {comp_names}")
 
-    return '\n'.join(lines)
+    return code
 
 
 def fix_app_jsx(code: str) -> str:
@@ -1014,16 +1076,10 @@ def fix_app_jsx(code: str) -> str:
 def fix_all_jsx_imports(generated_files: dict) -> dict:
     """
     Post-generation pass: fix missing component imports across all JSX files.
-    Cross-references generated files to know which components exist.
+    Cross-references generated files (via the project index) to know which components exist.
     """
-    # Collect known component names from the generated file set
-    known_components = set()
-    for path in generated_files:
-        if 'components/' in path and path.endswith('.jsx'):
-            name = path.split('/')[-1].replace('.jsx', '')
-            known_components.add(name)
-
-    if not known_components:
+    index = ProjectIndex(generated_files)
+    if not index.component_names():
         return generated_files
 
     fixed_count = 0
@@ -1043,11 +1099,5 @@ def fix_all_jsx_imports(generated_files: dict) -> dict:
 
 
 def extract_routes(code: str) -> list:
-    """Extract Flask routes from backend code."""
-    routes = []
-    pattern = r"@app\.route\(['\"]([^'\"]+)['\"]"
-    for match in re.finditer(pattern, code):
-        route = match.group(1)
-        if route not in routes:
-            routes.append(route)
-    return routes
+    """Extract Flask route paths from backend code (parsed once per content by the project index)."""
+    return route_paths(code)
@@ -18,6 +18,7 @@ from pathlib import Path
 
 from app.core.state import ProjectState
 from app.core.config import PREVIEW_BACKEND_PORT, PREVIEW_FRONTEND_PORT
+from app.utils.project_index import add_imports, index_file, missing_component_imports
 
 # Global process handles
 _backend_process = None
@@ -351,12 +352,6 @@ def _patch_frontend_localhost_refs(frontend_dir: Path):
     if count > 0:
         print(f"   🔧 Patched {count} frontend files: removed hardcoded localhost URLs")
 
-# PascalCase JSX elements that should NOT be auto-imported
-_JSX_BUILTINS = {
-    'React', 'Fragment', 'Suspense', 'StrictMode', 'Profiler', 'App',
-}
-
-
 def _patch_missing_jsx_imports(frontend_dir: Path):
     """
     Safety net at preview time: scan all .jsx files in src/ for PascalCase
@@ -382,47 +377,18 @@ def _patch_missing_jsx_imports(frontend_dir: Path):
     for jsx_file in src_dir.rglob("*.jsx"):
         try:
             content = jsx_file.read_text(encoding="utf-8")
-            original = content
-
-            # Find PascalCase tags used in JSX
-            used = set(re.findall(r'<([A-Z][A-Za-z0-9]+)', content))
-            used -= _JSX_BUILTINS
-
-            # Find already-imported names
-            imported = set(re.findall(r'import\s+(\w+)\s+from', content))
-            for d in re.findall(r'import\s*\{([^}]+)\}\s*from', content):
-                for name in d.split(','):
-                    imported.add(name.strip())
+            rel_path = jsx_file.relative_to(frontend_dir).as_posix()
 
-            missing = used - imported
             # Only add imports for components that exist on disk
-            missing = missing & known_components
-
+            missing = [c for c in missing_component_imports(content, rel_path) if c in known_components]
             if not missing:
                 continue
 
-            # Build import lines
-            new_imports = [f"import {c} from './components/{c}';" for c in sorted(missing)]
-
-            # Insert after last import line
-            lines = content.split('\n')
-            last_imp = -1
-            for i, line in enumerate(lines):
-                stripped = line.strip()
-                if stripped.startswith('import ') or stripped.startswith('from '):
-                    last_imp = i
-
-            if last_imp >= 0:
-                for j, imp in enumerate(new_imports):
-                    lines.insert(last_imp + 1 + j, imp)
-            else:
-                lines = new_imports + [''] + lines
-
-            content = '\n'.join(lines)
-            if content != original:
-                jsx_file.write_text(content, encoding="utf-8")
-                count += 1
-                print(f"   \U0001f527 Patched imports in {jsx_file.name}: +{', '.join(sorted(missing))}")
+            new_imports = [f"import {c} from './components/{c}';" for c in missing]
+            content = add_imports(content, rel_path, new_imports)
+            jsx_file.write_text(content, encoding="utf-8")
+            count += 1
+            print(f"   \U0001f527 Patched imports in {jsx_file.name}: +{', '.join(missing)}")
         except Exception as e:
             print(f"   \u26a0\ufe0f Import patch warning for {jsx_file.name}: {e}")
 
@@ -437,6 +403,7 @@ def _fix_broken_imports(frontend_dir: Path):
     - Missing .css imports → create an empty CSS stub file
     - Missing .jsx/.js component imports → remove the import line
       and replace JSX references with a placeholder <div>
+    Package imports ('react', 'axios', ...) are never touched.
     """
     src_dir = frontend_dir / "src"
     if not src_dir.exists():
@@ -449,44 +416,26 @@ def _fix_broken_imports(frontend_dir: Path):
         for source_file in src_dir.rglob(ext):
             try:
                 content = source_file.read_text(encoding="utf-8")
-                original = content
+                facts = index_file(source_file.relative_to(frontend_dir).as_posix(), content)
                 lines = content.split("\n")
-                new_lines = []
                 removed_components = []
 
-                for line in lines:
-                    stripped = line.strip()
-
-                    # Match: import Something from './path'
-                    # Match: import './path.css'
-                    m_default = re.match(
-                        r"import\s+(\w+)\s+from\s+['\"](\.\./|\./)?([^'\"]+)['\"];",
-                        stripped
-                    )
-                    m_css = re.match(
-                        r"import\s+['\"](\.\./|\./)?([^'\"]+\.css)['\"];",
-                        stripped
-                    )
-
-                    if m_css:
-                        prefix = m_css.group(1) or "./"
-                        css_path = m_css.group(2)
-                        resolved = (source_file.parent / (prefix + css_path)).resolve()
+                for imp in facts["imports"]:
+                    source = imp["source"]
+                    if imp["side_effect"] and source.endswith(".css"):
+                        css_path = source if source.startswith(".") else "./" + source
+                        resolved = (source_file.parent / css_path).resolve()
                         if not resolved.exists():
                             # Create empty CSS stub
                             resolved.parent.mkdir(parents=True, exist_ok=True)
                             resolved.write_text(
-                                f"/* Auto-generated stub for {css_path} */\n",
+                                f"/* Auto-generated stub for {source.lstrip('./')} */\n",
                                 encoding="utf-8"
                             )
                             css_created += 1
-                        new_lines.append(line)
-                    elif m_default:
-                        comp_name = m_default.group(1)
-                        prefix = m_default.group(2) or "./"
-                        import_path = m_default.group(3)
+                    elif imp["default"] and not imp["named"] and source.startswith("."):
                         # Resolve the actual file path
-                        base = source_file.parent / (prefix + import_path)
+                        base = source_file.parent / source
                         candidates = [
                             base,
                             base.with_suffix(".jsx"),
@@ -494,21 +443,18 @@ def _fix_broken_imports(frontend_dir: Path):
                             base.with_suffix(".tsx"),
                             base.with_suffix(".ts"),
                         ]
-                        exists = any(c.exists() for c in candidates)
-                        if exists:
-                            new_lines.append(line)
-                        else:
-                            # Remove the import and track the component name
-                            removed_components.append(comp_name)
-                            imports_removed += 1
-                            new_lines.append(
-                                f"// [auto-removed] {stripped}  -- file not found"
-                            )
-                    else:
-                        new_lines.append(line)
+                        if any(c.exists() for c in candidates) or "\n" in imp["text"]:
+                            continue
+                        # Remove the import and track the component name
+                        removed_components.append(imp["default"])
+                        imports_removed += 1
+                        lines[imp["line"]] = f"// [auto-removed] {imp['text']}  -- file not found"
+
+                if not removed_components:
+                    continue
 
                 # Replace JSX usage of removed components with a placeholder
-                content = "\n".join(new_lines)
+                content = "\n".join(lines)
                 for comp in removed_components:
                     # Replace self-closing: <CompName ... />
                     content = re.sub(
@@ -524,8 +470,7 @@ def _fix_broken_imports(frontend_dir: Path):
                         flags=re.DOTALL
                     )
 
-                if content != original:
-                    source_file.write_text(content, encoding="utf-8")
+                source_file.write_text(content, encoding="utf-8")
 
             except Exception as e:
                 print(f"   ⚠️ Broken import fix warning for {source_file.name}: {e}")
@@ -2,14 +2,127 @@
 repair_node.py
 --------------
 Self-healing node that fixes broken code based on test failures.
-Handles truncated code detection and completion.
+Handles truncated code detection and completion; files are repaired
+concurrently, bounded by the repair provider's concurrency limit.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from app.agents.coder.node import build_repair_node
+import contextvars
+
+from app.agents.coder.node import build_repair_node, build_route_repair_node
+from app.core.config import REPAIR_ROUTE_SLICES
+from app.core.llm import get_llm, get_concurrency_limit
 from app.runtime.failure_compiler import compile_failure
 from app.utils.file_ops import normalize_code
 from app.utils.code_validator import validate_file, is_code_truncated
+from app.utils.route_slicer import slice_routes, splice_routes
+
+
+def repair_routes(repairer, broken_code: str, failure: dict):
+    """
+    Repair only the failing routes of backend/app.py: send the failing
+    handlers plus the code they use, splice the fixed handlers back.
+    Returns the repaired file, or None when whole-file repair is needed.
+    """
+    routes = sorted(failure["failing_routes"])
+    sliced = slice_routes(broken_code, routes)
+    if sliced is None:
+        print("      ⚠️ backend/app.py does not parse, repairing the whole file")
+        return None
+
+    missing = ", ".join(f"{m} {p}" for m, p in sliced["missing"])
+    print(f"      ✂️ Route slice: {len(sliced['functions'])} handler(s) "
+          f"{sliced['functions']}" + (f", missing: {missing}" if missing else ""))
+
+    response = repairer.invoke({
+        "failure_report": failure["raw_error"],
+        "context": sliced["context"],
+        "handlers": sliced["handlers"] or "(none — the failing routes have no handler yet)",
+    })
+    fixed = splice_routes(broken_code, normalize_code(response.content))
+    if fixed is None:
+        print("      ⚠️ Route repair returned no usable handlers, repairing the whole file")
+        return None
+
+    is_valid, issues = validate_file(fixed, "backend/app.py")
+    if not is_valid:
+        print(f"      ⚠️ Spliced file has issues {issues[:2]}, repairing the whole file")
+        return None
+    return fixed
+
+
+def repair_file(repairer, route_repairer, project_dir: Path, file_info: dict, failure: dict) -> tuple:
+    """
+    Repair one file (runs on a worker thread; does not touch shared state).
+
+    Returns:
+        (fixed_code, issues): fixed_code is None when nothing should be
+        written; issues is None when the fix validated, else the problems
+        that keep the file in files_to_regenerate.
+    """
+    file_path = file_info["path"]
+    reason = file_info["reason"]
+
+    full_path = project_dir / file_path
+    if not full_path.exists():
+        print(f"   ⚠️ {file_path} not found, skipping")
+        return None, None
+
+    print(f"\n   🔧 Repairing: {file_path}")
+    print(f"      Reason: {reason[:100]}")
+
+    broken_code = full_path.read_text(encoding="utf-8")
+
+    # Create specialized repair prompt
+    if "truncated" in reason.lower():
+        failure_report = f"""
+FILE: {file_path}
+ISSUE: The code is INCOMPLETE/TRUNCATED
+SYMPTOMS: {reason}
+
+CURRENT CODE (truncated):
+```
+{broken_code}
+```
+
+TASK: Generate the COMPLETE, WORKING version of this file.
+- If Python: ensure it has all imports and ends with app.run()
+- If JSX: ensure it has all imports and ends with 'export default'
+- Do NOT just add a few lines - regenerate the entire complete file
+"""
+    else:
+        failure_report = failure
+
+    try:
+        fixed_code = None
+        if route_repairer and file_path == "backend/app.py" and failure_report is failure \
+                and failure["failing_routes"]:
+            fixed_code = repair_routes(route_repairer, broken_code, failure)
+
+        if fixed_code is None:
+            fixed_response = repairer.invoke({
+                "broken_file": broken_code,
+                "failure_report": failure_report,
+            })
+            fixed_code = normalize_code(fixed_response.content)
+
+        if len(fixed_code) < 100:
+            print(f"      ⚠️ {file_path}: LLM returned suspiciously short code, keeping original")
+            return None, ["too_short"]
+
+        # Validate the fix
+        is_valid, issues = validate_file(fixed_code, file_path)
+        if not is_valid:
+            print(f"      ⚠️ {file_path}: fixed code still has issues: {issues[:2]}")
+            return fixed_code, issues
+
+        print(f"      ✅ {file_path}: code validated successfully")
+        return fixed_code, None
+
+    except Exception as e:
+        print(f"      ❌ Repair of {file_path} failed: {e}")
+        return None, None
 
 
 def repair_node(state):
@@ -77,76 +190,41 @@ def repair_node(state):
 
     current_files = state.get("files", {})
     repairer = build_repair_node()
+    route_repairer = build_route_repair_node() if REPAIR_ROUTE_SLICES else None
+    failure = compile_failure(project_dir, error_message)
     still_bad = []
     new_generation_issues = []
 
-    for file_info in files_to_repair:
+    # ============================================
+    # Repair all files concurrently
+    # ============================================
+    # Each file is an independent LLM round-trip; results are merged below in
+    # files_to_repair order so the outcome does not depend on timing.
+    max_workers = min(get_concurrency_limit(get_llm(role="repair")), len(files_to_repair))
+    if max_workers <= 1:
+        results = [repair_file(repairer, route_repairer, project_dir, info, failure) for info in files_to_repair]
+    else:
+        print(f"   ⚡ Repairing {len(files_to_repair)} files, up to {max_workers} concurrent LLM calls")
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run,
+                            repair_file, repairer, route_repairer, project_dir, info, failure)
+                for info in files_to_repair
+            ]
+            results = [f.result() for f in futures]
+
+    for file_info, (fixed_code, issues) in zip(files_to_repair, results):
         file_path = file_info["path"]
-        reason = file_info["reason"]
-
-        full_path = project_dir / file_path
-        if not full_path.exists():
-            print(f"   ⚠️ {file_path} not found, skipping")
+        if issues:
+            new_generation_issues.append({"file": file_path, "issues": issues})
+            still_bad.append(file_path)
+        if fixed_code is None:
             continue
 
-        print(f"\n   🔧 Repairing: {file_path}")
-        print(f"      Reason: {reason[:100]}")
-
-        broken_code = full_path.read_text(encoding="utf-8")
-
-        # Create specialized repair prompt
-        if "truncated" in reason.lower():
-            failure_report = f"""
-FILE: {file_path}
-ISSUE: The code is INCOMPLETE/TRUNCATED
-SYMPTOMS: {reason}
-
-CURRENT CODE (truncated):
-```
-{broken_code}
-```
-
-TASK: Generate the COMPLETE, WORKING version of this file.
-- If Python: ensure it has all imports and ends with app.run()
-- If JSX: ensure it has all imports and ends with 'export default'
-- Do NOT just add a few lines - regenerate the entire complete file
-"""
-        else:
-            failure_report = compile_failure(project_dir, error_message)
-
-        try:
-            fixed_response = repairer.invoke({
-                "broken_file": broken_code,
-                "failure_report": failure_report,
-            })
-
-            fixed_code = normalize_code(fixed_response.content)
-
-            # Validate the fix
-            is_valid, issues = validate_file(fixed_code, file_path)
-
-            if len(fixed_code) < 100:
-                print(f"      ⚠️ LLM returned suspiciously short code, keeping original")
-                new_generation_issues.append({"file": file_path, "issues": ["too_short"]})
-                still_bad.append(file_path)
-                continue
-
-            if not is_valid:
-                print(f"      ⚠️ Fixed code still has issues: {issues[:2]}")
-                new_generation_issues.append({"file": file_path, "issues": issues})
-                still_bad.append(file_path)
-            else:
-                print(f"      ✅ Code validated successfully")
-
-            # Write fixed code to disk
-            full_path.write_text(fixed_code, encoding="utf-8")
-            print(f"      ✅ Fixed code written to disk")
-
-            # Update state["files"] to stay in sync
-            current_files[file_path] = fixed_code
-
-        except Exception as e:
-            print(f"      ❌ Repair failed: {e}")
+        # Write fixed code to disk and keep state["files"] in sync
+        (project_dir / file_path).write_text(fixed_code, encoding="utf-8")
+        current_files[file_path] = fixed_code
+        print(f"   ✅ {file_path} written to disk")
 
     # If after max attempts some files remain bad, write safe fallbacks
     max_attempts = 3
@@ -6,11 +6,11 @@ Writes generated files to disk and creates API contract for testing.
 
 from pathlib import Path
 import json
-import re
 import ast
 
 from app.core.state import ProjectState
 from app.utils.file_ops import write_files
+from app.utils.project_index import backend_routes, normalize_route_path
 
 
 # ------------------ SAFETY ------------------
@@ -41,71 +41,37 @@ def fix_common_python_bugs(code: str) -> str:
 def extract_routes_from_backend(code: str) -> list:
     """
     Extract Flask routes with their HTTP methods.
-    Returns list of (method, path) tuples.
+    Returns list of (method, path) tuples, dynamic params normalized
+    (/delete/<int:id> -> /delete/1).
     """
-    routes = []
-
-    # Pattern: @app.route('/path', methods=['GET', 'POST'])
-    pattern = r"@app\.route\(['\"]([^'\"]+)['\"](?:,\s*methods=\[([^\]]+)\])?"
-
-    for match in re.finditer(pattern, code):
-        raw_path = match.group(1)
-        methods_str = match.group(2)
-
-        # Normalize dynamic params: /delete/<int:id> -> /delete/1
-        path = re.sub(r"<[^>]+>", "1", raw_path)
-
-        if methods_str:
-            methods = re.findall(r"['\"](\w+)['\"]", methods_str)
-        else:
-            methods = ["GET"]  # Default method
-
-        for m in methods:
-            routes.append((m.upper(), path))
-
-    return routes
+    return [
+        (method, normalize_route_path(route["path"]))
+        for route in backend_routes(code)
+        for method in route["methods"]
+    ]
 
 
 def extract_expected_json_keys(code: str, route_path: str) -> list:
     """
     Extract ALL required JSON keys from a route handler.
     
-    Handles multiple patterns:
+    Handles multiple patterns (see project_index):
     1) 'key' not in data
     2) key = data.get('key')
     3) data['key']
     4) data.get('key', default)
     """
-    # Find the route handler function
-    # Match from @app.route to next @app.route or end
-    escaped_path = re.escape(route_path.replace('/1', '/<[^>]+>'))
-    pattern = rf"@app\.route\(['\"]({escaped_path}|{re.escape(route_path)})['\"].*?\ndef\s+\w+\([^)]*\):\s*(.*?)(?=\n@app\.route|\nif __name__|$)"
-    
-    match = re.search(pattern, code, re.DOTALL)
-    if not match:
-        # Try simpler pattern
-        simple_pattern = rf"@app\.route\(['\"][^'\"]*{re.escape(route_path.split('/')[-1])}[^'\"]*['\"].*?\ndef\s+\w+\([^)]*\):\s*(.*?)(?=\n@app\.route|\nif __name__|$)"
-        match = re.search(simple_pattern, code, re.DOTALL)
-        if not match:
-            return []
-
-    block = match.group(2) if match.lastindex >= 2 else match.group(1)
-    
-    keys = set()
-
-    # Pattern 1: 'key' not in data
-    keys.update(re.findall(r"['\"](\w+)['\"]\s+not\s+in\s+data", block))
-    
-    # Pattern 2: data.get('key') or data.get("key")
-    keys.update(re.findall(r"data\.get\(['\"](\w+)['\"]", block))
-    
-    # Pattern 3: data['key'] or data["key"]
-    keys.update(re.findall(r"data\[['\"](\w+)['\"]\]", block))
-    
-    # Pattern 4: request.get_json().get('key')
-    keys.update(re.findall(r"request\.get_json\(\)[^.]*\.get\(['\"](\w+)['\"]", block))
+    routes = backend_routes(code)
+    for route in routes:
+        if normalize_route_path(route["path"]) == route_path or route["path"] == route_path:
+            return list(route["json_keys"])
 
-    return list(keys)
+    # Try a looser match on the last path segment
+    last_segment = route_path.split('/')[-1]
+    for route in routes:
+        if last_segment in route["path"]:
+            return list(route["json_keys"])
+    return []
 
 
 def generate_test_value(key: str) -> any:
@@ -160,8 +126,12 @@ def write_files_node(state: ProjectState) -> ProjectState:
         files_to_write["backend/app.py"] = backend_code
 
     # ---------- Write all files ----------
-    write_files(project_dir, files_to_write)
-    print("✅ All files written to disk")
+    written = write_files(project_dir, files_to_write)
+    unchanged = len(files_to_write) - len(written)
+    if unchanged:
+        print(f"✅ {len(written)} files written to disk ({unchanged} unchanged, skipped)")
+    else:
+        print("✅ All files written to disk")
 
     # ---------- Build contract from backend ----------
     routes = extract_routes_from_backend(backend_code)
@@ -6,6 +6,7 @@ Handles project directory setup and LangGraph execution.
 import os
 import sys
 import json
+import uuid
 import argparse
 from pathlib import Path
 
@@ -13,7 +14,9 @@ from pathlib import Path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.core.config import WORKSPACE_DIR
-from app.graph.graph import build_graph, build_chat_graph
+from app.core.checkpoint import get_checkpointer
+from app.core.state import ProjectState
+from app.graph.graph import get_graph
 
 
 def create_project_dir(project_name: str) -> Path:
@@ -38,7 +41,37 @@ def generate_project_name(prompt: str) -> str:
     return name[:40]
 
 
-def run_pipeline(user_prompt: str, project_name: str = None, callback=None):
+def new_thread_id() -> str:
+    """Id a generation run is checkpointed under (pass it to resume_pipeline_streaming)."""
+    return uuid.uuid4().hex
+
+
+def _run_config(thread_id: str, **metadata) -> dict:
+    return {"configurable": {"thread_id": thread_id}, "metadata": metadata}
+
+
+def _stream_graph(graph, graph_input, config: dict, final_state: dict, on_node_complete=None):
+    """Stream a graph run, merging every node output into final_state and reporting it."""
+    for event in graph.stream(graph_input, config):
+        # event is a dict like {"strategist": {"project_scope": {...}, "current_step": "..."}}
+        for node_name, node_output in event.items():
+            print(f"  🔄 Node '{node_name}' completed")
+            final_state.update(node_output)
+            if on_node_complete:
+                try:
+                    on_node_complete(node_name, node_output)
+                except Exception as cb_err:
+                    print(f"  ⚠️ Callback error: {cb_err}")
+
+
+def _forget_if_finished(graph, config: dict):
+    """Drop the checkpoints of a run that reached the end — only failed runs need resuming."""
+    checkpointer = get_checkpointer()
+    if checkpointer and not graph.get_state(config).next:
+        checkpointer.delete_thread(config["configurable"]["thread_id"])
+
+
+def run_pipeline(user_prompt: str, project_name: str = None, callback=None, thread_id: str = None):
     """
     Run the full generation pipeline.
     
@@ -46,6 +79,7 @@ def run_pipeline(user_prompt: str, project_name: str = None, callback=None):
         user_prompt: Description of the app to build
         project_name: Optional custom project name
         callback: Optional callback for progress updates
+        thread_id: Checkpoint id of this run (generated if omitted)
     """
     if not project_name:
         project_name = generate_project_name(user_prompt)
@@ -60,8 +94,8 @@ def run_pipeline(user_prompt: str, project_name: str = None, callback=None):
     # Create project directory
     project_dir = create_project_dir(project_name)
 
-    # Build and run the LangGraph pipeline
-    graph = build_graph()
+    # Run the (compiled once, shared) LangGraph pipeline
+    graph = get_graph("generation")
 
     initial_state = {
         "user_prompt": user_prompt,
@@ -77,6 +111,7 @@ def run_pipeline(user_prompt: str, project_name: str = None, callback=None):
         "generation_issues": [],
         "files_to_regenerate": [],
         "failed_file_history": [],
+        "file_fingerprints": {},
         "tests_passed": False,
         "error_message": None,
         "contract_report": {},
@@ -87,7 +122,15 @@ def run_pipeline(user_prompt: str, project_name: str = None, callback=None):
     }
 
     # Run the pipeline
-    final_state = graph.invoke(initial_state)
+    thread_id = thread_id or new_thread_id()
+    config = _run_config(thread_id, project_name=project_name, user_prompt=user_prompt)
+    try:
+        final_state = graph.invoke(initial_state, config)
+    except Exception:
+        if get_checkpointer():
+            print(f"   💾 Run checkpointed — resume with: python app/main.py --resume {thread_id}")
+        raise
+    _forget_if_finished(graph, config)
 
     print(f"\n{'='*60}")
     print(f"📊 FINAL REPORT")
@@ -101,7 +144,8 @@ def run_pipeline(user_prompt: str, project_name: str = None, callback=None):
     return final_state
 
 
-def run_pipeline_streaming(user_prompt: str, project_name: str = None, on_node_complete=None):
+def run_pipeline_streaming(user_prompt: str, project_name: str = None, on_node_complete=None,
+                           thread_id: str = None):
     """
     Run the generation pipeline with streaming — calls on_node_complete(node_name, node_output)
     after each node so the UI can update in real-time.
@@ -110,6 +154,7 @@ def run_pipeline_streaming(user_prompt: str, project_name: str = None, on_node_c
         user_prompt: Description of the app to build
         project_name: Optional custom project name
         on_node_complete: Callback(node_name: str, node_output: dict) called after each node
+        thread_id: Checkpoint id of this run (generated if omitted)
     """
     if not project_name:
         project_name = generate_project_name(user_prompt)
@@ -124,8 +169,8 @@ def run_pipeline_streaming(user_prompt: str, project_name: str = None, on_node_c
     # Create project directory
     project_dir = create_project_dir(project_name)
 
-    # Build LangGraph pipeline
-    graph = build_graph()
+    # Compiled once per process, shared across runs
+    graph = get_graph("generation")
 
     initial_state = {
         "user_prompt": user_prompt,
@@ -141,6 +186,7 @@ def run_pipeline_streaming(user_prompt: str, project_name: str = None, on_node_c
         "generation_issues": [],
         "files_to_regenerate": [],
         "failed_file_history": [],
+        "file_fingerprints": {},
         "tests_passed": False,
         "error_message": None,
         "contract_report": {},
@@ -151,21 +197,20 @@ def run_pipeline_streaming(user_prompt: str, project_name: str = None, on_node_c
     }
 
     # Stream the pipeline — each yield is {node_name: node_output}
+    thread_id = thread_id or new_thread_id()
+    config = _run_config(thread_id, project_name=project_name, user_prompt=user_prompt)
     final_state = initial_state.copy()
     try:
-        for event in graph.stream(initial_state):
-            # event is a dict like {"strategist": {"project_scope": {...}, "current_step": "..."}}
-            for node_name, node_output in event.items():
-                print(f"  🔄 Node '{node_name}' completed")
-                final_state.update(node_output)
-                if on_node_complete:
-                    try:
-                        on_node_complete(node_name, node_output)
-                    except Exception as cb_err:
-                        print(f"  ⚠️ Callback error: {cb_err}")
+        _stream_graph(graph, initial_state, config, final_state, on_node_complete)
     except Exception as e:
+        if get_checkpointer():
+            # Completed nodes are checkpointed — resuming beats starting over
+            print(f"  ⚠️ Stream error: {e}")
+            print(f"  💾 Run checkpointed — resume thread {thread_id}")
+            raise
         print(f"  ⚠️ Stream error, falling back to invoke: {e}")
-        final_state = graph.invoke(initial_state)
+        final_state = graph.invoke(initial_state, config)
+    _forget_if_finished(graph, config)
 
     print(f"\n{'='*60}")
     print(f"📊 FINAL REPORT")
@@ -179,6 +224,106 @@ def run_pipeline_streaming(user_prompt: str, project_name: str = None, on_node_c
     return final_state
 
 
+def get_resumable_run(thread_id: str) -> dict | None:
+    """Where a checkpointed run stopped, or None if there is nothing to resume."""
+    if not get_checkpointer():
+        return None
+    snapshot = get_graph("generation").get_state(_run_config(thread_id))
+    if not snapshot.values or not snapshot.next:
+        return None
+    return {
+        "thread_id": thread_id,
+        "next": list(snapshot.next),
+        "project_name": snapshot.values.get("project_name", ""),
+        "user_prompt": snapshot.values.get("user_prompt", ""),
+        "files_count": len(snapshot.values.get("files", {})),
+        "step": snapshot.values.get("current_step", ""),
+    }
+
+
+def list_resumable_runs(limit: int = 20) -> list:
+    """Most recent checkpointed runs that did not finish."""
+    checkpointer = get_checkpointer()
+    if not checkpointer:
+        return []
+    runs = (get_resumable_run(thread_id) for thread_id in checkpointer.recent_threads(limit))
+    return [run for run in runs if run]
+
+
+def resume_pipeline_streaming(thread_id: str, on_node_complete=None):
+    """
+    Resume a checkpointed generation run from its last completed node.
+    Nodes that already finished are not re-run; on_node_complete is first
+    called once with node "resume" and the checkpointed state.
+    """
+    run = get_resumable_run(thread_id)
+    if not run:
+        raise ValueError(f"No resumable run for thread {thread_id}")
+
+    graph = get_graph("generation")
+    config = _run_config(thread_id)
+    final_state = dict(graph.get_state(config).values)
+
+    print(f"\n{'='*60}")
+    print(f"🔁 RESUMING RUN {thread_id}")
+    print(f"{'='*60}")
+    print(f"📁 Project: {run['project_name']}")
+    print(f"⏭️  Next: {', '.join(run['next'])}")
+    print(f"{'='*60}\n")
+
+    if on_node_complete:
+        on_node_complete("resume", final_state)
+
+    # None input = continue from the latest checkpoint
+    _stream_graph(graph, None, config, final_state, on_node_complete)
+    _forget_if_finished(graph, config)
+
+    print(f"   ✅ Resumed run complete — {len(final_state.get('files', {}))} files")
+    return final_state
+
+
+def run_code_only_streaming(existing_state: dict, on_node_complete=None):
+    """
+    Run strategist → architect → code generation on an existing (SDLC-planned)
+    session state, skipping the SDLC stages.
+    Files already in existing_state whose input fingerprint is unchanged are
+    reused instead of regenerated, and unchanged bytes are not rewritten.
+    """
+    user_prompt = existing_state.get("user_prompt", "")
+    project_name = existing_state.get("project_name") or generate_project_name(user_prompt)
+    project_dir = existing_state.get("project_dir") or str(create_project_dir(project_name))
+
+    print(f"\n{'='*60}")
+    print(f"🔨 CODE GENERATION: {project_name}")
+    print(f"   {len(existing_state.get('files') or {})} existing files, "
+          f"{len(existing_state.get('file_fingerprints') or {})} fingerprints")
+    print(f"{'='*60}\n")
+
+    graph = get_graph("code")
+
+    initial_state = {k: v for k, v in existing_state.items() if k in ProjectState.__annotations__}
+    initial_state.update({
+        "project_name": project_name,
+        "project_dir": project_dir,
+        "tech_stack": initial_state.get("tech_stack") or "react-flask",
+        "files": dict(initial_state.get("files") or {}),
+        "file_fingerprints": dict(initial_state.get("file_fingerprints") or {}),
+        "generation_issues": [],
+        "files_to_regenerate": [],
+        "failed_file_history": [],
+        "tests_passed": False,
+        "error_message": None,
+        "repair_attempts": 0,
+        "current_step": "starting_code",
+    })
+
+    final_state = initial_state.copy()
+    _stream_graph(graph, initial_state, {}, final_state, on_node_complete)
+
+    print(f"   ✅ Code generation complete — {len(final_state.get('files', {}))} files")
+    return final_state
+
+
 def run_chat_pipeline(user_prompt: str, existing_state: dict):
     """
     Run the chat refinement pipeline on an existing project.
@@ -189,7 +334,7 @@ def run_chat_pipeline(user_prompt: str, existing_state: dict):
     """
     print(f"\n💬 CHAT REFINEMENT: {user_prompt[:80]}...")
 
-    graph = build_chat_graph()
+    graph = get_graph("chat")
 
     # Update state with new prompt
     existing_state["user_prompt"] = user_prompt
@@ -206,10 +351,13 @@ def main():
     parser = argparse.ArgumentParser(description="AI Code Factory")
     parser.add_argument("prompt", nargs="?", default=None, help="Application description")
     parser.add_argument("--name", default=None, help="Project name")
+    parser.add_argument("--resume", default=None, metavar="THREAD_ID", help="Resume a failed run")
 
     args = parser.parse_args()
 
-    if args.prompt:
+    if args.resume:
+        resume_pipeline_streaming(args.resume)
+    elif args.prompt:
         run_pipeline(args.prompt, project_name=args.name)
     else:
         # Interactive mode
@@ -8,165 +8,330 @@ Detects:
 - Truncated JSX/JavaScript files
 - Missing required patterns
 - Syntax errors
+
+Every file is scanned once: Python is parsed with `ast` (tokenized only
+when it does not parse, to locate unclosed brackets), JSX/JS with a single
+string/template-literal/comment-aware pass. All issues are returned
+together and results are cached by content hash, so re-validating
+unchanged content is free.
 """
 
 import ast
+import hashlib
+import io
+import json
 import re
+import threading
+import tokenize
+from collections import OrderedDict
 from typing import Tuple, List
 
+# Validation results kept in memory: (validator, flags, sha1) -> (is_valid, issues)
+VALIDATION_CACHE_SIZE = 1024
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached(key: tuple, code: str, validate) -> Tuple[bool, List[str]]:
+    key = key + (hashlib.sha1(code.encode("utf-8", "replace")).hexdigest(),)
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+            return hit[0], list(hit[1])
+
+    is_valid, issues = validate()
+    with _cache_lock:
+        _cache[key] = (is_valid, tuple(issues))
+        while len(_cache) > VALIDATION_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return is_valid, list(issues)
+
+
+def _last_line(code: str) -> str:
+    stripped = code.rstrip()
+    return stripped[stripped.rfind("\n") + 1:]
+
+
+# ============================================
+# PYTHON
+# ============================================
+
+_PY_TRUNCATION_SIGNS = [
+    (r'\.\.\.$', "Code ends with '...' - likely truncated"),
+    (r'#\s*\.\.\.', "Code contains '# ...' - likely truncated"),
+    (r'"""$', "Code ends with unclosed docstring"),
+    (r"'''$", "Code ends with unclosed docstring"),
+    (r'def\s+\w+\([^)]*$', "Function definition is incomplete"),
+    (r'class\s+\w+[^:]*$', "Class definition is incomplete"),
+    (r'if\s+[^:]+$', "If statement is incomplete"),
+    (r':\s*$', "Code ends with colon but no body"),
+]
+
+_FLASK_PATTERNS = [
+    (r'from flask import', "Missing Flask import"),
+    (r'app\s*=\s*Flask\s*\(', "Missing Flask app initialization"),
+    (r'@app\.route', "No routes defined"),
+    (r'if\s+__name__\s*==\s*[\'"]__main__[\'"]\s*:', "Missing if __name__ == '__main__'"),
+    (r'app\.run\s*\(', "Missing app.run()"),
+]
+
 
 def validate_python_code(code: str, filename: str = "app.py") -> Tuple[bool, List[str]]:
     """
     Validate Python code for completeness and syntax.
-    
+
     Returns:
         (is_valid, list_of_issues)
     """
+    is_flask = "flask" in filename.lower() or "app.py" in filename.lower()
+    return _cached(("py", is_flask), code or "", lambda: _validate_python(code or "", is_flask))
+
+
+def _validate_python(code: str, is_flask: bool) -> Tuple[bool, List[str]]:
     issues = []
-    
-    if not code or len(code.strip()) < 50:
+
+    if len(code.strip()) < 50:
         issues.append("Code is empty or too short")
         return False, issues
-    
-    # Check for syntax errors
+
     try:
-        ast.parse(code)
+        tree = ast.parse(code)
     except SyntaxError as e:
+        tree = None
         issues.append(f"Syntax error at line {e.lineno}: {e.msg}")
-        return False, issues
-    
+        issues.extend(_python_bracket_issues(code))
+
     # Check for truncation indicators
-    truncation_signs = [
-        (r'\.\.\.$', "Code ends with '...' - likely truncated"),
-        (r'#\s*\.\.\.', "Code contains '# ...' - likely truncated"),
-        (r'"""$', "Code ends with unclosed docstring"),
-        (r"'''$", "Code ends with unclosed docstring"),
-        (r'def\s+\w+\([^)]*$', "Function definition is incomplete"),
-        (r'class\s+\w+[^:]*$', "Class definition is incomplete"),
-        (r'if\s+[^:]+$', "If statement is incomplete"),
-        (r':\s*$', "Code ends with colon but no body"),
-    ]
-    
-    lines = code.strip().split('\n')
-    last_line = lines[-1] if lines else ""
-    
-    for pattern, message in truncation_signs:
+    last_line = _last_line(code)
+    for pattern, message in _PY_TRUNCATION_SIGNS:
         if re.search(pattern, last_line):
             issues.append(message)
-    
+
     # For Flask apps, check required patterns
-    if "flask" in filename.lower() or "app.py" in filename.lower():
-        required_patterns = [
-            (r'from flask import', "Missing Flask import"),
-            (r'app\s*=\s*Flask\s*\(', "Missing Flask app initialization"),
-            (r'@app\.route', "No routes defined"),
-            (r'if\s+__name__\s*==\s*[\'"]__main__[\'"]\s*:', "Missing if __name__ == '__main__'"),
-            (r'app\.run\s*\(', "Missing app.run()"),
-        ]
-        
-        for pattern, message in required_patterns:
-            if not re.search(pattern, code):
+    if is_flask:
+        found = _flask_facts(tree) if tree is not None else None
+        for (pattern, message), present in zip(_FLASK_PATTERNS, found or [None] * len(_FLASK_PATTERNS)):
+            if present is None:
+                present = re.search(pattern, code) is not None
+            if not present:
                 issues.append(message)
-    
-    # Check for unbalanced brackets/parens
-    brackets = {'(': ')', '[': ']', '{': '}'}
+
+    return len(issues) == 0, issues
+
+
+def _flask_facts(tree) -> list:
+    """Presence of each _FLASK_PATTERNS entry, read from the parsed tree."""
+    flask_import = app_init = route = main_guard = app_run = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module == "flask":
+            flask_import = True
+        elif isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+            func = node.value.func
+            if getattr(func, "id", None) == "Flask" and any(getattr(t, "id", None) == "app" for t in node.targets):
+                app_init = True
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for dec in node.decorator_list:
+                func = dec.func if isinstance(dec, ast.Call) else dec
+                if isinstance(func, ast.Attribute) and func.attr == "route" and getattr(func.value, "id", None) == "app":
+                    route = True
+        elif isinstance(node, ast.If) and isinstance(node.test, ast.Compare):
+            left, comps = node.test.left, node.test.comparators
+            if getattr(left, "id", None) == "__name__" and comps and getattr(comps[0], "value", None) == "__main__":
+                main_guard = True
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            if node.func.attr == "run" and getattr(node.func.value, "id", None) == "app":
+                app_run = True
+    return [flask_import, app_init, route, main_guard, app_run]
+
+
+def _python_bracket_issues(code: str) -> List[str]:
+    """Unclosed/mismatched brackets and strings of code that failed to parse, via one tokenize pass."""
+    pairs = {'(': ')', '[': ']', '{': '}'}
     stack = []
-    in_string = False
-    string_char = None
-    
-    for i, char in enumerate(code):
-        if char in '"\'':
-            if not in_string:
-                in_string = True
-                string_char = char
-            elif char == string_char:
-                in_string = False
-        elif not in_string:
-            if char in brackets:
-                stack.append(char)
-            elif char in brackets.values():
+    issues = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+            if tok.type != tokenize.OP:
+                continue
+            if tok.string in pairs:
+                stack.append(tok.string)
+            elif tok.string in pairs.values():
                 if not stack:
-                    issues.append(f"Unbalanced closing bracket '{char}'")
+                    issues.append(f"Unbalanced closing bracket '{tok.string}'")
+                elif pairs[stack[-1]] != tok.string:
+                    issues.append(f"Mismatched brackets: expected '{pairs[stack.pop()]}', got '{tok.string}'")
                 else:
-                    expected = brackets[stack.pop()]
-                    if char != expected:
-                        issues.append(f"Mismatched brackets: expected '{expected}', got '{char}'")
-    
+                    stack.pop()
+    except tokenize.TokenError as e:
+        if "string" in str(e).lower():
+            issues.append("Unclosed string at end of file")
+    except (IndentationError, SyntaxError):
+        pass
     if stack:
         issues.append(f"Unclosed brackets: {stack}")
-    
-    return len(issues) == 0, issues
+    return issues
+
+
+# ============================================
+# JSX / JAVASCRIPT
+# ============================================
+
+_JSX_TRUNCATION_SIGNS = [
+    (r'<\w+$', "JSX tag is incomplete"),
+    (r'<\w+\s+\w+=$', "JSX attribute is incomplete"),
+    (r'{\s*$', "Unclosed JSX expression"),
+    (r'=>\s*$', "Arrow function body is missing"),
+    (r'return\s*\($', "Return statement is incomplete"),
+    (r'\.\.\.$', "Code ends with '...'"),
+]
+
+# Brace/paren differences up to this are tolerated (JSX text may hold stray brackets)
+JSX_BRACKET_TOLERANCE = 3
+
+
+def scan_js(code: str) -> dict:
+    """
+    One pass over JS/JSX source, skipping strings, template literals and
+    comments. Quotes that are not closed on the same line are treated as
+    JSX text (e.g. the apostrophe in <p>Don't</p>).
+
+    Returns:
+        {"counts": {"{": n, "}": n, "(": n, ")": n}, "unterminated": None | "template literal" | "comment"}
+    """
+    counts = {"{": 0, "}": 0, "(": 0, ")": 0}
+    # Template literals nest through ${ ... }: each entry is the brace depth
+    # at which the enclosing template resumes
+    templates = []
+    depth = 0
+    i, n = 0, len(code)
+
+    while i < n:
+        ch = code[i]
+        if ch == "/" and i + 1 < n and code[i + 1] in "/*":
+            if code[i + 1] == "/":
+                end = code.find("\n", i)
+                i = n if end < 0 else end
+                continue
+            end = code.find("*/", i + 2)
+            if end < 0:
+                return {"counts": counts, "unterminated": "comment"}
+            i = end + 2
+            continue
+        if ch in "'\"":
+            j = i + 1
+            while j < n and code[j] != ch and code[j] != "\n":
+                j += 2 if code[j] == "\\" else 1
+            if j < n and code[j] == ch:
+                i = j + 1
+                continue
+            i += 1                       # no closing quote on this line: JSX text
+            continue
+        if ch == "`":
+            i = _skip_template(code, i + 1)
+            if i < 0:
+                return {"counts": counts, "unterminated": "template literal"}
+            if code[i - 2:i] == "${":
+                templates.append(depth)
+                depth += 1
+                counts["{"] += 1
+            continue
+        if ch == "{":
+            depth += 1
+            counts["{"] += 1
+        elif ch == "}":
+            depth -= 1
+            counts["}"] += 1
+            if templates and depth == templates[-1]:
+                templates.pop()
+                i = _skip_template(code, i + 1)
+                if i < 0:
+                    return {"counts": counts, "unterminated": "template literal"}
+                if code[i - 2:i] == "${":
+                    templates.append(depth)
+                    depth += 1
+                    counts["{"] += 1
+                continue
+        elif ch in "()":
+            counts[ch] += 1
+        i += 1
+
+    return {"counts": counts, "unterminated": "template literal" if templates else None}
+
+
+def _skip_template(code: str, i: int) -> int:
+    """Index after the closing backtick or after '${' of a template literal; -1 if it never ends."""
+    n = len(code)
+    while i < n:
+        ch = code[i]
+        if ch == "\\":
+            i += 2
+        elif ch == "`":
+            return i + 1
+        elif ch == "$" and i + 1 < n and code[i + 1] == "{":
+            return i + 2
+        else:
+            i += 1
+    return -1
 
 
 def validate_jsx_code(code: str, filename: str = "App.jsx") -> Tuple[bool, List[str]]:
     """
     Validate JSX/React code for completeness.
-    
+
     Returns:
         (is_valid, list_of_issues)
     """
+    return _cached(("jsx",), code or "", lambda: _validate_jsx(code or ""))
+
+
+def _validate_jsx(code: str) -> Tuple[bool, List[str]]:
     issues = []
-    
-    if not code or len(code.strip()) < 50:
+
+    if len(code.strip()) < 50:
         issues.append("Code is empty or too short")
         return False, issues
-    
+
     # Check for truncation
-    lines = code.strip().split('\n')
-    last_line = lines[-1].strip() if lines else ""
-    
-    truncation_signs = [
-        (r'<\w+$', "JSX tag is incomplete"),
-        (r'<\w+\s+\w+=$', "JSX attribute is incomplete"),
-        (r'{\s*$', "Unclosed JSX expression"),
-        (r'=>\s*$', "Arrow function body is missing"),
-        (r'return\s*\($', "Return statement is incomplete"),
-        (r'\.\.\.$', "Code ends with '...'"),
-    ]
-    
-    for pattern, message in truncation_signs:
+    last_line = _last_line(code).strip()
+    for pattern, message in _JSX_TRUNCATION_SIGNS:
         if re.search(pattern, last_line):
             issues.append(message)
-    
+
     # Required patterns for React components - ONLY CRITICAL ONES
-    required_patterns = [
-        (r'import\s+React', "Missing React import"),
-        (r'export\s+default', "Missing export default"),
-    ]
-    
-    for pattern, message in required_patterns:
-        if not re.search(pattern, code):
-            issues.append(message)
-    
-    # LENIENT brace/paren checking - only flag if severely unbalanced (> 3 difference)
-    open_braces = code.count('{')
-    close_braces = code.count('}')
-    open_parens = code.count('(')
-    close_parens = code.count(')')
-    
-    brace_diff = abs(open_braces - close_braces)
-    paren_diff = abs(open_parens - close_parens)
-    
-    if brace_diff > 3:
-        issues.append(f"Unbalanced braces: {open_braces} open, {close_braces} close")
-    
-    if paren_diff > 3:
-        issues.append(f"Unbalanced parentheses: {open_parens} open, {close_parens} close")
-    if paren_diff > 3:
-        issues.append(f"Unbalanced parentheses: {open_parens} open, {close_parens} close")
-    
+    if not re.search(r'import\s+React', code):
+        issues.append("Missing React import")
+    if not re.search(r'export\s+default', code):
+        issues.append("Missing export default")
+
+    scan = scan_js(code)
+    if scan["unterminated"]:
+        issues.append(f"Unclosed {scan['unterminated']} at end of file - likely truncated")
+
+    # LENIENT brace/paren checking - only flag if severely unbalanced
+    counts = scan["counts"]
+    if abs(counts["{"] - counts["}"]) > JSX_BRACKET_TOLERANCE:
+        issues.append(f"Unbalanced braces: {counts['{']} open, {counts['}']} close")
+    if abs(counts["("] - counts[")"]) > JSX_BRACKET_TOLERANCE:
+        issues.append(f"Unbalanced parentheses: {counts['(']} open, {counts[')']} close")
+
     return len(issues) == 0, issues
 
 
+# ============================================
+# DISPATCH
+# ============================================
+
 def validate_file(code: str, filepath: str) -> Tuple[bool, List[str]]:
     """
     Validate any file based on its extension.
-    
+
     Returns:
         (is_valid, list_of_issues)
     """
     filepath_lower = filepath.lower()
-    
+
     if filepath_lower.endswith('.py'):
         return validate_python_code(code, filepath)
     elif filepath_lower.endswith('.jsx') or filepath_lower.endswith('.tsx'):
@@ -178,7 +343,6 @@ def validate_file(code: str, filepath: str) -> Tuple[bool, List[str]]:
         return True, []
     elif filepath_lower.endswith('.json'):
         try:
-            import json
             json.loads(code)
             return True, []
         except json.JSONDecodeError as e:
@@ -191,12 +355,35 @@ def validate_file(code: str, filepath: str) -> Tuple[bool, List[str]]:
 
 
 def is_code_truncated(code: str, filepath: str) -> bool:
-    """Quick check if code appears to be truncated."""
+    """Quick check if code appears to be truncated (served from the validation cache)."""
     is_valid, issues = validate_file(code, filepath)
-    
+
     truncation_keywords = ['truncated', 'incomplete', 'unclosed', 'missing']
     for issue in issues:
         if any(keyword in issue.lower() for keyword in truncation_keywords):
             return True
-    
+
     return False
+
+
+def validate_edit(before: str, after: str, filepath: str) -> Tuple[bool, List[str]]:
+    """
+    Validate an edited file against its previous version.
+
+    The edit is rejected when it turns a valid file invalid, or when it
+    changes the bracket balance of a JS/JSX file (validate_jsx_code
+    tolerates a few unbalanced brackets, so a dropped brace would pass it).
+    A new file (before is None) is validated on its own.
+    """
+    is_valid, issues = validate_file(after, filepath)
+    if before is None:
+        return is_valid, issues
+    if not is_valid and validate_file(before, filepath)[0]:
+        return False, issues
+
+    if filepath.lower().endswith(('.js', '.jsx', '.ts', '.tsx')):
+        old, new = scan_js(before)["counts"], scan_js(after)["counts"]
+        for open_ch, close_ch, name in (("{", "}", "braces"), ("(", ")", "parentheses")):
+            if new[open_ch] - new[close_ch] != old[open_ch] - old[close_ch]:
+                return False, [f"Edit unbalances {name}: {new[open_ch]} open, {new[close_ch]} close"]
+    return True, []
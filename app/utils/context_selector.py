@@ -0,0 +1,176 @@
+"""
+context_selector.py
+-------------------
+Picks which project files go into a refinement prompt.
+- Every file is described by its path, imports, symbols, API routes and
+  React component names (from project_index.py)
+- Files are scored against the user request by shared terms
+- The most relevant files are packed in full and every other file as a
+  one-line summary, within a token budget, so prompt size stays bounded as
+  projects grow
+"""
+
+import re
+
+from app.core.config import CHAT_CONTEXT_TOKENS
+from app.core.rate_limiter import estimate_tokens
+from app.utils import project_index
+
+# Score weights per kind of match
+WEIGHTS = {
+    "path": 4.0,
+    "component": 4.0,
+    "route": 3.0,
+    "symbol": 2.0,
+    "import": 1.0,
+    "content": 0.5,
+}
+
+# Files most refinements end up touching get a small head start
+PRIOR = {
+    "frontend/src/App.jsx": 1.5,
+    "backend/app.py": 1.5,
+    "frontend/src/App.css": 0.5,
+}
+
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "to", "of", "in", "on", "for", "with", "by", "at", "from",
+    "is", "are", "be", "it", "this", "that", "these", "those", "as", "so", "can", "should",
+    "make", "add", "change", "update", "please", "want", "need", "use", "also", "all", "more",
+    "new", "some", "when", "into", "then", "than", "them", "they", "my", "me", "i", "we", "you",
+}
+
+_IDENT_RE = re.compile(r"[A-Za-z][A-Za-z0-9]*")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def _terms(text: str) -> set:
+    """Lower-case words of `text`, with camelCase/snake_case identifiers split into parts."""
+    terms = set()
+    for ident in _IDENT_RE.findall(text):
+        parts = [p.lower() for p in _CAMEL_RE.findall(ident)]
+        terms.update(parts)
+        if len(parts) > 1:
+            terms.add(ident.lower())
+    return {t for t in terms if len(t) > 1 and t not in _STOPWORDS}
+
+
+def _stem(term: str) -> str:
+    # Plural and verb forms of the same word should match ("tasks" ~ "task")
+    for suffix in ("ies", "es", "s", "ing", "ed"):
+        if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+            return term[:-len(suffix)] + ("y" if suffix == "ies" else "")
+    return term
+
+
+# ------------------ INDEX ------------------
+
+def index_file(file_path: str, content: str) -> dict:
+    """Facts used to score and summarize one file (built on the project index)."""
+    facts = project_index.index_file(file_path, content)
+
+    imports = [imp["source"] if isinstance(imp, dict) else imp for imp in facts["imports"]]
+    routes = [route["path"] for route in facts["routes"]] + facts.get("api_calls", [])
+    components = list(facts.get("used_components", []))
+    if facts.get("default_export"):
+        components.insert(0, facts["default_export"])
+
+    return {
+        "path": file_path,
+        "imports": sorted(set(imports)),
+        "symbols": sorted(set(facts["symbols"])),
+        "routes": sorted(set(routes)),
+        "components": sorted(set(components)),
+        "lines": content.count("\n") + 1,
+        "terms": {_stem(t) for t in _terms(content)},
+    }
+
+
+def summarize(info: dict) -> str:
+    """One-line description of an indexed file."""
+    parts = [f"{info['lines']} lines"]
+    if info["components"]:
+        parts.append("components: " + ", ".join(info["components"][:8]))
+    if info["routes"]:
+        parts.append("routes: " + ", ".join(info["routes"][:8]))
+    if info["symbols"]:
+        parts.append("defines: " + ", ".join(info["symbols"][:8]))
+    return f"{info['path']} — " + "; ".join(parts)
+
+
+# ------------------ SCORING ------------------
+
+def score_file(info: dict, query_terms: set) -> float:
+    """Relevance of an indexed file to the (stemmed) request terms."""
+    if not query_terms:
+        return PRIOR.get(info["path"], 0.0)
+
+    def hits(values) -> int:
+        found = set()
+        for value in values:
+            found |= {_stem(t) for t in _terms(value)}
+        return len(found & query_terms)
+
+    score = PRIOR.get(info["path"], 0.0)
+    score += WEIGHTS["path"] * hits([info["path"]])
+    score += WEIGHTS["component"] * hits(info["components"])
+    score += WEIGHTS["route"] * hits(info["routes"])
+    score += WEIGHTS["symbol"] * hits(info["symbols"])
+    score += WEIGHTS["import"] * hits(info["imports"])
+    score += WEIGHTS["content"] * len(info["terms"] & query_terms)
+    return score
+
+
+def rank_files(files: dict, request: str) -> list:
+    """[(score, info), ...] for every file, most relevant first (ties keep project order)."""
+    query_terms = {_stem(t) for t in _terms(request)}
+    scored = []
+    for order, (path, content) in enumerate(files.items()):
+        info = index_file(path, content)
+        scored.append((-score_file(info, query_terms), order, info))
+    scored.sort(key=lambda r: (r[0], r[1]))
+    return [(-neg_score, info) for neg_score, _, info in scored]
+
+
+# ------------------ PACKING ------------------
+
+def pack_context(files: dict, request: str, token_budget: int = None, required=()) -> tuple:
+    """
+    Build the EXISTING FILES section of a prompt.
+
+    The highest-scoring files are included in full while they fit in
+    `token_budget`; every other file is listed as a one-line summary.
+    Paths in `required` are always included in full.
+
+    Returns:
+        (context_text, full_paths)
+    """
+    budget = token_budget or CHAT_CONTEXT_TOKENS
+    ranked = rank_files(files, request)
+
+    summaries = [summarize(info) for _, info in ranked]
+    used = estimate_tokens(["\n".join(summaries)])
+
+    full_paths = []
+    for path in required:
+        if path in files:
+            full_paths.append(path)
+            used += estimate_tokens([files[path]])
+
+    for score, info in ranked:
+        path = info["path"]
+        if path in full_paths or score <= 0:
+            continue
+        cost = estimate_tokens([files[path]])
+        if used + cost > budget:
+            continue
+        full_paths.append(path)
+        used += cost
+
+    sections = [f"### {path}\n```\n{files[path]}\n```" for path in full_paths]
+    rest = [summarize(info) for _, info in ranked if info["path"] not in full_paths]
+    if rest:
+        sections.append("OTHER FILES (summary only):\n" + "\n".join(f"- {line}" for line in rest))
+
+    print(f"   📦 Context: {len(full_paths)} file(s) in full, {len(rest)} summarized (~{used} tokens)")
+    return "\n\n".join(sections), full_paths
@@ -34,14 +34,21 @@ def normalize_code(content: str) -> str:
     return content.strip()
 
 
-def write_files(base_dir: Path, files: dict[str, str]):
+def write_files(base_dir: Path, files: dict[str, str]) -> list[str]:
     """
     Writes files to disk after normalization.
+    Files whose bytes on disk already match are left untouched, so
+    incremental regeneration does not rewrite (or trigger reloads for)
+    files that did not change.
 
     Args:
         base_dir (Path): Root directory of generated project
         files (dict): {relative_path: file_content}
+
+    Returns:
+        list: relative paths that were actually written
     """
+    written = []
 
     for relative_path, raw_content in files.items():
 
@@ -57,5 +64,13 @@ def write_files(base_dir: Path, files: dict[str, str]):
         # Normalize content before writing
         clean_content = normalize_code(raw_content)
 
+        # Skip unchanged bytes
+        data = clean_content.encode("utf-8")
+        if file_path.is_file() and file_path.read_bytes() == data:
+            continue
+
         # Write file
-        file_path.write_text(clean_content, encoding="utf-8")
+        file_path.write_bytes(data)
+        written.append(relative_path)
+
+    return written
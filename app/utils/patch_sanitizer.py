@@ -1,5 +1,30 @@
+"""
+patch_sanitizer.py
+------------------
+Parses and applies LLM-produced edits to existing files.
+- Search/replace blocks (preferred) and unified diffs are both accepted
+- Each edit is located exactly, then ignoring indentation, then fuzzily
+  (difflib similarity over a window of lines)
+- An edit that matches nowhere, matches more than one place or overlaps
+  another edit is a conflict; a file with any conflict is left untouched
+  so the caller can fall back to a full-file rewrite
+"""
+
 import re
 import json
+from difflib import SequenceMatcher
+
+# Minimum similarity for a fuzzy match, and how close a runner-up may get
+# before the match is considered ambiguous
+FUZZY_THRESHOLD = 0.85
+FUZZY_AMBIGUITY_MARGIN = 0.02
+
+_SEARCH_REPLACE_RE = re.compile(
+    r"^FILE:[ \t]*`?(?P<path>[^\n`]+?)`?[ \t]*\n"
+    r"(?:```[^\n]*\n)?"
+    r"<{5,9}[ \t]*SEARCH[ \t]*\n(?P<search>.*?)^={5,9}[ \t]*\n(?P<replace>.*?)^>{5,9}[ \t]*REPLACE[ \t]*$",
+    re.MULTILINE | re.DOTALL | re.IGNORECASE,
+)
 
 
 def extract_patch_json(text: str):
@@ -23,3 +48,230 @@ def extract_patch_json(text: str):
     except Exception:
         # fallback – let python repair it
         return json.loads(raw.encode("utf-8", "ignore").decode())
+
+
+# ------------------ PARSING ------------------
+
+def parse_search_replace(text: str) -> list:
+    """
+    Parse blocks shaped like:
+
+        FILE: path/to/file
+        <<<<<<< SEARCH
+        exact lines to find
+        =======
+        replacement lines
+        >>>>>>> REPLACE
+
+    An empty SEARCH creates the file (or appends to it).
+    Returns [{"path", "search", "replace"}, ...] in order.
+    """
+    edits = []
+    for match in _SEARCH_REPLACE_RE.finditer(text.replace("\r\n", "\n")):
+        edits.append({
+            "path": match.group("path").strip(),
+            "search": match.group("search"),
+            "replace": match.group("replace"),
+        })
+    return edits
+
+
+def parse_unified_diff(text: str) -> list:
+    """Parse a unified diff into the same edit dicts as parse_search_replace (one per hunk)."""
+    edits = []
+    path = None
+    old, new = None, None
+
+    def flush():
+        if path and old is not None and (old or new):
+            edits.append({"path": path, "search": "\n".join(old), "replace": "\n".join(new)})
+
+    lines = text.replace("\r\n", "\n").split("\n")
+    for i, line in enumerate(lines):
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            flush()
+            old, new = None, None
+            target = lines[i + 1][4:].split("\t")[0].strip()
+            # Deleted files (+++ /dev/null) are not supported as edits
+            path = None if target == "/dev/null" else re.sub(r"^[ab]/", "", target)
+        elif line.startswith("+++ ") and old is None:
+            continue
+        elif line.startswith("@@"):
+            flush()
+            old, new = [], []
+        elif old is None:
+            continue
+        elif line.startswith("+"):
+            new.append(line[1:])
+        elif line.startswith("-"):
+            old.append(line[1:])
+        elif line.startswith(" ") or line == "":
+            old.append(line[1:])
+            new.append(line[1:])
+        elif line.startswith("\\"):
+            continue                      # "\ No newline at end of file"
+        else:
+            flush()
+            old, new = None, None
+    flush()
+    return edits
+
+
+def parse_edits(text: str) -> list:
+    """Edits from an LLM reply: search/replace blocks, or a unified diff if there are none."""
+    return parse_search_replace(text) or parse_unified_diff(text)
+
+
+# ------------------ MATCHING ------------------
+
+def _trim_blank_edges(lines: list) -> list:
+    start, end = 0, len(lines)
+    while start < end and not lines[start].strip():
+        start += 1
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    return lines[start:end]
+
+
+def _unique(starts: list, size: int):
+    if len(starts) == 1:
+        return (starts[0], starts[0] + size), None
+    if starts:
+        return None, f"ambiguous ({len(starts)} matches)"
+    return None, None
+
+
+def _locate(lines: list, needle: list):
+    """
+    Find `needle` in `lines`. Returns ((start, end), None) on a unique match,
+    (None, reason) on a conflict.
+    """
+    n = len(needle)
+
+    # 1. Exact
+    starts = [i for i in range(len(lines) - n + 1) if lines[i:i + n] == needle]
+    span, reason = _unique(starts, n)
+    if span or reason:
+        return span, reason
+
+    # 2. Ignoring leading/trailing whitespace on every line
+    stripped = [line.strip() for line in lines]
+    needle_stripped = [line.strip() for line in needle]
+    starts = [i for i in range(len(lines) - n + 1) if stripped[i:i + n] == needle_stripped]
+    span, reason = _unique(starts, n)
+    if span or reason:
+        return span, reason
+
+    # 3. Fuzzy: best window of similar size (the model may drop or add a line)
+    target = "\n".join(needle_stripped)
+    scored = []
+    for size in {max(1, n - 1), n, n + 1}:
+        for i in range(len(lines) - size + 1):
+            matcher = SequenceMatcher(None, "\n".join(stripped[i:i + size]), target, autojunk=False)
+            if matcher.real_quick_ratio() < FUZZY_THRESHOLD or matcher.quick_ratio() < FUZZY_THRESHOLD:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= FUZZY_THRESHOLD:
+                scored.append((ratio, i, i + size))
+    if not scored:
+        return None, "not found"
+
+    scored.sort(reverse=True)
+    best_ratio, start, end = scored[0]
+    for ratio, other_start, other_end in scored[1:]:
+        if best_ratio - ratio > FUZZY_AMBIGUITY_MARGIN:
+            break
+        if other_end <= start or other_start >= end:
+            return None, "ambiguous (several similar matches)"
+    return (start, end), None
+
+
+def _reindent(replace: list, matched: list, needle: list) -> list:
+    """Shift the replacement by the indentation difference between the file and the SEARCH text."""
+    def indent(block):
+        for line in block:
+            if line.strip():
+                return line[:len(line) - len(line.lstrip())]
+        return ""
+
+    have, wanted = indent(matched), indent(needle)
+    if have == wanted:
+        return replace
+    if have.startswith(wanted):
+        extra = have[len(wanted):]
+        return [extra + line if line.strip() else line for line in replace]
+    if wanted.startswith(have):
+        extra = wanted[len(have):]
+        return [line[len(extra):] if line.startswith(extra) else line for line in replace]
+    return replace
+
+
+# ------------------ APPLYING ------------------
+
+def apply_edits(content: str, edits: list):
+    """
+    Apply the edits of one file.
+
+    Returns:
+        (new_content, conflicts) — conflicts is a list of
+        {"search", "reason"}; when it is non-empty new_content is the
+        original content unchanged.
+    """
+    lines = content.split("\n")
+    spans = []
+    appended = []
+    conflicts = []
+
+    for edit in edits:
+        needle = _trim_blank_edges(edit["search"].split("\n"))
+        replace = _trim_blank_edges(edit["replace"].split("\n"))
+        if not needle:
+            appended.extend(replace)
+            continue
+
+        span, reason = _locate(lines, needle)
+        if span and any(span[0] < end and start < span[1] for start, end, _ in spans):
+            span, reason = None, "overlaps another edit"
+        if not span:
+            conflicts.append({"search": "\n".join(needle)[:120], "reason": reason})
+            continue
+        spans.append((span[0], span[1], _reindent(replace, lines[span[0]:span[1]], needle)))
+
+    if conflicts:
+        return content, conflicts
+
+    for start, end, replace in sorted(spans, key=lambda s: s[0], reverse=True):
+        lines[start:end] = replace
+    if appended:
+        if content.strip():
+            lines = _trim_blank_edges(lines) + [""] + appended
+        else:
+            lines = appended
+    return "\n".join(lines), []
+
+
+def apply_patches(files: dict, edits: list):
+    """
+    Apply parsed edits to a {path: content} mapping.
+    Each file is patched atomically: if any of its edits conflicts, none are applied.
+
+    Returns:
+        (updated_files, conflicts) — updated_files holds only the files that
+        changed; conflicts maps path -> list of {"search", "reason"}.
+    """
+    by_path = {}
+    for edit in edits:
+        by_path.setdefault(edit["path"], []).append(edit)
+
+    updated = {}
+    conflicts = {}
+    for path, file_edits in by_path.items():
+        if path not in files and any(e["search"].strip() for e in file_edits):
+            conflicts[path] = [{"search": "", "reason": "file does not exist"}]
+            continue
+        new_content, file_conflicts = apply_edits(files.get(path, ""), file_edits)
+        if file_conflicts:
+            conflicts[path] = file_conflicts
+        elif new_content != files.get(path):
+            updated[path] = new_content
+    return updated, conflicts
@@ -0,0 +1,373 @@
+"""
+project_index.py
+----------------
+Parsed facts about the files of a generated project, computed once per
+file content and shared by every node that needs them.
+- Python files are parsed with `ast` (routes, methods, JSON body keys,
+  imports, definitions); code that does not parse falls back to regexes
+- JSX/JS files go through a lightweight scanner (imports, default export,
+  components used in JSX, API calls)
+- Facts are memoized by content hash, so re-indexing a project after one
+  file changed only parses that file
+"""
+
+import ast
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+# Memoized facts: (kind, sha1 of content) -> facts
+FACTS_CACHE_SIZE = 2048
+
+# PascalCase JSX elements that are never project components
+JSX_BUILTINS = {
+    'React', 'Fragment', 'Suspense', 'StrictMode', 'Profiler',
+    'App',  # Don't import App from within App.jsx
+}
+
+_facts_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+_HTTP_SHORTCUTS = {"get", "post", "put", "delete", "patch"}
+
+
+def _kind(file_path: str) -> str:
+    if file_path.endswith(".py"):
+        return "python"
+    if file_path.endswith((".jsx", ".js", ".tsx", ".ts")):
+        return "jsx"
+    return "other"
+
+
+def index_file(file_path: str, content: str) -> dict:
+    """Facts about one file (see index_python / index_jsx). Memoized by content."""
+    kind = _kind(file_path)
+    key = (kind, hashlib.sha1(content.encode("utf-8", "replace")).hexdigest())
+    with _cache_lock:
+        facts = _facts_cache.get(key)
+        if facts is not None:
+            _facts_cache.move_to_end(key)
+            return facts
+
+    if kind == "python":
+        facts = index_python(content)
+    elif kind == "jsx":
+        facts = index_jsx(content)
+    else:
+        facts = {"kind": "other", "imports": [], "symbols": [], "routes": []}
+
+    with _cache_lock:
+        _facts_cache[key] = facts
+        while len(_facts_cache) > FACTS_CACHE_SIZE:
+            _facts_cache.popitem(last=False)
+    return facts
+
+
+def normalize_route_path(path: str) -> str:
+    """Dynamic params become a sample value for contract tests: /items/<int:id> -> /items/1"""
+    return re.sub(r"<[^>]+>", "1", path)
+
+
+# ------------------ PYTHON ------------------
+
+def index_python(code: str) -> dict:
+    """
+    {"kind": "python", "parsed": bool, "imports": [module], "symbols": [name],
+     "routes": [{"path", "methods", "function", "json_keys"}]} — routes in source order.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return _index_python_fallback(code)
+
+    imports, symbols, routes = [], [], []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            imports.append(node.module)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            symbols.append(node.name)
+            if not isinstance(node, ast.ClassDef):
+                routes.extend(_function_routes(node))
+
+    routes.sort(key=lambda r: r.pop("_line"))
+    return {"kind": "python", "parsed": True, "imports": imports, "symbols": symbols, "routes": routes}
+
+
+def _function_routes(func) -> list:
+    routes = []
+    keys = None
+    for decorator in func.decorator_list:
+        if not (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute)):
+            continue
+        attr = decorator.func.attr
+        if attr != "route" and attr not in _HTTP_SHORTCUTS:
+            continue
+        if not decorator.args or not isinstance(decorator.args[0], ast.Constant):
+            continue
+        path = decorator.args[0].value
+        if not isinstance(path, str):
+            continue
+
+        if attr == "route":
+            methods = ["GET"]  # Default method
+            for kw in decorator.keywords:
+                if kw.arg == "methods" and isinstance(kw.value, (ast.List, ast.Tuple, ast.Set)):
+                    methods = [e.value.upper() for e in kw.value.elts
+                               if isinstance(e, ast.Constant) and isinstance(e.value, str)]
+        else:
+            methods = [attr.upper()]
+
+        if keys is None:
+            keys = _json_keys(func)
+        routes.append({
+            "path": path,
+            "methods": methods,
+            "function": func.name,
+            "json_keys": keys,
+            "_line": decorator.lineno,
+        })
+    return routes
+
+
+def _is_get_json(node) -> bool:
+    """request.get_json(...) / request.json / request.get_json() or {}"""
+    if isinstance(node, ast.BoolOp):
+        return any(_is_get_json(v) for v in node.values)
+    if isinstance(node, ast.Call):
+        node = node.func
+        return isinstance(node, ast.Attribute) and node.attr == "get_json"
+    return isinstance(node, ast.Attribute) and node.attr == "json" and getattr(node.value, "id", None) == "request"
+
+
+def _json_keys(func) -> list:
+    """
+    JSON body keys a route handler reads:
+    'key' (not) in data, data.get('key'), data['key'], request.get_json().get('key')
+    """
+    data_vars = {"data"}
+    for node in ast.walk(func):
+        if isinstance(node, ast.Assign) and _is_get_json(node.value):
+            data_vars.update(t.id for t in node.targets if isinstance(t, ast.Name))
+
+    def is_data(node) -> bool:
+        return (isinstance(node, ast.Name) and node.id in data_vars) or _is_get_json(node)
+
+    keys = []
+    for node in ast.walk(func):
+        key = None
+        if isinstance(node, ast.Compare) and len(node.ops) == 1 and isinstance(node.ops[0], (ast.In, ast.NotIn)):
+            if isinstance(node.left, ast.Constant) and is_data(node.comparators[0]):
+                key = node.left.value
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "get":
+            if is_data(node.func.value) and node.args and isinstance(node.args[0], ast.Constant):
+                key = node.args[0].value
+        elif isinstance(node, ast.Subscript) and is_data(node.value):
+            index = node.slice
+            if isinstance(index, ast.Constant):
+                key = index.value
+        if isinstance(key, str) and re.fullmatch(r"\w+", key) and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def _index_python_fallback(code: str) -> dict:
+    """Regex facts for Python that does not parse (e.g. truncated LLM output)."""
+    routes = []
+    pattern = r"@app\.route\(['\"]([^'\"]+)['\"](?:,\s*methods=\[([^\]]+)\])?"
+    for match in re.finditer(pattern, code):
+        path, methods_str = match.group(1), match.group(2)
+        methods = [m.upper() for m in re.findall(r"['\"](\w+)['\"]", methods_str)] if methods_str else ["GET"]
+        routes.append({
+            "path": path,
+            "methods": methods,
+            "function": None,
+            "json_keys": _regex_json_keys(code, match.end()),
+        })
+
+    imports = [a or b for a, b in re.findall(r"^\s*(?:from\s+([\w.]+)\s+import|import\s+([\w.]+))", code, re.M)]
+    symbols = re.findall(r"^\s*(?:async\s+)?(?:def|class)\s+(\w+)", code, re.M)
+    return {"kind": "python", "parsed": False, "imports": imports, "symbols": symbols, "routes": routes}
+
+
+def _regex_json_keys(code: str, start: int) -> list:
+    # Handler body: from the decorator to the next route or the __main__ block
+    end = re.compile(r"\n@app\.route|\nif __name__").search(code, start)
+    block = code[start:end.start() if end else len(code)]
+    keys = []
+    for pattern in (
+        r"['\"](\w+)['\"]\s+not\s+in\s+data",
+        r"data\.get\(['\"](\w+)['\"]",
+        r"data\[['\"](\w+)['\"]\]",
+        r"request\.get_json\(\)[^.]*\.get\(['\"](\w+)['\"]",
+    ):
+        keys.extend(k for k in re.findall(pattern, block) if k not in keys)
+    return keys
+
+
+# ------------------ JSX / JS ------------------
+
+_IMPORT_RE = re.compile(
+    r"^[ \t]*import\s+"
+    r"(?:(?P<default>\w+)\s*,?\s*)?"
+    r"(?:\{(?P<named>[^}]*)\}\s*)?"
+    r"(?:\*\s*as\s+(?P<namespace>\w+)\s*)?"
+    r"from\s+['\"](?P<source>[^'\"]+)['\"]\s*;?"
+    r"|^[ \t]*import\s+['\"](?P<bare>[^'\"]+)['\"]\s*;?",
+    re.MULTILINE,
+)
+
+
+def index_jsx(code: str) -> dict:
+    """
+    {"kind": "jsx", "imports": [{"line", "text", "default", "named", "source", "side_effect"}],
+     "imported_names": [..], "symbols": [..], "default_export": name | None,
+     "used_components": [..], "api_calls": [..], "routes": []}
+    """
+    imports = []
+    for match in _IMPORT_RE.finditer(code):
+        named = []
+        for part in (match.group("named") or "").split(","):
+            # import { a as b } binds b
+            name = part.strip().split(" as ")[-1].strip()
+            if name:
+                named.append(name)
+        if match.group("namespace"):
+            named.append(match.group("namespace"))
+        imports.append({
+            "line": code.count("\n", 0, match.start()),
+            "text": match.group(0).strip(),
+            "default": match.group("default"),
+            "named": named,
+            "source": match.group("source") or match.group("bare"),
+            "side_effect": match.group("bare") is not None,
+        })
+
+    imported_names = []
+    for imp in imports:
+        for name in ([imp["default"]] if imp["default"] else []) + imp["named"]:
+            if name not in imported_names:
+                imported_names.append(name)
+
+    symbols = []
+    for a, b in re.findall(r"function\s+(\w+)|(?:const|let)\s+(\w+)\s*=\s*(?:async\s*)?(?:\([^)]*\)|\w+)\s*=>", code):
+        name = a or b
+        if name not in symbols:
+            symbols.append(name)
+
+    default_export = re.search(r"export\s+default\s+(?:function\s+|class\s+)?([A-Za-z_]\w*)", code)
+
+    used = []
+    for name in re.findall(r"<([A-Z][A-Za-z0-9]+)", code):
+        if name not in used:
+            used.append(name)
+
+    api_calls = []
+    for url in re.findall(r"(?:axios\.\w+|fetch)\(\s*[`'\"]([^`'\"$]+)", code):
+        if url not in api_calls:
+            api_calls.append(url)
+
+    return {
+        "kind": "jsx",
+        "imports": imports,
+        "imported_names": imported_names,
+        "symbols": symbols,
+        "default_export": default_export.group(1) if default_export else None,
+        "used_components": used,
+        "api_calls": api_calls,
+        "routes": [],
+    }
+
+
+def missing_component_imports(code: str, file_path: str = "App.jsx") -> list:
+    """PascalCase components used in JSX but never imported (builtins excluded)."""
+    facts = index_file(file_path, code)
+    imported = set(facts["imported_names"])
+    return sorted(c for c in facts["used_components"] if c not in JSX_BUILTINS and c not in imported)
+
+
+def add_imports(code: str, file_path: str, import_lines: list) -> str:
+    """Insert import lines after the file's last import (or at the top)."""
+    lines = code.split("\n")
+    facts = index_file(file_path, code)
+    if facts.get("imports"):
+        last = facts["imports"][-1]
+        at = last["line"] + last["text"].count("\n") + 1
+        lines[at:at] = import_lines
+    else:
+        lines = import_lines + [""] + lines
+    return "\n".join(lines)
+
+
+# ------------------ BACKEND QUERIES ------------------
+
+def backend_routes(code: str) -> list:
+    """Route dicts of a Flask backend, in source order."""
+    return index_file("backend/app.py", code)["routes"]
+
+
+def route_paths(code: str) -> list:
+    """Distinct route paths of a Flask backend, as written (/items/<int:id>)."""
+    paths = []
+    for route in backend_routes(code):
+        if route["path"] not in paths:
+            paths.append(route["path"])
+    return paths
+
+
+# ------------------ PROJECT ------------------
+
+class ProjectIndex:
+    """
+    Facts for every file of a project, refreshed incrementally: update()
+    re-indexes only paths whose content changed. Thread-safe.
+    """
+
+    def __init__(self, files: dict = None):
+        self._lock = threading.Lock()
+        self._digests = {}     # path -> sha1 of the indexed content
+        self._facts = {}       # path -> facts
+        if files:
+            self.update(files)
+
+    def update(self, files: dict, prune: bool = True) -> list:
+        """Index changed files (and drop vanished ones when prune); returns the changed paths."""
+        changed = []
+        with self._lock:
+            for path, content in files.items():
+                digest = hashlib.sha1((content or "").encode("utf-8", "replace")).hexdigest()
+                if self._digests.get(path) == digest:
+                    continue
+                self._digests[path] = digest
+                self._facts[path] = index_file(path, content or "")
+                changed.append(path)
+            if prune:
+                for path in set(self._facts) - set(files):
+                    del self._facts[path]
+                    del self._digests[path]
+        return changed
+
+    def facts(self, path: str) -> dict | None:
+        with self._lock:
+            return self._facts.get(path)
+
+    def paths(self) -> list:
+        with self._lock:
+            return list(self._facts)
+
+    def component_names(self) -> set:
+        """Components that exist as files under components/."""
+        with self._lock:
+            return {
+                path.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+                for path in self._facts
+                if "components/" in path and path.endswith((".jsx", ".js", ".tsx"))
+            }
+
+    def routes(self) -> list:
+        """Routes of every Python file, backend first."""
+        with self._lock:
+            ordered = sorted(self._facts.items(), key=lambda item: item[0] != "backend/app.py")
+            return [route for _, facts in ordered for route in facts.get("routes", [])]
@@ -0,0 +1,189 @@
+"""
+route_slicer.py
+---------------
+Route-level slices of a Flask backend for targeted repair.
+- slice_routes() cuts the handlers of the failing routes out of
+  backend/app.py, together with the imports, module-level state and
+  helper functions they use
+- splice_routes() puts the repaired handlers back: functions replace the
+  originals with the same name or method + route, new functions go before the
+  __main__ block and new imports after the existing ones
+Both work on the ast of the file; code that does not parse is not sliced.
+"""
+
+import ast
+
+from app.utils.project_index import normalize_route_path
+
+_HTTP_SHORTCUTS = {"get", "post", "put", "delete", "patch"}
+
+
+def _route_keys(func) -> list:
+    """(METHOD, normalized path) pairs served by a function's route decorators."""
+    keys = []
+    for dec in func.decorator_list:
+        if not (isinstance(dec, ast.Call) and isinstance(dec.func, ast.Attribute)):
+            continue
+        if dec.func.attr != "route" and dec.func.attr not in _HTTP_SHORTCUTS:
+            continue
+        if not (dec.args and isinstance(dec.args[0], ast.Constant) and isinstance(dec.args[0].value, str)):
+            continue
+        path = normalize_route_path(dec.args[0].value)
+        if dec.func.attr != "route":
+            methods = [dec.func.attr.upper()]
+        else:
+            methods = ["GET"]
+            for kw in dec.keywords:
+                if kw.arg == "methods" and isinstance(kw.value, (ast.List, ast.Tuple, ast.Set)):
+                    methods = [str(e.value).upper() for e in kw.value.elts if isinstance(e, ast.Constant)]
+        keys.extend((method, path) for method in methods)
+    return keys
+
+
+def _span(node) -> tuple:
+    """(first, last) 1-based lines of a statement, decorators included."""
+    first = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+    return first, node.end_lineno
+
+
+def _segment(lines: list, node) -> str:
+    first, last = _span(node)
+    return "\n".join(lines[first - 1:last])
+
+
+def _names_used(node) -> set:
+    return {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}
+
+
+def _is_main_guard(node) -> bool:
+    return (
+        isinstance(node, ast.If)
+        and isinstance(node.test, ast.Compare)
+        and getattr(node.test.left, "id", None) == "__name__"
+    )
+
+
+def slice_routes(code: str, failing_routes: list) -> dict | None:
+    """
+    Slice of `code` needed to repair `failing_routes` ([(method, path), ...]
+    with contract-test paths such as /api/items/1).
+
+    Returns None when the code does not parse, else:
+        {"handlers": source of the failing handlers (may be empty for missing routes),
+         "context": imports + module-level state + helpers they use,
+         "functions": names of the sliced handlers,
+         "missing": failing routes no handler serves yet}
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    lines = code.split("\n")
+
+    wanted = {(method.upper(), normalize_route_path(path)) for method, path in failing_routes}
+    routes, helpers = [], {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            keys = _route_keys(node)
+            if keys:
+                routes.append((node, set(keys)))
+            else:
+                helpers[node.name] = node
+
+    # The handler serving each failing route; a route without one (404/405)
+    # brings the handlers of the same path, which may just lack the method
+    handlers, missing = [], []
+    for method, path in sorted(wanted):
+        serving = [node for node, keys in routes if (method, path) in keys]
+        if not serving:
+            missing.append((method, path))
+            serving = [node for node, keys in routes if path in {p for _, p in keys}]
+        handlers.extend(node for node in serving if node not in handlers)
+    handlers.sort(key=lambda node: node.lineno)
+
+    # Helpers reachable from the handlers
+    used = set().union(*(_names_used(h) for h in handlers)) if handlers else set()
+    needed, queue = [], [name for name in helpers if name in used]
+    while queue:
+        name = queue.pop()
+        if name in needed:
+            continue
+        needed.append(name)
+        used |= _names_used(helpers[name])
+        queue.extend(n for n in helpers if n in used and n not in needed)
+
+    context = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            context.append(_segment(lines, node))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names = {n.id for t in targets for n in ast.walk(t) if isinstance(n, ast.Name)}
+            if names & (used | {"app"}):
+                context.append(_segment(lines, node))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name in needed:
+            context.append(_segment(lines, node))
+
+    return {
+        "handlers": "\n\n".join(_segment(lines, h) for h in handlers),
+        "context": "\n".join(context),
+        "functions": [h.name for h in handlers],
+        "missing": missing,
+    }
+
+
+def splice_routes(code: str, fixed: str) -> str | None:
+    """
+    Merge repaired functions (and any new imports) from `fixed` into `code`.
+    Returns None when either side does not parse or `fixed` holds no function.
+    """
+    try:
+        tree = ast.parse(code)
+        fixed_tree = ast.parse(fixed)
+    except SyntaxError:
+        return None
+    lines = code.split("\n")
+    fixed_lines = fixed.split("\n")
+
+    by_name, by_route = {}, {}
+    last_import, main_line = 0, len(lines) + 1
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            by_name[node.name] = node
+            for key in _route_keys(node):
+                by_route.setdefault(key, node)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            last_import = node.end_lineno
+        elif _is_main_guard(node) and main_line > len(lines):
+            main_line = node.lineno
+
+    # (first line, last line, replacement) in original line numbers; an
+    # insertion has last = first - 1
+    edits, replaced, new_imports, new_functions = [], set(), [], []
+    for node in fixed_tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            segment = _segment(fixed_lines, node)
+            original = by_name.get(node.name)
+            if original is None:
+                original = next((by_route[k] for k in _route_keys(node) if k in by_route), None)
+            if original is None:
+                new_functions.append(segment)
+            elif id(original) not in replaced:
+                replaced.add(id(original))
+                first, last = _span(original)
+                edits.append((first, last, segment))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            segment = _segment(fixed_lines, node)
+            if segment.strip() not in {line.strip() for line in lines}:
+                new_imports.append(segment)
+
+    if not edits and not new_functions:
+        return None
+    if new_imports:
+        edits.append((last_import + 1, last_import, "\n".join(new_imports)))
+    if new_functions:
+        edits.append((main_line, main_line - 1, "\n\n".join(new_functions) + "\n\n"))
+
+    for first, last, text in sorted(edits, key=lambda e: e[0], reverse=True):
+        lines[first - 1:last] = text.split("\n")
+    return "\n".join(lines)
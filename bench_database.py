@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+bench_database.py
+-----------------
+Micro-benchmark of per-call overhead in app/core/database.py:
+a fresh connection per call (the old _get_conn) vs the connection pool.
+Runs against a throw-away database; workspace/projects.db is not touched.
+
+Usage:
+    python bench_database.py [calls]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core import database
+
+
+def connect_per_call() -> sqlite3.Connection:
+    """_get_conn() before pooling: connect, makedirs and pragmas on every call."""
+    os.makedirs(os.path.dirname(database.DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def timed(label: str, fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    per_call = (time.perf_counter() - start) / calls * 1e6
+    print(f"   {label:<36} {per_call:9.1f} µs/call")
+    return per_call
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    database.DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+    database.init_db()
+
+    project_ids = [
+        database.save_project(f"project {i}", "bench prompt", "react-flask",
+                              {"backend/app.py": "print('hi')\n"}, [])
+        for i in range(200)
+    ]
+    project_id = project_ids[0]
+
+    workloads = {
+        "save_message": lambda: database.save_message(project_id, "user", "hello"),
+        "list_projects (200 rows)": database.list_projects,
+        "load_sdlc_stages": lambda: database.load_sdlc_stages(project_id),
+    }
+
+    pooled_get_conn = database._get_conn
+    print(f"\n📊 {calls} calls each, database: {database.DB_PATH}\n")
+    for label, fn in workloads.items():
+        database._get_conn = connect_per_call
+        before = timed(f"{label} [per call]", fn, calls)
+        database._get_conn = pooled_get_conn
+        after = timed(f"{label} [pooled]", fn, calls)
+        print(f"   → {before / after:.1f}x faster\n")
+
+
+if __name__ == "__main__":
+    main()
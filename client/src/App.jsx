@@ -40,10 +40,13 @@ function EditorView() {
     previewError,
     isGenerating,
     sendPrompt,
+    cancelGeneration,
     startPreview,
     testsStatus,
     loadProject,
-    loadFiles,
+    ensureFileLoaded,
+    loadOlderMessages,
+    hasOlderMessages,
     activeStage,
     setActiveStage,
     completedStages,
@@ -77,16 +80,22 @@ function EditorView() {
   useEffect(() => {
     if (Object.keys(files).length > 0 && !activeFile) {
       const priority = ['frontend/src/App.jsx', 'backend/app.py', 'frontend/src/App.css']
-      const first = priority.find(f => files[f]) || Object.keys(files)[0]
+      const first = priority.find(f => f in files) || Object.keys(files)[0]
       handleOpenFile(first)
     }
   }, [files, activeFile, handleOpenFile])
 
+  // Stored projects load file contents on demand (null = not fetched yet)
+  useEffect(() => {
+    if (activeFile && activeFile in files && files[activeFile] === null) {
+      ensureFileLoaded(activeFile)
+    }
+  }, [files, activeFile, ensureFileLoaded])
+
   const handleVersionRestore = useCallback(() => {
-    // Reload files after version restore
-    if (loadFiles) loadFiles()
+    // Reload the file list after version restore; contents load on open
     if (projectId) loadProject(projectId)
-  }, [loadFiles, loadProject, projectId])
+  }, [loadProject, projectId])
 
   return (
     <div className="app-layout">
@@ -113,8 +122,11 @@ function EditorView() {
           ref={chatRef}
           width={chatWidth}
           messages={messages}
+          hasOlderMessages={hasOlderMessages}
+          onLoadOlder={loadOlderMessages}
           isGenerating={isGenerating}
           onSend={(text) => sendPrompt(text, activeStage)}
+          onCancel={cancelGeneration}
         />
         <ResizeHandle onResize={(dx) => setChatWidth(w => Math.max(300, Math.min(600, w + dx)))} />
 
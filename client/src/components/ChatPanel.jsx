@@ -1,5 +1,5 @@
 import { useState, useRef, useEffect, forwardRef } from 'react'
-import { Send, Sparkles } from 'lucide-react'
+import { Send, Sparkles, Square } from 'lucide-react'
 import './ChatPanel.css'
 
 const SUGGESTIONS = [
@@ -9,15 +9,17 @@ const SUGGESTIONS = [
     { icon: '📝', text: 'Build a notes app with markdown support and folder organization' },
 ]
 
-const ChatPanel = forwardRef(function ChatPanel({ width, messages, isGenerating, onSend }, ref) {
+const ChatPanel = forwardRef(function ChatPanel({ width, messages, hasOlderMessages, onLoadOlder, isGenerating, onSend, onCancel }, ref) {
     const [input, setInput] = useState('')
     const messagesEndRef = useRef(null)
     const textareaRef = useRef(null)
 
-    // Auto-scroll to bottom
+    const lastMessageId = messages[messages.length - 1]?.id
+
+    // Auto-scroll to bottom (not when older history is prepended)
     useEffect(() => {
         messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
-    }, [messages])
+    }, [lastMessageId])
 
     const handleSend = () => {
         if (!input.trim() || isGenerating) return
@@ -73,7 +75,13 @@ const ChatPanel = forwardRef(function ChatPanel({ width, messages, isGenerating,
                         </div>
                     </div>
                 ) : (
-                    messages.map((msg) => {
+                    <>
+                    {hasOlderMessages && (
+                        <button className="load-older-btn" onClick={onLoadOlder}>
+                            Load earlier messages
+                        </button>
+                    )}
+                    {messages.map((msg) => {
                         if (msg.type === 'step' || msg.type === 'step-done') {
                             return (
                                 <div key={msg.id} className={`step-indicator ${msg.type === 'step-done' ? 'done' : ''}`}>
@@ -93,7 +101,8 @@ const ChatPanel = forwardRef(function ChatPanel({ width, messages, isGenerating,
                                 </div>
                             </div>
                         )
-                    })
+                    })}
+                    </>
                 )}
                 <div ref={messagesEndRef} />
             </div>
@@ -110,13 +119,19 @@ const ChatPanel = forwardRef(function ChatPanel({ width, messages, isGenerating,
                         rows={1}
                         disabled={isGenerating}
                     />
-                    <button
-                        className="send-btn"
-                        onClick={handleSend}
-                        disabled={!input.trim() || isGenerating}
-                    >
-                        <Send size={15} />
-                    </button>
+                    {isGenerating && onCancel ? (
+                        <button className="send-btn" onClick={onCancel} title="Stop generation">
+                            <Square size={13} />
+                        </button>
+                    ) : (
+                        <button
+                            className="send-btn"
+                            onClick={handleSend}
+                            disabled={!input.trim() || isGenerating}
+                        >
+                            <Send size={15} />
+                        </button>
+                    )}
                 </div>
             </div>
         </div>
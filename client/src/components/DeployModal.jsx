@@ -1,5 +1,6 @@
 import { useState } from 'react'
 import { X, Rocket, Download, FileCode2, CheckCircle2, Loader2, Box, Cloud, Terminal, Copy, ExternalLink } from 'lucide-react'
+import { apiFetch, withSession } from '../session'
 import './DeployModal.css'
 
 const DEPLOY_TARGETS = [
@@ -44,7 +45,7 @@ export default function DeployModal({ onClose, projectName }) {
         setStatus('loading')
         setError('')
         try {
-            const res = await fetch('/api/deploy/configs', { method: 'POST' })
+            const res = await apiFetch('/api/deploy/configs', { method: 'POST' })
             const data = await res.json()
             if (data.error) {
                 setError(data.error)
@@ -64,9 +65,9 @@ export default function DeployModal({ onClose, projectName }) {
         setError('')
         try {
             // Generate configs first
-            await fetch('/api/deploy/configs', { method: 'POST' })
+            await apiFetch('/api/deploy/configs', { method: 'POST' })
             // Then download
-            window.open('/api/deploy/download-ready', '_blank')
+            window.open(withSession('/api/deploy/download-ready'), '_blank')
             setStatus('success')
         } catch (err) {
             setError(err.message)
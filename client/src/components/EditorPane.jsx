@@ -1,6 +1,7 @@
 import { useRef, useEffect } from 'react'
 import Editor from '@monaco-editor/react'
 import { X, FileCode } from 'lucide-react'
+import { apiFetch } from '../session'
 import './EditorPane.css'
 
 const LANG_MAP = {
@@ -36,7 +37,7 @@ export default function EditorPane({ files, activeFile, openTabs, onOpenFile, on
         // Debounced save
         clearTimeout(window.__saveTimeout)
         window.__saveTimeout = setTimeout(() => {
-            fetch(`/api/file/${activeFile}`, {
+            apiFetch(`/api/file/${activeFile}`, {
                 method: 'PUT',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ content: value }),
@@ -44,7 +45,7 @@ export default function EditorPane({ files, activeFile, openTabs, onOpenFile, on
         }, 1000)
     }
 
-    if (!activeFile || !files[activeFile]) {
+    if (!activeFile || !(activeFile in files)) {
         return (
             <div className="editor-container">
                 <div className="editor-empty-state">
@@ -73,7 +74,14 @@ export default function EditorPane({ files, activeFile, openTabs, onOpenFile, on
                 ))}
             </div>
 
-            {/* Monaco Editor */}
+            {/* Stored file whose content is still being fetched */}
+            {files[activeFile] === null ? (
+                <div className="editor-empty-state">
+                    <FileCode size={36} className="empty-icon" />
+                    <p>Loading {getFileName(activeFile)}…</p>
+                </div>
+            ) : (
+            /* Monaco Editor */
             <div className="editor-wrapper">
                 <Editor
                     key={activeFile}
@@ -100,6 +108,7 @@ export default function EditorPane({ files, activeFile, openTabs, onOpenFile, on
                     }}
                 />
             </div>
+            )}
         </div>
     )
 }
@@ -1,9 +1,10 @@
 import { Zap, Download, Play, ArrowLeft, Loader2, History, Rocket } from 'lucide-react'
 import './Header.css'
+import { withSession } from '../session'
 
 export default function Header({ projectName, isGenerating, onStartPreview, hasFiles, onGoBack, previewLoading, onToggleHistory, onToggleDeploy }) {
     const handleDownload = () => {
-        window.open('/api/download', '_blank')
+        window.open(withSession('/api/download'), '_blank')
     }
 
     return (
@@ -1,5 +1,6 @@
 import { useState, useEffect, useCallback } from 'react'
 import { History, RotateCcw, Save, Clock, FileCode2, X } from 'lucide-react'
+import { apiFetch } from '../session'
 import './VersionHistory.css'
 
 export default function VersionHistory({ projectId, onRestore, onClose }) {
@@ -11,7 +12,7 @@ export default function VersionHistory({ projectId, onRestore, onClose }) {
     const fetchVersions = useCallback(async () => {
         if (!projectId) return
         try {
-            const res = await fetch(`/api/projects/${projectId}/versions`)
+            const res = await apiFetch(`/api/projects/${projectId}/versions`)
             const data = await res.json()
             setVersions(data.versions || [])
         } catch (err) {
@@ -29,7 +30,7 @@ export default function VersionHistory({ projectId, onRestore, onClose }) {
         setSaving(true)
         try {
             const label = prompt('Version label (optional):') || ''
-            await fetch(`/api/projects/${projectId}/versions`, {
+            await apiFetch(`/api/projects/${projectId}/versions`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ label }),
@@ -46,7 +47,7 @@ export default function VersionHistory({ projectId, onRestore, onClose }) {
         if (!window.confirm(`Restore to version ${versionNum}? Current files will be saved as a new version first.`)) return
         setRestoring(versionNum)
         try {
-            const res = await fetch(`/api/projects/${projectId}/versions/${versionNum}/restore`, {
+            const res = await apiFetch(`/api/projects/${projectId}/versions/${versionNum}/restore`, {
                 method: 'POST',
             })
             const data = await res.json()
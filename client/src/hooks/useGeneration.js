@@ -1,4 +1,6 @@
 import { useState, useCallback, useRef, useEffect } from 'react'
+import { io } from 'socket.io-client'
+import { apiFetch, withSession, SESSION_ID } from '../session'
 
 const STEP_LABELS = {
     starting: '🚀 Starting generation...',
@@ -19,11 +21,14 @@ const STEP_LABELS = {
     error: '❌ Error occurred',
     chat_processing: '💬 Processing changes...',
     chat_complete: '✅ Changes applied!',
+    queued: '⏳ Waiting for a free worker...',
+    cancelled: '🛑 Cancelled',
 }
 
 export function useGeneration() {
     const [files, setFiles] = useState({})
     const [messages, setMessages] = useState([])
+    const [messagesCursor, setMessagesCursor] = useState(null) // id before which older history is still unloaded
     const [status, setStatus] = useState('idle') // idle, generating, complete, error
     const [currentStep, setCurrentStep] = useState('')
     const [projectName, setProjectName] = useState('')
@@ -33,6 +38,9 @@ export function useGeneration() {
     const [isGenerating, setIsGenerating] = useState(false)
     const [testsStatus, setTestsStatus] = useState(null)
     const eventSourceRef = useRef(null)
+    const jobIdRef = useRef(null)
+    const projectIdRef = useRef(null)
+    const fileRequestsRef = useRef(new Set())
 
     // SDLC Stage Tracking
     const [activeStage, setActiveStage] = useState('overview')
@@ -82,7 +90,7 @@ export function useGeneration() {
     // Fetch SDLC stages from backend
     const fetchStages = useCallback(async () => {
         try {
-            const res = await fetch('/api/stages')
+            const res = await apiFetch('/api/stages')
             if (res.ok) {
                 const data = await res.json()
                 const completed = []
@@ -105,11 +113,11 @@ export function useGeneration() {
     // Load files from API
     const loadFiles = useCallback(async () => {
         try {
-            const res = await fetch('/api/files')
+            const res = await apiFetch('/api/files')
             const data = await res.json()
             const fileMap = {}
             for (const [path, info] of Object.entries(data.files || {})) {
-                fileMap[path] = info.content
+                fileMap[path] = info.content ?? null  // null: stored file not fetched yet
             }
             setFiles(fileMap)
         } catch (e) {
@@ -121,7 +129,7 @@ export function useGeneration() {
     const startStream = useCallback(() => {
         if (eventSourceRef.current) eventSourceRef.current.close()
 
-        const es = new EventSource('/api/stream')
+        const es = new EventSource(withSession('/api/stream'))
         let lastStep = ''
         eventSourceRef.current = es
 
@@ -131,7 +139,7 @@ export function useGeneration() {
             // Step updates
             if (data.step && data.step !== lastStep) {
                 const label = STEP_LABELS[data.step] || data.step
-                if (data.step !== 'complete' && data.step !== 'error') {
+                if (data.step !== 'complete' && data.step !== 'error' && data.step !== 'cancelled') {
                     addStep(label, false)
                 }
                 setCurrentStep(data.step)
@@ -197,6 +205,11 @@ export function useGeneration() {
                     setIsGenerating(false)
                     markAllStepsDone()
                     addStep('❌ Generation failed', true)
+                } else if (data.step === 'cancelled') {
+                    setStatus('idle')
+                    setIsGenerating(false)
+                    markAllStepsDone()
+                    addStep('🛑 Generation cancelled', true)
                 }
             }
         }
@@ -229,7 +242,7 @@ export function useGeneration() {
         startStream()
 
         try {
-            const res = await fetch(endpoint, {
+            const res = await apiFetch(endpoint, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ prompt: text }),
@@ -241,8 +254,9 @@ export function useGeneration() {
                 setStatus('error')
                 markAllStepsDone()
                 addStep('❌ ' + parseErrorMessage(data.error), true)
-            } else if (targetStage) {
-                setActiveStage(targetStage) // Ensure UI jumps to this stage
+            } else {
+                jobIdRef.current = data.job_id
+                if (targetStage) setActiveStage(targetStage) // Ensure UI jumps to this stage
             }
         } catch (err) {
             setIsGenerating(false)
@@ -252,6 +266,16 @@ export function useGeneration() {
         }
     }, [isGenerating, files, addMessage, addStep, startStream, markAllStepsDone, parseErrorMessage])
 
+    // Cancel the running (or queued) pipeline job
+    const cancelGeneration = useCallback(async () => {
+        if (!jobIdRef.current) return
+        try {
+            await apiFetch(`/api/jobs/${jobIdRef.current}/cancel`, { method: 'POST' })
+        } catch (e) {
+            console.error('Failed to cancel job:', e)
+        }
+    }, [])
+
     // Start preview
     const startPreview = useCallback(async () => {
         setPreviewLoading(true)
@@ -259,7 +283,7 @@ export function useGeneration() {
         setPreviewUrl('')
         addStep('🌐 Starting preview servers...', false)
         try {
-            const res = await fetch('/api/preview/start', { method: 'POST' })
+            const res = await apiFetch('/api/preview/start', { method: 'POST' })
             const data = await res.json()
             if (data.started) {
                 setPreviewUrl(data.url)
@@ -282,20 +306,32 @@ export function useGeneration() {
         }
     }, [addStep, markAllStepsDone])
 
-    // Load a project from the database
+    // Turn stored chat rows into chat panel messages
+    const restoreMessages = (rows) => rows.map((m, i) => ({
+        id: m.id != null ? `db-${m.id}` : Date.now() + i,
+        role: m.role,
+        text: m.text || m.content || '',
+        type: m.type || m.msg_type || 'message',
+        ts: m.ts ? new Date(m.ts) : new Date(),
+    }))
+
+    // Load a project from the database — file contents and older chat
+    // history are fetched on demand (ensureFileLoaded / loadOlderMessages)
     const loadProject = useCallback(async (projectId) => {
         try {
-            const res = await fetch(`/api/projects/${projectId}`)
+            const res = await apiFetch(`/api/projects/${projectId}?lazy=1`)
             if (!res.ok) {
                 console.error('Failed to load project:', res.status)
                 return
             }
             const data = await res.json()
+            projectIdRef.current = projectId
+            fileRequestsRef.current = new Set()
 
-            // Restore files
+            // Every path is known up front; null marks content not fetched yet
             const fileMap = {}
             for (const [path, info] of Object.entries(data.files || {})) {
-                fileMap[path] = typeof info === 'string' ? info : info.content
+                fileMap[path] = typeof info === 'string' ? info : (info.content ?? null)
             }
             setFiles(fileMap)
 
@@ -304,17 +340,9 @@ export function useGeneration() {
                 setProjectName(data.project.name)
             }
 
-            // Restore chat messages
-            if (data.messages?.length > 0) {
-                const restored = data.messages.map((m, i) => ({
-                    id: Date.now() + i,
-                    role: m.role,
-                    text: m.text || m.content || '',
-                    type: m.type || m.msg_type || 'message',
-                    ts: m.ts ? new Date(m.ts) : new Date(),
-                }))
-                setMessages(restored)
-            }
+            // Restore the newest page of chat messages
+            setMessages(restoreMessages(data.messages || []))
+            setMessagesCursor(data.messages_cursor ?? null)
 
             setStatus('complete')
             setCurrentStep('complete')
@@ -330,6 +358,65 @@ export function useGeneration() {
         }
     }, [])
 
+    // Fetch the content of a stored file the first time it is opened
+    const ensureFileLoaded = useCallback(async (path) => {
+        const projectId = projectIdRef.current
+        if (!projectId || !path || fileRequestsRef.current.has(path)) return
+        fileRequestsRef.current.add(path)
+        try {
+            const res = await apiFetch(`/api/projects/${projectId}/files/${path.split('/').map(encodeURIComponent).join('/')}`)
+            if (!res.ok) throw new Error(`HTTP ${res.status}`)
+            const data = await res.json()
+            if (projectIdRef.current !== projectId) return
+            // Streamed or edited content that arrived meanwhile wins
+            setFiles(prev => (prev[path] == null ? { ...prev, [path]: data.content } : prev))
+        } catch (err) {
+            fileRequestsRef.current.delete(path)
+            console.error('Load file error:', err)
+        }
+    }, [])
+
+    // Prepend the previous page of chat history
+    const loadOlderMessages = useCallback(async () => {
+        const projectId = projectIdRef.current
+        if (!projectId || messagesCursor == null) return
+        try {
+            const res = await apiFetch(`/api/projects/${projectId}/messages?before=${messagesCursor}`)
+            if (!res.ok) throw new Error(`HTTP ${res.status}`)
+            const data = await res.json()
+            if (projectIdRef.current !== projectId) return
+            setMessages(prev => [...restoreMessages(data.messages || []), ...prev])
+            setMessagesCursor(data.next_cursor ?? null)
+        } catch (err) {
+            console.error('Load messages error:', err)
+        }
+    }, [messagesCursor])
+
+    // Token streaming — files fill in as the LLM writes them
+    useEffect(() => {
+        const socket = io({ query: { session: SESSION_ID } })
+        const attempts = {}
+
+        socket.on('file_chunk', (data) => {
+            if (!data.path) return
+            if (data.done) {
+                // Final post-processed content replaces the streamed text
+                delete attempts[data.path]
+                setFiles(prev => ({ ...prev, [data.path]: data.content }))
+                return
+            }
+            // First chunk of a file (or of a retry) starts from an empty buffer
+            const restart = attempts[data.path] !== data.attempt
+            attempts[data.path] = data.attempt
+            setFiles(prev => ({
+                ...prev,
+                [data.path]: (restart ? '' : (prev[data.path] || '')) + data.chunk,
+            }))
+        })
+
+        return () => socket.disconnect()
+    }, [])
+
     // Cleanup on unmount
     useEffect(() => {
         return () => {
@@ -349,10 +436,14 @@ export function useGeneration() {
         previewError,
         isGenerating,
         sendPrompt,
+        cancelGeneration,
         startPreview,
         testsStatus,
         loadFiles,
         loadProject,
+        ensureFileLoaded,
+        loadOlderMessages,
+        hasOlderMessages: messagesCursor != null,
         
         // Stage outputs
         activeStage,
@@ -1,6 +1,7 @@
 import { useState, useEffect, useCallback } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { Plus, Search, FileCode2, Calendar, Layers, Trash2, FolderOpen, Download } from 'lucide-react'
+import { apiFetch } from '../session'
 import './ProjectsPage.css'
 
 export default function ProjectsPage() {
@@ -12,7 +13,7 @@ export default function ProjectsPage() {
 
     const fetchProjects = useCallback(async () => {
         try {
-            const res = await fetch('/api/projects')
+            const res = await apiFetch('/api/projects')
             const data = await res.json()
             setProjects(data.projects || [])
         } catch (err) {
@@ -33,7 +34,7 @@ export default function ProjectsPage() {
     const handleDelete = async () => {
         if (!deleteTarget) return
         try {
-            await fetch(`/api/projects/${deleteTarget}`, { method: 'DELETE' })
+            await apiFetch(`/api/projects/${deleteTarget}`, { method: 'DELETE' })
             setProjects(prev => prev.filter(p => p.id !== deleteTarget))
         } catch (err) {
             console.error('Delete failed:', err)
@@ -0,0 +1,24 @@
+// Per-tab session id: every tab gets its own project state on the server.
+// Sent as the X-Session-ID header (fetch) or ?session= (EventSource, SocketIO, downloads).
+
+function loadSessionId() {
+    let id = sessionStorage.getItem('sessionId')
+    if (!id) {
+        id = (crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`)
+        sessionStorage.setItem('sessionId', id)
+    }
+    return id
+}
+
+export const SESSION_ID = loadSessionId()
+
+export function withSession(url) {
+    return `${url}${url.includes('?') ? '&' : '?'}session=${encodeURIComponent(SESSION_ID)}`
+}
+
+export function apiFetch(url, options = {}) {
+    return fetch(url, {
+        ...options,
+        headers: { ...(options.headers || {}), 'X-Session-ID': SESSION_ID },
+    })
+}
@@ -7,6 +7,7 @@ Entry point for the AI Code Factory.
 Usage:
     python run_factory.py "build a todo app with categories"
     python run_factory.py  # Interactive mode
+    python run_factory.py --resume <thread_id>  # Resume a failed run
 """
 
 import sys
@@ -19,7 +20,7 @@ from app.main import run_pipeline, main
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and not sys.argv[1].startswith("--"):
         prompt = " ".join(sys.argv[1:])
         run_pipeline(prompt)
     else:
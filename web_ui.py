@@ -6,25 +6,30 @@ Enhanced with SSE streaming, chat API, and project management.
 import os
 import sys
 import json
-import time
 import zipfile
-import threading
 import io
+import threading
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 
-from flask import Flask, render_template, request, jsonify, Response, send_file
+from flask import Flask, render_template, request, jsonify, Response, send_file, abort
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.core.config import WORKSPACE_DIR
+from app.core.streaming import set_file_chunk_sink, set_stream_channel
+from app.core.event_bus import UPDATE
+from app.core.sessions import DEFAULT_SESSION, SessionManager, is_valid_session_id
+from app.core.jobs import CANCELLED, FairWorkerPool, check_cancelled
 from app.core.database import (
     init_db, save_project, update_project, load_project,
     list_projects as db_list_projects, delete_project,
-    save_message,
+    save_message, get_messages, get_file_manifest, load_file, get_messages_page, ProjectFiles,
+    search as db_search, SEARCH_KINDS,
 )
 
 # Serve React build from client/dist
@@ -33,11 +38,13 @@ app = Flask(__name__, static_folder=CLIENT_DIST, static_url_path='')
 CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
 
-# Global state for current generation
-_current_state = {}
-_generation_lock = threading.Lock()
-_generation_active = False
-_current_project_id = None  # Active DB project ID
+# Per-session working state (project, busy flag, event bus, logs) — see app/core/sessions.py
+_sessions = SessionManager()
+# Pipelines from all sessions share a bounded worker pool, served round-robin
+_pipeline_pool = FairWorkerPool()
+_socket_sessions = {}  # SocketIO sid -> session id
+STREAM_KEEPALIVE_SECONDS = 15
+FINAL_STEPS = ("complete", "error", "cancelled")
 
 # Initialize database on import
 init_db()
@@ -65,22 +72,72 @@ def spa_fallback(e):
     return app.send_static_file("index.html")
 
 
-# Pipeline log buffer for terminal tab
-_log_buffer = []
-MAX_LOG_LINES = 500
-
+# ============================================
+# SESSIONS
+# ============================================
 
-def add_log(message: str):
-    """Add a message to the log buffer."""
-    _log_buffer.append(message)
-    if len(_log_buffer) > MAX_LOG_LINES:
-        _log_buffer.pop(0)
+def _session():
+    """Session of the current request (X-Session-ID header or ?session=, else the default one)."""
+    session_id = request.headers.get("X-Session-ID") or request.args.get("session") or DEFAULT_SESSION
+    if not is_valid_session_id(session_id):
+        abort(400, description="Invalid session id")
+    return _sessions.get(session_id)
+
+
+def _start_pipeline(session, kind: str, target, *args):
+    """
+    Queue `target(session, *args)` on the shared worker pool as a `kind` job
+    (chat / stage / generation — decides its priority).
+    Returns the Job, or None if the session already has a pipeline queued or running.
+    """
+    with session.lock:
+        if session.active:
+            return None
+        session.active = True
+        session.state["current_step"] = "queued"
+        job = _pipeline_pool.submit(
+            session.id, kind, _run_pipeline_job, session, target, *args,
+            on_done=partial(_pipeline_finished, session),
+        )
+        session.job_id = job.id
+    _publish_state(session)
+    ahead = _pipeline_pool.position(job)
+    if ahead:
+        print(f"⏳ Session {session.id}: {kind} job {job.id} queued ({ahead} ahead)")
+    return job
+
+
+def _run_pipeline_job(session, target, *args):
+    """Worker-side wrapper: tags streamed chunks with the session."""
+    set_stream_channel(session.id)
+    # Pipelines work on plain dicts: read a lazily loaded project in full
+    with session.lock:
+        files = session.state.get("files")
+        if isinstance(files, ProjectFiles):
+            session.state["files"] = files.materialize()
+    target(session, *args)
+
+
+def _pipeline_finished(session, job):
+    """Job callback (also for jobs cancelled while queued): clear the session's busy flag."""
+    with session.lock:
+        session.active = False
+        if job.status == CANCELLED:
+            session.state["current_step"] = "cancelled"
+    if job.status == CANCELLED:
+        print(f"🛑 Job {job.id} cancelled")
+        session.add_log(f"[{job.kind}] job {job.id} cancelled")
+    _publish_state(session)
+
+
+def _job_response(job, **extra) -> dict:
+    return {"status": "started", "job_id": job.id, "queue_position": _pipeline_pool.position(job), **extra}
 
 
 @app.route("/api/logs")
 def api_logs():
     """Get pipeline logs for the terminal tab."""
-    return jsonify({"logs": _log_buffer})
+    return jsonify({"logs": _session().logs})
 
 
 # ============================================
@@ -90,23 +147,85 @@ def api_logs():
 @app.route("/api/status")
 def api_status():
     """Current generation status."""
+    session = _session()
     return jsonify({
-        "active": _generation_active,
-        "step": _current_state.get("current_step", "idle"),
-        "project_name": _current_state.get("project_name", ""),
-        "files_count": len(_current_state.get("files", {})),
-        "tests_passed": _current_state.get("tests_passed", False),
-        "preview_url": _current_state.get("preview_url", ""),
+        "active": session.active,
+        "step": session.state.get("current_step", "idle"),
+        "project_name": session.state.get("project_name", ""),
+        "files_count": len(session.state.get("files", {})),
+        "tests_passed": session.state.get("tests_passed", False),
+        "preview_url": session.state.get("preview_url", ""),
+        "thread_id": session.state.get("thread_id"),
+        "stream": session.bus.stats(),
+        "sessions": _sessions.stats(),
+        "workers": _pipeline_pool.stats(),
     })
 
 
+@app.route("/api/llm/cache")
+def api_llm_cache():
+    """LLM response cache counters (hits, misses, size)."""
+    from app.core.llm import get_cache_stats
+    return jsonify(get_cache_stats())
+
+
+@app.route("/api/llm/limits")
+def api_llm_limits():
+    """Per-provider rate budget utilisation and admission queue depth."""
+    from app.core.llm import get_rate_stats
+    return jsonify({"budgets": get_rate_stats()})
+
+
+@app.route("/api/llm/health")
+def api_llm_health():
+    """Circuit breaker state, error rate and latency per provider, plus hedge win counts."""
+    from app.core.llm import get_health_stats, get_hedging_stats
+    return jsonify({"providers": get_health_stats(), "hedging": get_hedging_stats()})
+
+
+@app.route("/api/graphs")
+def api_graphs():
+    """Compiled LangGraph variants and how long each took to compile."""
+    from app.graph.graph import get_graph_stats
+    return jsonify(get_graph_stats())
+
+
+@app.route("/api/jobs")
+def api_jobs():
+    """Pipeline jobs of this session (newest first) plus worker pool load."""
+    session = _session()
+    jobs = [
+        {**job.to_dict(), "queue_position": _pipeline_pool.position(job)}
+        for job in reversed(_pipeline_pool.jobs(owner=session.id))
+    ]
+    return jsonify({"jobs": jobs, "workers": _pipeline_pool.stats()})
+
+
+@app.route("/api/jobs/<job_id>")
+def api_job_detail(job_id):
+    """Status of a single pipeline job."""
+    job = _pipeline_pool.get(job_id)
+    if not job or job.owner != _session().id:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({**job.to_dict(), "queue_position": _pipeline_pool.position(job)})
+
+
+@app.route("/api/jobs/<job_id>/cancel", methods=["POST"])
+def api_job_cancel(job_id):
+    """Cancel a job: dropped if still queued, otherwise stopped at the next pipeline node."""
+    job = _pipeline_pool.get(job_id)
+    if not job or job.owner != _session().id:
+        return jsonify({"error": "Job not found"}), 404
+    if job.finished:
+        return jsonify({"error": f"Job already {job.status}"}), 409
+    _pipeline_pool.cancel(job_id)
+    return jsonify(job.to_dict())
+
+
 @app.route("/api/generate", methods=["POST"])
 def api_generate():
     """Start project generation."""
-    global _generation_active
-    
-    if _generation_active:
-        return jsonify({"error": "Generation already in progress"}), 409
+    session = _session()
 
     data = request.get_json() or {}
     prompt = data.get("prompt", "").strip()
@@ -115,26 +234,20 @@ def api_generate():
     if not prompt:
         return jsonify({"error": "Prompt is required"}), 400
 
-    # Start generation in background thread
-    thread = threading.Thread(
-        target=_run_generation,
-        args=(prompt, project_name),
-        daemon=True,
-    )
-    thread.start()
+    # Queue generation on the worker pool
+    job = _start_pipeline(session, "generation", _run_generation, prompt, project_name)
+    if not job:
+        return jsonify({"error": "Generation already in progress"}), 409
 
-    return jsonify({"status": "started", "prompt": prompt})
+    return jsonify(_job_response(job, prompt=prompt))
 
 
 @app.route("/api/chat", methods=["POST"])
 def api_chat():
     """Send a chat message to modify existing project."""
-    global _generation_active
-
-    if _generation_active:
-        return jsonify({"error": "Generation in progress"}), 409
+    session = _session()
 
-    if not _current_state.get("files"):
+    if not session.state.get("files"):
         return jsonify({"error": "No project loaded. Generate one first."}), 400
 
     data = request.get_json() or {}
@@ -143,25 +256,58 @@ def api_chat():
     if not prompt:
         return jsonify({"error": "Prompt is required"}), 400
 
-    # Start chat refinement in background
-    thread = threading.Thread(
-        target=_run_chat,
-        args=(prompt,),
-        daemon=True,
-    )
-    thread.start()
+    # Queue chat refinement on the worker pool (runs ahead of queued generations)
+    job = _start_pipeline(session, "chat", _run_chat, prompt)
+    if not job:
+        return jsonify({"error": "Generation in progress"}), 409
+
+    return jsonify(_job_response(job, prompt=prompt))
+
 
-    return jsonify({"status": "started", "prompt": prompt})
+@app.route("/api/runs/resumable")
+def api_resumable_runs():
+    """Checkpointed generation runs that failed or were cancelled before finishing."""
+    from app.main import list_resumable_runs
+    return jsonify({"runs": list_resumable_runs()})
+
+
+@app.route("/api/resume", methods=["POST"])
+def api_resume():
+    """Resume a checkpointed generation run (default: this session's last run) from its last completed node."""
+    from app.main import get_resumable_run
+    session = _session()
+
+    data = request.get_json() or {}
+    thread_id = data.get("thread_id") or session.state.get("thread_id")
+    if not thread_id:
+        return jsonify({"error": "thread_id is required"}), 400
+
+    run = get_resumable_run(thread_id)
+    if not run:
+        return jsonify({"error": "Nothing to resume for this run"}), 404
+
+    job = _start_pipeline(session, "generation", _run_generation, "", "", thread_id)
+    if not job:
+        return jsonify({"error": "Generation already in progress"}), 409
+
+    return jsonify(_job_response(job, **run))
 
 
 @app.route("/api/files")
 def api_files():
-    """Get generated file tree and contents."""
-    files = _current_state.get("files", {})
-    project_dir = _current_state.get("project_dir", "")
+    """
+    Get generated file tree and contents. For a lazily loaded project only
+    the contents read so far are included; the rest have content null.
+    """
+    session = _session()
+    files = session.state.get("files", {})
+    project_dir = session.state.get("project_dir", "")
 
     file_tree = {}
-    for file_path, content in files.items():
+    if isinstance(files, ProjectFiles):
+        for file_path, meta in list(files.meta.items()):
+            file_tree[file_path] = {"content": None, "lines": meta["lines"], "size": meta["size"]}
+    for file_path, content in _snapshot_files(session).items():
         file_tree[file_path] = {
             "content": content,
             "lines": len(content.split("\n")),
@@ -177,7 +323,8 @@ def api_files():
 @app.route("/api/file/<path:filepath>")
 def api_file(filepath):
     """Get a single file content."""
-    files = _current_state.get("files", {})
+    session = _session()
+    files = session.state.get("files", {})
     content = files.get(filepath)
 
     if content is None:
@@ -192,6 +339,7 @@ def api_file(filepath):
 @app.route("/api/file/<path:filepath>", methods=["PUT"])
 def api_update_file(filepath):
     """Update a file's content (user edits in Monaco)."""
+    session = _session()
     data = request.get_json() or {}
     content = data.get("content")
 
@@ -199,11 +347,11 @@ def api_update_file(filepath):
         return jsonify({"error": "Content required"}), 400
 
     # Update in state
-    if "files" in _current_state:
-        _current_state["files"][filepath] = content
+    if "files" in session.state:
+        session.state["files"][filepath] = content
 
     # Write to disk
-    project_dir = _current_state.get("project_dir")
+    project_dir = session.state.get("project_dir")
     if project_dir:
         file_path = Path(project_dir) / filepath
         file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -215,11 +363,12 @@ def api_update_file(filepath):
 @app.route("/api/download")
 def api_download():
     """Download generated project as ZIP."""
-    project_dir = _current_state.get("project_dir")
+    session = _session()
+    project_dir = session.state.get("project_dir")
     if not project_dir or not Path(project_dir).exists():
         return jsonify({"error": "No project to download"}), 404
 
-    project_name = _current_state.get("project_name", "project")
+    project_name = session.state.get("project_name", "project")
 
     # Create ZIP in memory
     zip_buffer = io.BytesIO()
@@ -251,28 +400,36 @@ def api_projects():
 
 @app.route("/api/projects/<project_id>")
 def api_project_detail(project_id):
-    """Load a specific project and restore it into current state."""
-    global _current_state, _current_project_id
-
-    data = load_project(project_id)
+    """
+    Load a specific project and restore it into current state.
+    File contents are read lazily; ?lazy=1 returns only file metadata and the
+    newest page of messages (fetch the rest via /files/<path> and /messages).
+    """
+    session = _session()
+    lazy = request.args.get("lazy", "").lower() in ("1", "true", "yes")
+
+    data = load_project(project_id, lazy=True)
     if not data:
         return jsonify({"error": "Project not found"}), 404
 
     project = data['project']
     files = data['files']
-    messages = data['messages']
+    sdlc_db = data['sdlc_stages'] or {}
 
-    # Load SDLC stages saved in the DB for this project (may be empty dict)
-    from app.core.database import load_sdlc_stages as _load_sdlc_stages
-    sdlc_db = _load_sdlc_stages(project_id) or {}
+    # Stored with each file row and cleared when its content changes, so a
+    # code run after a reload skips exactly the files that are still current
+    fingerprints = {path: meta["fingerprint"] for path, meta in files.meta.items() if meta.get("fingerprint")}
 
     # Restore into working state — always replace ALL keys to prevent
     # stale SDLC data from a previous project leaking into this one.
-    with _generation_lock:
-        _current_state = {
+    with session.lock:
+        session.state = {
             "project_name": project['name'],
             "project_dir": project.get('project_dir', ''),
+            "user_prompt": project.get('prompt') or '',
+            "tech_stack": project.get('tech_stack') or 'react-flask',
             "files": files,
+            "file_fingerprints": fingerprints,
             "current_step": "complete",
             "tests_passed": False,
             "preview_url": "",
@@ -283,16 +440,81 @@ def api_project_detail(project_id):
             "task_flows":       sdlc_db.get("task_flows"),
             "user_stories":     sdlc_db.get("user_stories"),
         }
-        _current_project_id = project_id
-
+        session.project_id = project_id
+    _publish_state(session)
+
+    if lazy:
+        return jsonify({
+            "project": project,
+            "files": {path: {k: meta[k] for k in ("lines", "size", "hash")} for path, meta in files.meta.items()},
+            "messages": data['messages'],
+            "messages_cursor": data['messages_cursor'],
+        })
 
+    contents = files.materialize()
     return jsonify({
         "project": project,
-        "files": {path: {"content": content, "lines": len(content.split('\n')), "size": len(content)} for path, content in files.items()},
-        "messages": messages,
+        "files": {
+            path: {"content": contents[path], "lines": meta["lines"], "size": meta["size"]}
+            for path, meta in files.meta.items() if path in contents
+        },
+        "messages": get_messages(project_id),
     })
 
 
+@app.route("/api/projects/<project_id>/manifest")
+def api_project_manifest(project_id):
+    """Path, size, line count and content hash of every stored file (no contents)."""
+    return jsonify({"project_id": project_id, "files": get_file_manifest(project_id)})
+
+
+@app.route("/api/projects/<project_id>/files/<path:filepath>")
+def api_project_file(project_id, filepath):
+    """Content of one stored file."""
+    content = load_file(project_id, filepath)
+    if content is None:
+        return jsonify({"error": "File not found"}), 404
+    return jsonify({"path": filepath, "content": content})
+
+
+@app.route("/api/projects/<project_id>/messages")
+def api_project_messages(project_id):
+    """Chat history page by page, newest first: pass next_cursor back as ?before=."""
+    try:
+        before = int(request.args["before"]) if request.args.get("before") else None
+        limit = int(request.args.get("limit", 50))
+    except ValueError:
+        return jsonify({"error": "before and limit must be integers"}), 400
+    return jsonify(get_messages_page(project_id, before=before, limit=limit))
+
+
+@app.route("/api/search")
+def api_search():
+    """
+    Ranked full-text search over projects, prompts, files and chat history.
+    ?q=<text>&kind=project,file,message&project=<id>&limit=20&offset=0
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+
+    kinds = [k.strip() for k in request.args.get("kind", "").split(",") if k.strip()] or list(SEARCH_KINDS)
+    unknown = [k for k in kinds if k not in SEARCH_KINDS]
+    if unknown:
+        return jsonify({"error": f"Unknown kind(s): {', '.join(unknown)}"}), 400
+    try:
+        limit = int(request.args.get("limit", 20))
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+
+    results = db_search(query, kinds=kinds, project_id=request.args.get("project") or None,
+                        limit=limit, offset=offset)
+    if results is None:
+        return jsonify({"error": "Full-text search is not available (SQLite without FTS5)"}), 503
+    return jsonify({"query": query, **results})
+
+
 @app.route("/api/projects/<project_id>", methods=["DELETE"])
 def api_project_delete(project_id):
     """Delete a project from the database."""
@@ -317,13 +539,14 @@ def api_project_versions(project_id):
 @app.route("/api/projects/<project_id>/versions", methods=["POST"])
 def api_project_save_version(project_id):
     """Save current files as a new version snapshot."""
+    session = _session()
     from app.core.database import save_version
 
     data = request.get_json() or {}
     label = data.get("label", "")
 
     # Get current files from state or DB
-    files = _current_state.get("files", {})
+    files = session.state.get("files", {})
     if not files:
         proj = load_project(project_id)
         if proj:
@@ -340,9 +563,12 @@ def api_project_save_version(project_id):
 def api_project_restore_version(project_id, version_num):
     """Restore files from a specific version. Current files are saved first."""
     from app.core.database import save_version, restore_version
+    session = _session()
 
-    # Save current state before restoring
-    current_files = _current_state.get("files", {})
+    # Save current state before restoring (read a lazily loaded project once)
+    current_files = session.state.get("files", {})
+    if isinstance(current_files, ProjectFiles):
+        current_files = current_files.materialize()
     if current_files:
         save_version(project_id, current_files, label="Auto-save before restore")
 
@@ -350,12 +576,18 @@ def api_project_restore_version(project_id, version_num):
     if restored_files is None:
         return jsonify({"error": "Version not found"}), 404
 
-    # Update in-memory state
-    with _generation_lock:
-        _current_state["files"] = restored_files
+    # Update in-memory state; restored files no longer match their fingerprints
+    with session.lock:
+        session.state["file_fingerprints"] = {
+            path: fingerprint
+            for path, fingerprint in (session.state.get("file_fingerprints") or {}).items()
+            if path in current_files and restored_files.get(path) == current_files[path]
+        }
+        session.state["files"] = restored_files
+    _publish_state(session)
 
     # Write restored files to disk if project_dir exists
-    project_dir = _current_state.get("project_dir")
+    project_dir = session.state.get("project_dir")
     if project_dir:
         for fp, content in restored_files.items():
             full_path = Path(project_dir) / fp
@@ -401,9 +633,10 @@ def api_project_download(project_id):
 @app.route("/api/deploy/configs", methods=["POST"])
 def api_deploy_configs():
     """Generate deployment configuration files for the current project."""
-    files = _current_state.get("files", {})
-    project_dir = _current_state.get("project_dir", "")
-    project_name = _current_state.get("project_name", "my-app")
+    session = _session()
+    files = session.state.get("files", {})
+    project_dir = session.state.get("project_dir", "")
+    project_name = session.state.get("project_name", "my-app")
 
     if not files:
         return jsonify({"error": "No project loaded"}), 400
@@ -502,9 +735,9 @@ __pycache__
             fpath.write_text(content, encoding="utf-8")
 
     # Also add to in-memory state
-    with _generation_lock:
+    with session.lock:
         for fname, content in generated_configs.items():
-            _current_state.setdefault("files", {})[fname] = content
+            session.state.setdefault("files", {})[fname] = content
 
     return jsonify({
         "status": "generated",
@@ -516,9 +749,10 @@ __pycache__
 @app.route("/api/deploy/download-ready", methods=["POST"])
 def api_deploy_download_ready():
     """Create a deployment-ready ZIP with configs included."""
-    project_dir = _current_state.get("project_dir")
-    project_name = _current_state.get("project_name", "project")
-    files = _current_state.get("files", {})
+    session = _session()
+    project_dir = session.state.get("project_dir")
+    project_name = session.state.get("project_name", "project")
+    files = session.state.get("files", {})
 
     if not files:
         return jsonify({"error": "No project to package"}), 400
@@ -541,12 +775,13 @@ def api_deploy_download_ready():
 def api_preview_start():
     """Start the preview servers."""
     from app.graph.nodes.preview_node import preview_node, get_preview_error
+    session = _session()
 
-    if not _current_state.get("project_dir"):
+    if not session.state.get("project_dir"):
         return jsonify({"error": "No project loaded"}), 400
 
-    result = preview_node(_current_state)
-    _current_state.update(result)
+    result = preview_node(session.state)
+    session.state.update(result)
 
     error_msg = ""
     if not result.get("preview_started", False):
@@ -564,17 +799,19 @@ def api_preview_stop():
     """Stop preview servers."""
     from app.graph.nodes.preview_node import stop_preview
     stop_preview()
-    _current_state["preview_url"] = ""
-    _current_state["preview_started"] = False
+    session = _session()
+    session.state["preview_url"] = ""
+    session.state["preview_started"] = False
     return jsonify({"status": "stopped"})
 
 
 @app.route("/api/preview/status")
 def api_preview_status():
     """Check preview status."""
+    session = _session()
     from app.graph.nodes.preview_node import is_preview_running, get_preview_error
     status = is_preview_running()
-    status["preview_url"] = _current_state.get("preview_url", "")
+    status["preview_url"] = session.state.get("preview_url", "")
     status["error"] = get_preview_error()
     return jsonify(status)
 
@@ -585,50 +822,49 @@ def api_preview_status():
 
 @app.route("/api/stream")
 def api_stream():
-    """Server-Sent Events endpoint for real-time updates."""
+    """
+    Server-Sent Events endpoint for real-time updates.
+    Blocks on the event bus instead of polling; supports Last-Event-ID resume.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    # Subscribe before taking the snapshot so no update can fall in between
+    session = _session()
+    sub = session.bus.subscribe(last_event_id)
+
     def event_stream():
-        last_step = ""
-        last_files_count = 0
-        known_files = set()
-
-        while True:
-            step = _current_state.get("current_step", "idle")
-            current_files = _current_state.get("files", {})
-            files_count = len(current_files)
-
-            # Detect newly added files
-            new_files = {}
-            current_keys = set(current_files.keys())
-            added = current_keys - known_files
-            if added:
-                for fp in added:
-                    new_files[fp] = {
-                        "content": current_files[fp],
-                        "lines": len(current_files[fp].split("\n")),
-                        "size": len(current_files[fp]),
-                    }
-                known_files = current_keys
-
-            if step != last_step or files_count != last_files_count or new_files:
-                event_data = json.dumps({
-                    "step": step,
-                    "files_count": files_count,
-                    "active": _generation_active,
-                    "project_name": _current_state.get("project_name", ""),
-                    "preview_url": _current_state.get("preview_url", ""),
-                    "tests_passed": _current_state.get("tests_passed", False),
-                    "new_files": new_files,  # contains path, content, lines, size
-                })
-                yield f"data: {event_data}\n\n"
-                last_step = step
-                last_files_count = files_count
-
-            if step == "complete" or step == "error":
-                # Send final event and close
-                yield f"data: {json.dumps({'step': step, 'final': True})}\n\n"
-                break
-
-            time.sleep(0.3)  # Faster polling for real-time feel
+        try:
+            if last_event_id is None:
+                payload = _state_payload(session, _snapshot_files(session))
+                yield _sse_message(session.bus.last_id, payload)
+                if payload["step"] in FINAL_STEPS:
+                    yield f"data: {json.dumps({'step': payload['step'], 'final': True})}\n\n"
+                    return
+
+            while True:
+                event = sub.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if event.type == UPDATE:
+                    event_id, payload = event.id, event.data
+                else:
+                    # Missed or dropped events — send the full state again
+                    event_id = session.bus.last_id
+                    payload = _state_payload(session, _snapshot_files(session))
+                yield _sse_message(event_id, payload)
+
+                if payload["step"] in FINAL_STEPS:
+                    # Send final event and close
+                    yield f"data: {json.dumps({'step': payload['step'], 'final': True})}\n\n"
+                    break
+        finally:
+            sub.close()
 
     return Response(
         event_stream(),
@@ -637,6 +873,49 @@ def api_stream():
     )
 
 
+def _sse_message(event_id: int, payload: dict) -> str:
+    return f"id: {event_id}\ndata: {json.dumps(payload)}\n\n"
+
+
+def _snapshot_files(session) -> dict:
+    """Files sent with a full-state snapshot; a lazily loaded project only sends what was read so far."""
+    files = session.state.get("files", {})
+    return files.loaded() if isinstance(files, ProjectFiles) else files
+
+
+def _state_payload(session, new_files: dict = None) -> dict:
+    """The update clients receive: step, counters and any new file contents."""
+    return {
+        "step": session.state.get("current_step", "idle"),
+        "files_count": len(session.state.get("files", {})),
+        "active": session.active,
+        "project_name": session.state.get("project_name", ""),
+        "preview_url": session.state.get("preview_url", ""),
+        "tests_passed": session.state.get("tests_passed", False),
+        "job_id": session.job_id,
+        "new_files": {
+            fp: {"content": content, "lines": content.count("\n") + 1, "size": len(content)}
+            for fp, content in (new_files or {}).items()
+        },
+    }
+
+
+def _publish_state(session, new_files: dict = None):
+    """Publish the session's state once; every SSE/SocketIO subscriber shares the payload."""
+    session.bus.publish(_state_payload(session, new_files))
+
+
+def _emit_status(session_id: str, event):
+    """SocketIO clients get the same updates as SSE (file names only — contents arrive as file_chunk)."""
+    if event.type != UPDATE:
+        return
+    data = dict(event.data)
+    data["new_files"] = list(data.get("new_files", {}))
+    socketio.emit("status", data, to=session_id)
+
+
+_sessions.on_create(lambda session: session.bus.add_listener(partial(_emit_status, session.id)))
+
 
 # ============================================
 # SDLC STAGE ROUTES
@@ -654,37 +933,40 @@ SDLC_STAGE_KEYS = {
 @app.route("/api/stages", methods=["GET"])
 def api_stages_list():
     """Return status of all SDLC stages for the current project."""
+    session = _session()
     stages = {}
     for stage_name, state_key in SDLC_STAGE_KEYS.items():
-        data = _current_state.get(state_key)
+        data = session.state.get(state_key)
         stages[stage_name] = {
             "completed": data is not None,
             "data": data,
         }
-    return jsonify({"stages": stages, "project_name": _current_state.get("project_name", "")})
+    return jsonify({"stages": stages, "project_name": session.state.get("project_name", "")})
 
 
 @app.route("/api/stages/overview", methods=["GET"])
 def api_stages_overview():
     """Return a summary of all SDLC stages (names + completion status only)."""
+    session = _session()
     overview = {}
     for stage_name, state_key in SDLC_STAGE_KEYS.items():
-        overview[stage_name] = _current_state.get(state_key) is not None
+        overview[stage_name] = session.state.get(state_key) is not None
     return jsonify({
         "stages": overview,
-        "project_name": _current_state.get("project_name", ""),
-        "user_prompt": _current_state.get("user_prompt", ""),
+        "project_name": session.state.get("project_name", ""),
+        "user_prompt": session.state.get("user_prompt", ""),
     })
 
 
 @app.route("/api/stages/<stage_name>", methods=["GET"])
 def api_stage_detail(stage_name):
     """Return the stored output for a specific SDLC stage."""
+    session = _session()
     state_key = SDLC_STAGE_KEYS.get(stage_name)
     if not state_key:
         return jsonify({"error": f"Unknown stage: {stage_name}"}), 400
 
-    data = _current_state.get(state_key)
+    data = session.state.get(state_key)
     return jsonify({
         "stage": stage_name,
         "completed": data is not None,
@@ -694,51 +976,71 @@ def api_stage_detail(stage_name):
 
 @app.route("/api/stages/run/<stage_name>", methods=["POST"])
 def api_run_stage(stage_name):
-    """Run a specific SDLC stage and store the result in _current_state."""
-    global _generation_active
+    """Run a specific SDLC stage and store the result in the session state."""
 
     if stage_name not in SDLC_STAGE_KEYS:
         return jsonify({"error": f"Unknown stage: {stage_name}"}), 400
 
-    if _generation_active:
+    session = _session()
+    if session.active:
         return jsonify({"error": "Generation already in progress"}), 400
 
     data = request.get_json() or {}
-    user_prompt = data.get("prompt", _current_state.get("user_prompt", "")).strip()
-    project_name = data.get("project_name", _current_state.get("project_name", ""))
+    user_prompt = data.get("prompt", session.state.get("user_prompt", "")).strip()
+    project_name = data.get("project_name", session.state.get("project_name", ""))
 
     if not user_prompt:
         return jsonify({"error": "prompt is required"}), 400
 
-    # Persist the prompt in global state so subsequent stages have context
-    with _generation_lock:
-        _current_state["user_prompt"] = user_prompt
+    # Persist the prompt in the session state so subsequent stages have context
+    with session.lock:
+        session.state["user_prompt"] = user_prompt
         if project_name:
-            _current_state["project_name"] = project_name
+            session.state["project_name"] = project_name
 
-    # Run in background thread
-    th = threading.Thread(
-        target=_run_stage_background,
-        args=(stage_name, user_prompt),
-        daemon=True,
-    )
-    th.start()
+    # Queue on the worker pool
+    job = _start_pipeline(session, "stage", _run_stage_background, stage_name, user_prompt)
+    if not job:
+        return jsonify({"error": "Generation already in progress"}), 400
 
-    return jsonify({"status": "started", "stage": stage_name})
+    return jsonify(_job_response(job, stage=stage_name))
+
+
+@app.route("/api/stages/run-all", methods=["POST"])
+def api_run_all_stages():
+    """Run every SDLC stage in one dependency-aware graph (independent stages run concurrently)."""
+    session = _session()
+    data = request.get_json() or {}
+    user_prompt = data.get("prompt", session.state.get("user_prompt", "")).strip()
+    project_name = data.get("project_name", session.state.get("project_name", ""))
+
+    if not user_prompt:
+        return jsonify({"error": "prompt is required"}), 400
+
+    with session.lock:
+        if session.active:
+            return jsonify({"error": "Generation already in progress"}), 400
+        session.state["user_prompt"] = user_prompt
+        if project_name:
+            session.state["project_name"] = project_name
+
+    job = _start_pipeline(session, "stage", _run_all_stages_background, user_prompt)
+    if not job:
+        return jsonify({"error": "Generation already in progress"}), 400
+
+    return jsonify(_job_response(job, stages=list(SDLC_STAGE_KEYS)))
 
 
 @app.route("/api/stages/generate", methods=["POST"])
 def api_stages_generate():
     """Trigger the code generation pipeline after SDLC stages are completed."""
-    global _generation_active
+    session = _session()
 
-    if _generation_active:
+    job = _start_pipeline(session, "generation", _run_code_generation)
+    if not job:
         return jsonify({"error": "Generation already in progress"}), 400
 
-    th = threading.Thread(target=_run_code_generation, daemon=True)
-    th.start()
-
-    return jsonify({"status": "started", "stage": "code"})
+    return jsonify(_job_response(job, stage="code"))
 
 
 # ============================================
@@ -748,10 +1050,34 @@ def api_stages_generate():
 # SOCKETIO EVENTS
 # ============================================
 
+def _emit_file_chunk(channel: str, event: dict):
+    """Push a streamed file chunk (or the final file) to the clients of the session that produced it."""
+    socketio.emit("file_chunk", event, to=channel or DEFAULT_SESSION)
+
+
+set_file_chunk_sink(_emit_file_chunk)
+
+
+def _socket_session():
+    """Session the current SocketIO client joined on connect."""
+    return _sessions.get(_socket_sessions.get(request.sid, DEFAULT_SESSION))
+
+
 @socketio.on("connect")
 def handle_connect():
-    print("🔌 Client connected")
-    emit("status", {"step": _current_state.get("current_step", "idle")})
+    session_id = request.args.get("session") or DEFAULT_SESSION
+    if not is_valid_session_id(session_id):
+        return False
+    print(f"🔌 Client connected (session {session_id})")
+    _socket_sessions[request.sid] = session_id
+    join_room(session_id)
+    session = _sessions.get(session_id)
+    emit("status", {"step": session.state.get("current_step", "idle")})
+
+
+@socketio.on("disconnect")
+def handle_disconnect():
+    _socket_sessions.pop(request.sid, None)
 
 
 @socketio.on("generate")
@@ -762,18 +1088,12 @@ def handle_generate(data):
         emit("error", {"message": "Prompt required"})
         return
 
-    if _generation_active:
+    job = _start_pipeline(_socket_session(), "generation", _run_generation, prompt, "")
+    if not job:
         emit("error", {"message": "Generation already in progress"})
         return
 
-    thread = threading.Thread(
-        target=_run_generation,
-        args=(prompt, ""),
-        daemon=True,
-    )
-    thread.start()
-
-    emit("status", {"step": "starting", "message": "Generation started..."})
+    emit("status", {"step": "starting", "message": "Generation started...", "job_id": job.id})
 
 
 @socketio.on("chat")
@@ -784,68 +1104,86 @@ def handle_chat(data):
         emit("error", {"message": "Prompt required"})
         return
 
-    thread = threading.Thread(
-        target=_run_chat,
-        args=(prompt,),
-        daemon=True,
-    )
-    thread.start()
+    if not _start_pipeline(_socket_session(), "chat", _run_chat, prompt):
+        emit("error", {"message": "Generation in progress"})
 
 
 # ============================================
 # BACKGROUND GENERATION
 # ============================================
 
-def _update_state(node_name: str, node_output: dict):
+def _update_state(session, node_name: str, node_output: dict):
     """Callback to receive intermediate node outputs for real-time UI updates."""
-    global _current_state
-    with _generation_lock:
+    # Node boundary — stop here if the job was cancelled
+    check_cancelled()
+
+    new_files = {}
+    with session.lock:
         # Merge files incrementally (coder_file_node outputs files)
         if "files" in node_output:
-            if "files" not in _current_state:
-                _current_state["files"] = {}
-            _current_state["files"].update(node_output["files"])
+            if "files" not in session.state:
+                session.state["files"] = {}
+            new_files = {fp: c for fp, c in node_output["files"].items() if fp not in session.state["files"]}
+            session.state["files"].update(node_output["files"])
 
         # Update step indicator
         if "current_step" in node_output:
-            _current_state["current_step"] = node_output["current_step"]
+            session.state["current_step"] = node_output["current_step"]
 
         # Update project name/dir if present
         for key in ("project_name", "project_dir", "tech_stack",
                      "tests_passed", "preview_url", "preview_started"):
             if key in node_output:
-                _current_state[key] = node_output[key]
+                session.state[key] = node_output[key]
 
-    add_log(f"[{node_name}] completed — files: {len(_current_state.get('files', {}))}")
+    _publish_state(session, new_files)
+    session.add_log(f"[{node_name}] completed — files: {len(session.state.get('files', {}))}")
 
 
-def _run_generation(prompt: str, project_name: str):
-    """Run the full generation pipeline in background with real-time streaming."""
-    global _generation_active, _current_state, _current_project_id
+def _run_generation(session, prompt: str, project_name: str, resume_thread_id: str = None):
+    """
+    Run the full generation pipeline in background with real-time streaming.
+    With `resume_thread_id`, continue that checkpointed run instead of starting over.
+    """
+    from app.main import new_thread_id
 
-    with _generation_lock:
-        _generation_active = True
-        _current_state = {"current_step": "starting", "files": {}}
+    thread_id = resume_thread_id or new_thread_id()
+    with session.lock:
+        session.state = {
+            "current_step": "resuming" if resume_thread_id else "starting",
+            "files": {},
+            "thread_id": thread_id,
+        }
+    _publish_state(session)
 
     try:
-        from app.main import run_pipeline_streaming
+        from app.main import run_pipeline_streaming, resume_pipeline_streaming
 
         # Use streaming to get intermediate state after each node
-        result = run_pipeline_streaming(prompt, project_name or None, _update_state)
-
-        with _generation_lock:
-            _current_state.update(result)
-            _current_state["current_step"] = "complete"
+        if resume_thread_id:
+            result = resume_pipeline_streaming(thread_id, partial(_update_state, session))
+            prompt = prompt or result.get("user_prompt", "")
+            project_name = project_name or result.get("project_name", "")
+        else:
+            result = run_pipeline_streaming(prompt, project_name or None, partial(_update_state, session),
+                                            thread_id=thread_id)
+
+        with session.lock:
+            session.state.update(result)
+            session.state["current_step"] = "complete"
+        _publish_state(session)
 
         # Auto-start preview after generation
         try:
             from app.graph.nodes.preview_node import preview_node as pn
             print("\n🚀 Auto-starting preview...")
-            with _generation_lock:
-                _current_state["current_step"] = "preview_starting"
-            preview_result = pn(_current_state)
-            with _generation_lock:
-                _current_state.update(preview_result)
+            with session.lock:
+                session.state["current_step"] = "preview_starting"
+            _publish_state(session)
+            preview_result = pn(session.state)
+            with session.lock:
+                session.state.update(preview_result)
+            _publish_state(session)
             if preview_result.get("preview_started"):
                 print(f"   ✅ Preview auto-started: {preview_result.get('preview_url')}")
             else:
@@ -864,10 +1202,11 @@ def _run_generation(prompt: str, project_name: str):
             pid = save_project(
                 name=p_name, prompt=prompt, tech_stack=tech,
                 files=files, messages=messages,
-                project_dir=p_dir, status="complete"
+                project_dir=p_dir, status="complete",
+                fingerprints=result.get("file_fingerprints")
             )
-            with _generation_lock:
-                _current_project_id = pid
+            with session.lock:
+                session.project_id = pid
             print(f"💾 Project saved to DB: {pid}")
         except Exception as db_err:
             print(f"⚠️ DB save failed: {db_err}")
@@ -877,166 +1216,211 @@ def _run_generation(prompt: str, project_name: str):
             "files_count": len(result.get("files", {})),
             "tests_passed": result.get("tests_passed", False),
             "preview_url": result.get("preview_url", ""),
-        })
+        }, to=session.id)
 
     except Exception as e:
         print(f"❌ Generation error: {e}")
         import traceback
         traceback.print_exc()
 
-        with _generation_lock:
-            _current_state["current_step"] = "error"
-            _current_state["error_message"] = str(e)
+        with session.lock:
+            session.state["current_step"] = "error"
+            session.state["error_message"] = str(e)
+        _publish_state(session)
 
-        socketio.emit("generation_error", {"error": str(e)})
+        socketio.emit("generation_error", {"error": str(e)}, to=session.id)
 
-    finally:
-        with _generation_lock:
-            _generation_active = False
 
-
-def _run_chat(prompt: str):
+def _run_chat(session, prompt: str):
     """Run chat refinement in background."""
-    global _generation_active, _current_state
 
-    with _generation_lock:
-        _generation_active = True
-        _current_state["current_step"] = "chat_processing"
+    with session.lock:
+        session.state["current_step"] = "chat_processing"
+    _publish_state(session)
 
     try:
         from app.main import run_chat_pipeline
-        result = run_chat_pipeline(prompt, _current_state.copy())
+        result = run_chat_pipeline(prompt, session.state.copy())
 
-        with _generation_lock:
-            _current_state.update(result)
-            _current_state["current_step"] = "complete"
+        with session.lock:
+            session.state.update(result)
+            session.state["current_step"] = "complete"
+        _publish_state(session)
 
         # Save chat message and updated files to DB
         try:
-            if _current_project_id:
-                save_message(_current_project_id, 'user', prompt, 'message')
-                updated_files = _current_state.get('files', {})
+            if session.project_id:
+                save_message(session.project_id, 'user', prompt, 'message')
+                updated_files = session.state.get('files', {})
                 if updated_files:
-                    update_project(_current_project_id, files=updated_files)
-                print(f"💾 Chat saved to DB for project: {_current_project_id}")
+                    update_project(session.project_id, files=updated_files,
+                                   fingerprints=session.state.get('file_fingerprints'))
+                print(f"💾 Chat saved to DB for project: {session.project_id}")
         except Exception as db_err:
             print(f"⚠️ DB chat save failed: {db_err}")
 
         socketio.emit("chat_complete", {
             "files_count": len(result.get("files", {})),
-        })
+        }, to=session.id)
 
     except Exception as e:
         print(f"❌ Chat error: {e}")
-        with _generation_lock:
-            _current_state["current_step"] = "error"
+        with session.lock:
+            session.state["current_step"] = "error"
+        _publish_state(session)
 
-        socketio.emit("chat_error", {"error": str(e)})
+        socketio.emit("chat_error", {"error": str(e)}, to=session.id)
 
-    finally:
-        with _generation_lock:
-            _generation_active = False
 
-
-def _run_stage_background(stage_name: str, user_prompt: str):
-    """Run a single SDLC stage in a background thread and update _current_state."""
-    global _generation_active, _current_state, _current_project_id
+def _run_stage_background(session, stage_name: str, user_prompt: str):
+    """Run a single SDLC stage on a pipeline worker and update the session state."""
 
     state_key = SDLC_STAGE_KEYS.get(stage_name)
     if not state_key:
         return
 
-    with _generation_lock:
-        _generation_active = True
-        _current_state["current_step"] = f"running_{stage_name}"
+    with session.lock:
+        session.state["current_step"] = f"running_{stage_name}"
+    _publish_state(session)
 
     try:
-        from app.graph.graph import build_stage_graph
+        from app.graph.graph import get_stage_graph
 
         print(f"\n📋 Running SDLC stage: {stage_name}")
-        graph = build_stage_graph(stage_name)
+        graph = get_stage_graph(stage_name)
 
         # Build the input state for this stage — pass all existing context
-        input_state = _current_state.copy()
+        input_state = session.state.copy()
         input_state["user_prompt"] = user_prompt
 
         result = graph.invoke(input_state)
 
-        # Store result in _current_state
-        with _generation_lock:
-            _current_state.update(result)
-            _current_state["current_step"] = f"{stage_name}_complete"
+        # Store result in the session state
+        with session.lock:
+            session.state.update(result)
+            session.state["current_step"] = f"{stage_name}_complete"
+        _publish_state(session)
 
         stage_data = result.get(state_key)
         print(f"   ✅ Stage '{stage_name}' complete")
 
         # Persist to DB so it's available when the project is reloaded
-        if _current_project_id and stage_data:
-            try:
-                from app.core.database import save_sdlc_stage as _save_sdlc
-                _save_sdlc(_current_project_id, stage_name, stage_data)
-                print(f"   💾 Stage '{stage_name}' saved to DB")
-            except ImportError:
-                # Function doesn't exist yet — add it silently  
-                try:
-                    import sqlite3, json as _json
-                    from app.core.database import _get_conn, DB_PATH
-                    conn = _get_conn()
-                    now = __import__("datetime").datetime.utcnow().isoformat()
-                    try:
-                        conn.execute(
-                            """INSERT INTO sdlc_stages (project_id, stage_name, stage_data, created_at, updated_at)
-                               VALUES (?, ?, ?, ?, ?)
-                               ON CONFLICT(project_id, stage_name) DO UPDATE SET
-                                 stage_data=excluded.stage_data, updated_at=excluded.updated_at""",
-                            (_current_project_id, stage_name, _json.dumps(stage_data, default=str), now, now)
-                        )
-                        conn.commit()
-                        print(f"   💾 Stage '{stage_name}' saved to DB (direct)")
-                    finally:
-                        conn.close()
-                except Exception as db_err:
-                    print(f"   ⚠️ DB stage save error: {db_err}")
+        _persist_stage(session, stage_name, stage_data)
 
     except Exception as e:
         print(f"❌ Stage '{stage_name}' error: {e}")
         import traceback
         traceback.print_exc()
-        with _generation_lock:
-            _current_state["current_step"] = "error"
-            _current_state["error_message"] = str(e)
+        with session.lock:
+            session.state["current_step"] = "error"
+            session.state["error_message"] = str(e)
+        _publish_state(session)
+
+
+def _persist_stage(session, stage_name: str, stage_data):
+    """Save a finished SDLC stage so it is available when the project is reloaded."""
+    if not (session.project_id and stage_data):
+        return
+    try:
+        from app.core.database import save_sdlc_stage as _save_sdlc
+        _save_sdlc(session.project_id, stage_name, stage_data)
+        print(f"   💾 Stage '{stage_name}' saved to DB")
+    except ImportError:
+        # Function doesn't exist yet — add it silently  
+        try:
+            import sqlite3, json as _json
+            from app.core.database import _get_conn, DB_PATH
+            conn = _get_conn()
+            now = __import__("datetime").datetime.utcnow().isoformat()
+            try:
+                conn.execute(
+                    """INSERT INTO sdlc_stages (project_id, stage_name, stage_data, created_at, updated_at)
+                       VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT(project_id, stage_name) DO UPDATE SET
+                         stage_data=excluded.stage_data, updated_at=excluded.updated_at""",
+                    (session.project_id, stage_name, _json.dumps(stage_data, default=str), now, now)
+                )
+                conn.commit()
+                print(f"   💾 Stage '{stage_name}' saved to DB (direct)")
+            finally:
+                conn.close()
+        except Exception as db_err:
+            print(f"   ⚠️ DB stage save error: {db_err}")
 
-    finally:
-        with _generation_lock:
-            _generation_active = False
 
+def _run_all_stages_background(session, user_prompt: str):
+    """Run the dependency-aware SDLC graph, storing each stage as soon as it finishes."""
 
-def _run_code_generation():
+    with session.lock:
+        session.state["current_step"] = "running_all_stages"
+    _publish_state(session)
+
+    try:
+        from app.graph.graph import get_graph
+
+        print("\n📋 Running all SDLC stages")
+        graph = get_graph("sdlc")
+
+        input_state = session.state.copy()
+        input_state["user_prompt"] = user_prompt
+
+        for event in graph.stream(input_state):
+            check_cancelled()
+            for stage_name, node_output in event.items():
+                state_key = SDLC_STAGE_KEYS.get(stage_name)
+                if not state_key or not node_output:
+                    continue
+                with session.lock:
+                    session.state.update(node_output)
+                    session.state["current_step"] = f"{stage_name}_complete"
+                _publish_state(session)
+                print(f"   ✅ Stage '{stage_name}' complete")
+                session.add_log(f"[{stage_name}] stage completed")
+                socketio.emit("stage_complete", {"stage": stage_name}, to=session.id)
+                _persist_stage(session, stage_name, node_output.get(state_key))
+
+        with session.lock:
+            session.state["current_step"] = "stages_complete"
+        _publish_state(session)
+
+    except Exception as e:
+        print(f"❌ SDLC stages error: {e}")
+        import traceback
+        traceback.print_exc()
+        with session.lock:
+            session.state["current_step"] = "error"
+            session.state["error_message"] = str(e)
+        _publish_state(session)
+
+
+def _run_code_generation(session):
     """Run only the code generation part (skipping SDLC nodes)."""
-    global _generation_active, _current_state, _current_project_id
 
-    with _generation_lock:
-        _generation_active = True
-        _current_state["current_step"] = "starting_code"
+    with session.lock:
+        session.state["current_step"] = "starting_code"
+    _publish_state(session)
 
     try:
         from app.main import run_code_only_streaming
 
-        result = run_code_only_streaming(_current_state, _update_state)
+        result = run_code_only_streaming(session.state, partial(_update_state, session))
 
-        with _generation_lock:
-            _current_state.update(result)
-            _current_state["current_step"] = "complete"
+        with session.lock:
+            session.state.update(result)
+            session.state["current_step"] = "complete"
+        _publish_state(session)
 
         # Auto-start preview
         try:
             from app.graph.nodes.preview_node import preview_node as pn
             print("\n🚀 Auto-starting preview...")
-            with _generation_lock:
-                _current_state["current_step"] = "preview_starting"
-            preview_result = pn(_current_state)
-            with _generation_lock:
-                _current_state.update(preview_result)
+            with session.lock:
+                session.state["current_step"] = "preview_starting"
+            _publish_state(session)
+            preview_result = pn(session.state)
+            with session.lock:
+                session.state.update(preview_result)
+            _publish_state(session)
             if preview_result.get("preview_started"):
                 print(f"   ✅ Preview: {preview_result.get('preview_url')}")
         except Exception as prev_err:
@@ -1044,25 +1428,27 @@ def _run_code_generation():
 
         # Save or update project in DB
         try:
-            p_name = result.get("project_name", _current_state.get("project_name", "Untitled"))
+            p_name = result.get("project_name", session.state.get("project_name", "Untitled"))
             files = result.get("files", {})
             p_dir = result.get("project_dir", "")
             prompt = result.get("user_prompt", "")
 
-            if not _current_project_id:
+            if not session.project_id:
                 pid = save_project(
                     name=p_name, prompt=prompt, tech_stack="react-flask",
                     files=files, messages=[],
-                    project_dir=p_dir, status="complete"
+                    project_dir=p_dir, status="complete",
+                    fingerprints=result.get("file_fingerprints")
                 )
-                with _generation_lock:
-                    _current_project_id = pid
+                with session.lock:
+                    session.project_id = pid
                 print(f"   💾 Saved new project to DB (ID: {pid})")
             else:
                 from app.core.database import save_version
-                save_version(_current_project_id, files, label="Code Generated")
-                update_project(_current_project_id, files=files)
-                print(f"   💾 Updated project in DB (ID: {_current_project_id})")
+                save_version(session.project_id, files, label="Code Generated")
+                update_project(session.project_id, files=files,
+                               fingerprints=result.get("file_fingerprints"))
+                print(f"   💾 Updated project in DB (ID: {session.project_id})")
 
         except Exception as db_err:
             print(f"   ⚠️ DB save error: {db_err}")
@@ -1071,13 +1457,10 @@ def _run_code_generation():
         print(f"❌ Code Generation error: {e}")
         import traceback
         traceback.print_exc()
-        with _generation_lock:
-            _current_state["current_step"] = "error"
-            _current_state["error_message"] = str(e)
-
-    finally:
-        with _generation_lock:
-            _generation_active = False
+        with session.lock:
+            session.state["current_step"] = "error"
+            session.state["error_message"] = str(e)
+        _publish_state(session)
 
 
 # ============================================
@@ -1091,5 +1474,9 @@ if __name__ == "__main__":
     print(f"🌐 http://localhost:8080")
     print("=" * 60 + "\n")
 
+    # Compile every graph variant now so the first click does not pay for it
+    from app.graph.graph import warm_graphs
+    threading.Thread(target=warm_graphs, name="graph-warmup", daemon=True).start()
+
     socketio.run(app, host="0.0.0.0", port=8080, debug=False)
 